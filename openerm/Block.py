@@ -134,36 +134,27 @@ class Block(object):
 		data		= self.cipher.encode(data)
 
 		l_data		= len(data)
-		struct_fmt	= struct_fmt + "{0}s".format(l_data)
+		l_block		= struct.calcsize(struct_fmt) + l_data + (len(variable_data) if variable_data else 0)
 
-		if variable_data:
-			struct_fmt	= struct_fmt + "{0}s".format(len(variable_data))
-			b			= struct.pack(	struct_fmt,
-					 struct.calcsize(struct_fmt),	# Longitud total del bloque
+		header		= struct.pack(	struct_fmt,
+					 l_block,						# Longitud total del bloque
 					 tipo_bloque,					# Tipo de objeto
 					 self.compressor.type,			# Metodo de compresión
 					 self.cipher.type,				# Metodo de encriptación
-					 l_data,						# Longitud del contenido
-					 data,							# Contenido
-					 variable_data					# Datos variables
-					 )
-		else:
-			b			= struct.pack(	struct_fmt,
-					 struct.calcsize(struct_fmt),	# Longitud total del bloque
-					 tipo_bloque,					# Tipo de objeto
-					 self.compressor.type,			# Metodo de compresión
-					 self.cipher.type,				# Metodo de encriptación
-					 l_data,						# Longitud del contenido
-					 data							# Contenido
+					 l_data							# Longitud del contenido
 					 )
 
+		# Se arma el bloque con una única copia de los datos
+		b			= b''.join((header, data, variable_data or b''))
+
 		return b
 
 	def load(self, data):
 		"""Convierte un bloque OpenErm en datos lógicos
 
 		Args:
-			data (bytes): Bytes del bloque completo
+			data (bytes): Bytes del bloque completo, puede ser cualquier objeto
+				"bytes-like" (por ejemplo un `memoryview` sobre un `mmap`)
 
 		Return:
 			tuple
@@ -193,12 +184,13 @@ class Block(object):
 			(60, 2, 1, 0, 49, b'Esto hace las veces de una pagina de reporte', None)
 		"""
 
-		# Obtener datos iniciales del bloque
+		# Obtener datos iniciales del bloque. Se trabaja sobre un memoryview
+		# para no copiar los datos comprimidos antes de descomprimirlos
+		data				= memoryview(data)
 		struct_fmt			= ">LBBBL"
 		header_len			= struct.calcsize(struct_fmt)
-		struct_unpack		= struct.Struct(struct_fmt).unpack_from
 
-		fields				= struct_unpack(data[0:header_len])
+		fields				= struct.unpack_from(struct_fmt, data, 0)
 
 		longitud_bloque		= fields[0]
 		tipo_bloque			= fields[1]
@@ -206,24 +198,29 @@ class Block(object):
 		tipo_encriptacion	= fields[3]
 		longitud_datos		= fields[4]
 
-		longitud_datos_variables = longitud_bloque - (header_len + longitud_datos)
-
-		struct_fmt	= "{0}s".format(longitud_datos)
-
-		if longitud_datos_variables > 0:
-			struct_fmt			= struct_fmt + "{0}s".format(longitud_datos_variables)
-			struct_unpack		= struct.Struct(struct_fmt).unpack_from
-			fields				= struct_unpack(data[header_len:])
-			data				= fields[0]
-			variable_data		= fields[1]
-		else:
-			struct_unpack		= struct.Struct(struct_fmt).unpack_from
-			fields				= struct_unpack(data[header_len:])
-			data				= fields[0]
-			variable_data		= None
+		fin_datos			= header_len + longitud_datos
+		variable_data		= data[fin_datos:longitud_bloque].tobytes() if longitud_bloque > fin_datos else None
 
 		self.compressor.type 	= tipo_compresion
 		self.cipher.type 		= tipo_encriptacion
-		data 					= self.compressor.decompress(self.cipher.decode(data))
+		data 					= self.compressor.decompress(self.cipher.decode(data[header_len:fin_datos]))
+		if isinstance(data, memoryview):
+			# Bloques sin compresión ni cifrado
+			data = data.tobytes()
 
 		return (longitud_bloque, tipo_bloque, tipo_compresion, tipo_encriptacion, longitud_datos, data, variable_data)
+
+	@staticmethod
+	def load_variable_data(data):
+		"""Retorna los datos adicionales de un bloque, sin descifrar ni
+		descomprimir sus datos
+
+		Args:
+			data (bytes): Bytes del bloque completo (o "bytes-like")
+
+		Return:
+			bytes: Datos adicionales o `None`
+		"""
+		longitud_bloque, _, _, _, longitud_datos = struct.unpack_from(">LBBBL", data, 0)
+		fin_datos = struct.calcsize(">LBBBL") + longitud_datos
+		return bytes(data[fin_datos:longitud_bloque]) if longitud_bloque > fin_datos else None
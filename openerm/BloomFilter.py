@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# BloomFilter.py
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+"""
+BloomFilter
+===========
+
+Filtro de Bloom de los trigramas de un contenedor de páginas. Se salva
+(opcionalmente) al final de los datos variables (no comprimidos) del bloque
+del contenedor, de modo que una búsqueda de texto puede descartar el
+contenedor sin descomprimirlo. A diferencia de :class:`openerm.TextIndex` no
+requiere archivos adicionales.
+
+.. seealso::
+	* :class:`openerm.PageContainer`
+	* :class:`openerm.TextIndex`
+
+"""
+
+try:
+	import gettext
+	from gettext import gettext as _
+	gettext.textdomain('openerm')
+
+	import sys
+	import math
+	import struct
+
+	from openerm.TextIndex import trigrams
+
+except ImportError as err:
+	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
+	print(_("No fue posible importar el modulo: %s") % modulename)
+	sys.exit(-1)
+
+
+class BloomFilter(object):
+	"""Filtro de Bloom de enteros (trigramas, ver :py:func:`openerm.TextIndex.trigrams`)
+
+	Args:
+		bits (int): Cantidad de bits del filtro
+		hashes (int): Cantidad de funciones de hash
+		data (bytes): (opcional) Bits del filtro
+
+	Example:
+		>>> from openerm.BloomFilter import BloomFilter
+		>>> f = BloomFilter.from_text(b"Pagina de una sola linea", 0.01)
+		>>> f.may_contain(BloomFilter.query("una sola"))
+		True
+		>>> f.may_contain(BloomFilter.query("otra cosa"))
+		False
+
+	.. note::
+		Formato del filtro salvado:
+
+		.. code-block:: none
+
+			+========+========+======+=================+
+			| "oblm" | Hashes | Bits | Bits del filtro |
+			+========+========+======+=================+
+			   4s        B       L     (Bits + 7) / 8
+
+		Las posiciones de cada elemento se calculan por "double hashing" a
+		partir de un único hash multiplicativo de 64 bits del trigrama.
+	"""
+
+	_header_fmt		= ">4sBL"
+	_magic			= b"oblm"
+
+	def __init__(self, bits, hashes, data=None):
+
+		self.bits	= bits
+		self.hashes	= hashes
+		self.data	= bytearray(data) if data is not None else bytearray((bits + 7) // 8)
+
+	@classmethod
+	def from_trigrams(cls, items, fpr):
+		"""Arma el filtro de un conjunto de trigramas
+
+		Args:
+			items (set): Trigramas (ver :py:func:`openerm.TextIndex.trigrams`)
+			fpr (float): Tasa de falsos positivos buscada para cada trigrama
+
+		Return:
+			:class:`openerm.BloomFilter`
+		"""
+		n		= max(len(items), 1)
+		bits	= min(max(int(math.ceil(-n * math.log(fpr) / (math.log(2) ** 2))), 8), 0xFFFFFFFF)
+		hashes	= min(max(int(round(bits / n * math.log(2))), 1), 255)
+
+		f = cls(bits, hashes)
+		f.add_all(items)
+		return f
+
+	@classmethod
+	def from_text(cls, data, fpr):
+		"""Arma el filtro de los trigramas de un texto
+
+		Args:
+			data (bytes): Texto (las páginas de un contenedor codificadas en latin1)
+			fpr (float): Tasa de falsos positivos buscada para cada trigrama
+
+		Return:
+			:class:`openerm.BloomFilter`
+		"""
+		return cls.from_trigrams(trigrams(data), fpr)
+
+	def _positions(self, item):
+		h	= (item * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+		h1	= h >> 32
+		h2	= (h & 0xFFFFFFFF) | 1
+		return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+	def add_all(self, items):
+		"""Agrega elementos (enteros) al filtro"""
+		data = self.data
+		for item in items:
+			for pos in self._positions(item):
+				data[pos >> 3] |= 1 << (pos & 7)
+
+	def __contains__(self, item):
+		data = self.data
+		return all(data[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+	@staticmethod
+	def query(text):
+		"""Trigramas a consultar en los filtros para buscar un texto
+
+		Args:
+			text: Texto (`str`) o lista de textos a buscar
+
+		Return:
+			list: Trigramas de cada texto o `None` si los filtros no permiten
+			descartar contenedores (expresiones regulares o textos de menos de 3
+			caracteres)
+		"""
+		texts = [text] if isinstance(text, str) else text
+		if not isinstance(texts, (list, tuple, set, frozenset)):
+			return None
+		if not all(isinstance(t, str) and len(t) >= 3 for t in texts):
+			return None
+
+		query = []
+		for t in texts:
+			try:
+				query.append(trigrams(t.encode("latin1")))
+			except UnicodeEncodeError:
+				# Las páginas solo tienen caracteres latin1
+				pass
+		return query
+
+	def may_contain(self, query):
+		"""Indica si el texto de origen puede contener alguno de los textos de
+		una consulta (todos sus trigramas están en el filtro)
+
+		Args:
+			query (list): Trigramas de cada texto (ver :py:meth:`query`)
+
+		Return:
+			bool: False si seguro no contiene ninguno
+		"""
+		return any(all(t in self for t in q) for q in query)
+
+	def dump(self):
+		"""Retorna el filtro en bytes"""
+		return struct.pack(self._header_fmt, self._magic, self.hashes, self.bits) + bytes(self.data)
+
+	@classmethod
+	def load(cls, data, offset=0):
+		"""Recupera un filtro salvado con :py:meth:`dump`
+
+		Args:
+			data (bytes): Datos que contienen el filtro
+			offset (int): Posición del filtro en los datos
+
+		Return:
+			:class:`openerm.BloomFilter` o `None` si no hay un filtro en la posición
+		"""
+		header_len = struct.calcsize(cls._header_fmt)
+		if len(data) - offset < header_len:
+			return None
+
+		magic, hashes, bits = struct.unpack_from(cls._header_fmt, data, offset)
+		if magic != cls._magic:
+			return None
+
+		start = offset + header_len
+		return cls(bits, hashes, data[start:start + (bits + 7) // 8])
+
+
+def container_filter(var_data):
+	"""Filtro de Bloom salvado en los datos variables del bloque de un
+	contenedor de páginas, a continuación de la tabla de longitudes de las
+	páginas (ver :py:meth:`openerm.PageContainer.dump`)
+
+	Args:
+		var_data (bytes): Datos variables del bloque del contenedor
+
+	Return:
+		:class:`openerm.BloomFilter` o `None` si el contenedor no tiene filtro
+	"""
+	if not var_data:
+		return None
+	page_count = struct.unpack_from(">H", var_data)[0]
+	return BloomFilter.load(var_data, 2 + 4 * page_count)
@@ -188,7 +188,7 @@ class Cipher(object):
 		return enc
 
 	def _decode_fernet(self, enc):
-		return self._fernet.decrypt(enc)
+		return self._fernet.decrypt(bytes(enc))
 
 	def _encode_spritz(self, clear):
 		return bytes(self.spritz.encrypt(bytearray(self.key.encode("utf-8")), bytearray(clear)))
@@ -127,12 +127,12 @@ class Compressor(object):
 						2: (self._bz2_compress,					bz2.decompress,						_("BZIP level={0} (1-9)").format(self._levels[2][level])),
 						3: (self._lzma_compress,				lzma.decompress,					_("LZMA preset={0} (0-9) ").format(self._levels[3][level])),
 						4: (self._lz4_compress, 				lz4.frame.decompress,				_("LZ4 nivel estándar")),
-						5: (self._pylzma_compress,				pylzma.decompress,					_("pyLZMA quality={0} (0-2)").format(self._levels[5][level])),
+						5: (self._pylzma_compress,				self._pylzma_decompress,					_("pyLZMA quality={0} (0-2)").format(self._levels[5][level])),
 						6: (self._blosc_compress,				blosc.decompress,					_("BLOSC blosclz clevel={0} (1-9)").format(self._levels[6][level])),
 						7: (snappy.compress,					snappy.decompress,					_("Snappy")),
-						8: (self._lzo_compress,					lzo.decompress,						_("Lzo level={0} (1-9)").format(self._levels[8][level])),
+						8: (self._lzo_compress,					self._lzo_decompress,						_("Lzo level={0} (1-9)").format(self._levels[8][level])),
 						9: (self._brotli_best_compress,			brotli.decompress,					_("Brotli quality={0} (1-11)").format(self._levels[9][level])),
-						10: (self._zstd_compress,				zstd.decompress,					_("zstd level={0} (1-22)").format(self._levels[10][level]))
+						10: (self._zstd_compress,				self._zstd_decompress,					_("zstd level={0} (1-22)").format(self._levels[10][level]))
 					}
 
 		self.__compression_type = compress_type
@@ -260,7 +260,8 @@ class Compressor(object):
 		"""Descomprime un conjunto de bytes
 
 		Args:
-			data: (bytes) conjunto de bytes comprimidos
+			data: (bytes) conjunto de bytes comprimidos, puede ser cualquier
+				objeto "bytes-like" (por ejemplo un `memoryview`)
 
 		Returns:
 			bytes descomprimidos.
@@ -318,6 +319,23 @@ class Compressor(object):
 	def _plain_data_decompress(data):
 		return data
 
+	@staticmethod
+	def _as_bytes(data):
+		"""Algunas librerías solo aceptan `bytes` y no cualquier objeto "bytes-like"."""
+		return data if isinstance(data, bytes) else bytes(data)
+
+	@staticmethod
+	def _pylzma_decompress(data):
+		return pylzma.decompress(Compressor._as_bytes(data))
+
+	@staticmethod
+	def _lzo_decompress(data):
+		return lzo.decompress(Compressor._as_bytes(data))
+
+	@staticmethod
+	def _zstd_decompress(data):
+		return zstd.decompress(Compressor._as_bytes(data))
+
 	@staticmethod
 	def _lz4_compress(data):
 		"""Compresión Lz4
@@ -56,6 +56,12 @@ load:
 					required: true
 					anyof:
 						- {max: 1024,  min: 1}
+				mmap:
+					required: false
+					type: boolean
+				translate:
+					required: false
+					type: boolean
 		output:
 			type: dict
 			allow_unknown: true
@@ -85,7 +91,35 @@ load:
 					required: true
 					type: integer
 					anyof:
-						- {max: 100,  min: 1}
+						- {max: 65535,  min: 1}
+				container-size:
+					required: false
+					type: integer
+					min: 0
+				min-pages-in-group:
+					required: false
+					type: integer
+					min: 1
+				workers:
+					required: false
+					type: integer
+					min: 0
+				queue-depth:
+					required: false
+					type: integer
+					min: 0
+				checkpoint-interval:
+					required: false
+					type: integer
+					min: 0
+				text-index:
+					required: false
+					type: boolean
+				bloom-fpr:
+					required: false
+					type: number
+					min: 0
+					max: 0.5
 		process:
 			type: dict
 			allow_unknown: true
@@ -96,6 +130,14 @@ load:
 				report-cfg:
 					type: string
 					required: true
+				match-workers:
+					required: false
+					type: integer
+					min: 0
+				match-batch-size:
+					required: false
+					type: integer
+					min: 1
 paths:
 	type: dict
 """
@@ -169,6 +211,22 @@ class LoadConfig(Config):
 	"""
 	Clase base para el manejo de la configuración del proceso de carga.
 	"""
+
+	#: Valores por defecto de los parámetros opcionales de la sección "load"
+	defaults = {
+		"workers": 0,
+		"queue_depth": 0,
+		"container_size": 0,
+		"min_pages_in_group": 1,
+		"checkpoint_interval": 1000,
+		"text_index": False,
+		"bloom_fpr": 0,
+		"match_workers": 0,
+		"match_batch_size": 100,
+		"mmap": False,
+		"translate": False
+	}
+
 	def __init__(self, configfile):
 
 		try:
@@ -176,6 +234,9 @@ class LoadConfig(Config):
 		except ConfigLoadingException:
 			raise
 		else:
+			for k, v in self.defaults.items():
+				setattr(self, k, v)
+
 			for d in self.dictionary.get("load", {}).values():
 				for k, v in d.items():
 					setattr(self, k.replace("-", "_"), v)
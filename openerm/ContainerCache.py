@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# ContainerCache.py
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+"""
+ContainerCache
+==============
+
+Cache LRU de contenedores de páginas ya descomprimidos (y descifrados) de un
+:class:`openerm.Database`. La comparten todos los :class:`openerm.Report` del
+Database, de modo que volver a una página ya leída no requiere descomprimir
+nuevamente su contenedor.
+
+.. seealso::
+	* :class:`openerm.Database`
+	* :class:`openerm.PageContainer`
+
+"""
+
+try:
+	import sys
+	import gettext
+	from gettext import gettext as _
+	gettext.textdomain('openerm')
+
+	from collections import OrderedDict
+
+except ImportError as err:
+	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
+	print(_("No fue posible importar el modulo: %s") % modulename)
+	sys.exit(-1)
+
+
+class ContainerCache(object):
+	"""Cache LRU de objetos :class:`openerm.PageContainer` indexados por el
+	offset del contenedor en el Database. El límite de la cache es la suma
+	del tamaño sin comprimir de las páginas de los contenedores.
+
+	Args:
+		max_size (int): Tamaño máximo en bytes de la cache, 0 la deshabilita
+
+	Example:
+		>>> from openerm.ContainerCache import ContainerCache
+		>>> from openerm.PageContainer import PageContainer
+		>>> cache = ContainerCache(1024)
+		>>> p = PageContainer(10)
+		>>> p.add("Pagina de una sola linea")
+		>>> cache.put(1234, p)
+		>>> cache.get(1234) is p
+		True
+		>>> print(cache)
+		[ContainerCache] Contenedores: 1 Bytes: 24/1024 Hits: 1 Misses: 0 Evictions: 0
+	"""
+	def __init__(self, max_size=0):
+
+		self.max_size	= max_size
+		self.size		= 0				#: Bytes de las páginas en cache
+		self.hits		= 0				#: Consultas resueltas desde la cache
+		self.misses		= 0				#: Consultas no resueltas
+		self.evictions	= 0				#: Contenedores descartados por falta de espacio
+		self._items		= OrderedDict()
+
+	def __len__(self):
+		return len(self._items)
+
+	def __str__(self):
+		return _("[ContainerCache] Contenedores: {0} Bytes: {1}/{2} Hits: {3} Misses: {4} Evictions: {5}").format(
+					len(self._items), self.size, self.max_size, self.hits, self.misses, self.evictions)
+
+	def get(self, offset):
+		"""Retorna un contenedor de la cache
+
+		Args:
+			offset (int): Offset del contenedor en el Database
+
+		Return:
+			:class:`openerm.PageContainer` o `None` si no está en la cache
+		"""
+		pagecontainer = self._items.get(offset)
+		if pagecontainer is None:
+			self.misses += 1
+			return None
+
+		self._items.move_to_end(offset)
+		self.hits += 1
+		return pagecontainer
+
+	def put(self, offset, pagecontainer):
+		"""Agrega un contenedor a la cache, descartando los menos usados
+		recientemente si se supera el tamaño máximo. Los contenedores más
+		grandes que la cache completa no se guardan.
+
+		Args:
+			offset (int): Offset del contenedor en el Database
+			pagecontainer (:class:`openerm.PageContainer`): Contenedor ya cargado
+		"""
+		if pagecontainer.size > self.max_size:
+			return
+
+		old = self._items.pop(offset, None)
+		if old is not None:
+			self.size -= old.size
+
+		self._items[offset] = pagecontainer
+		self.size += pagecontainer.size
+
+		while self.size > self.max_size:
+			_, old = self._items.popitem(last=False)
+			self.size -= old.size
+			self.evictions += 1
+
+	def clear(self):
+		"""Vacía la cache (los contadores se mantienen)"""
+		self._items.clear()
+		self.size = 0
@@ -37,15 +37,22 @@ try:
 	from gettext import gettext as _
 	gettext.textdomain('openerm')
 
+	import os
 	import sys
 	import struct
 	import datetime
+	import mmap
+	from collections import deque
+	from concurrent.futures import ProcessPoolExecutor
 
 	from openerm.Reports import Reports
 	from openerm.Block import Block
 	from openerm.PageContainer import PageContainer
 	from openerm.MetadataContainer import MetadataContainer
 	from openerm.Index import Index
+	from openerm.ContainerCache import ContainerCache
+	from openerm.TextIndex import TextIndex, trigrams
+	from openerm.BloomFilter import BloomFilter
 	from openerm.Utils import file_accessible
 
 except ImportError as err:
@@ -54,6 +61,44 @@ except ImportError as err:
 	sys.exit(-1)
 
 
+#: Bloques (:class:`openerm.Block`) de cada proceso del pool de escritura
+_worker_blocks = {}
+
+
+def _dump_block(settings, tipo_bloque, data, variable_data=None, bloom_fpr=0, with_trigrams=False):
+	"""Compresión y cifrado de un bloque dentro de un proceso del pool de
+	escritura. Cada proceso construye una única vez el :class:`openerm.Block`
+	para una configuración dada (la inicialización de algunos cifrados es
+	costosa).
+
+	Args:
+		settings (tuple): (compress_method, compress_level, encription_method)
+		tipo_bloque (int): Tipo de bloqe (1: metadatos, 2: páginas)
+		data (bytes): Bytes de los datos a salvar
+		variable_data (bytes): (opcional) Datos adicionales no comprimibles
+		bloom_fpr (float): (opcional) Agrega a los datos adicionales el filtro
+			de Bloom de los datos con esta tasa de falsos positivos
+		with_trigrams (bool): (opcional) Retornar también los trigramas de los
+			datos (para el :class:`openerm.TextIndex`)
+
+	Return:
+		bytes: Bloque listo para salvar en el archivo o (bloque, trigramas)
+		si `with_trigrams`. Los trigramas se calculan una sola vez para el
+		filtro de Bloom y el índice de texto
+	"""
+	block = _worker_blocks.get(settings)
+	if block is None:
+		block = Block(*settings)
+		_worker_blocks[settings] = block
+
+	ctrigrams = trigrams(data) if bloom_fpr or with_trigrams else None
+	if bloom_fpr:
+		variable_data += BloomFilter.from_trigrams(ctrigrams, bloom_fpr).dump()
+
+	cblock = block.dump(tipo_bloque, data, variable_data)
+	return (cblock, ctrigrams) if with_trigrams else cblock
+
+
 class Database(object):
 	"""Clase base para el manejo de un contenedor de reportes OERM
 
@@ -63,38 +108,108 @@ class Database(object):
 	Args:
 		file (string): Nombre del archivo físicos
 		mode (string): Modo  'wb', 'ab' o 'rb' (Default: "rb")
+		mmap (bool): En modo 'rb' mapea el archivo en memoria y los bloques se
+			leen directamente del mapa, sin llamadas al sistema ni copias
+			intermedias (Default: False)
+		lazy_index (bool): En modo 'rb' lee solo el índice de reportes, los
+			contenedores de cada reporte se leen del índice cuando se accede a
+			sus páginas (Default: False)
+		cache_size (int): Tamaño máximo en bytes (sin comprimir) de la cache
+			de contenedores de páginas compartida por todos los reportes,
+			0 la deshabilita (Default: 16 MB)
 		default_compress_method (int): Algoritmo default de compresion
 		default_compress_level (int): Nivel de compresión 0=mínimo, 1=normal, 2=máximo. Por defecto: 1.
 		default_encription_method (int): Algoritmo de encriptación
-		pages_in_container (int): Cantidad de páginas por contenedor
+		pages_in_container (int): Cantidad de páginas por contenedor. Si se
+			usa `container_size` es la cantidad máxima de páginas por contenedor
+		container_size (int): Tamaño objetivo en bytes (sin comprimir) de los
+			contenedores de páginas (Default: 0, contenedores de
+			`pages_in_container` páginas)
+		min_pages_in_container (int): Cantidad mínima de páginas por
+			contenedor cuando se usa `container_size` (Default: 1)
+		workers (int): Cantidad de procesos para comprimir y cifrar los
+			contenedores de páginas en paralelo o, en modo 'rb', para las
+			búsquedas de texto (Default: 0, sin paralelismo)
+		queue_depth (int): Cantidad máxima de bloques pendientes de escritura
+			cuando se usa `workers` (Default: 2 x workers)
+		text_index (bool): En modo 'wb' o 'ab' genera el índice de texto
+			(:class:`openerm.TextIndex`) de los contenedores de páginas que se
+			agregan. En modo 'rb' el índice se usa siempre que exista
+			(Default: False)
+		checkpoint_interval (int): En modo 'wb' o 'ab' cantidad de contenedores
+			de páginas luego de la cual se hace un :py:meth:`checkpoint`, 0 solo
+			al cerrar el Database (Default: 1000)
+		bloom_fpr (float): En modo 'wb' o 'ab' tasa de falsos positivos (por
+			trigrama) de los filtros de Bloom (:class:`openerm.BloomFilter`) que
+			se salvan en cada contenedor de páginas, 0 no los genera. Las
+			búsquedas de texto descartan sin descomprimirlos los contenedores
+			cuyo filtro no tiene los trigramas buscados (Default: 0)
 
 	Example:
 		>>> from openerm.Database import Database
 		>>> # Apertura en modo lectura
 		>>> dbin = Database(file = "out/.sin_compression_sin_encriptacion.oerm")
+		>>> # Apertura en modo lectura con el archivo mapeado en memoria
+		>>> dbin = Database(file = "out/.sin_compression_sin_encriptacion.oerm", mmap=True)
 		>>> # Apertura en modo escritura (NO append)
 		>>> dbout = Database(file = "out/.sin_compression_sin_encriptacion.oerm", mode="wb")
+		>>> # Escritura con compresión en 4 procesos
+		>>> dbout = Database(file = "out/zstd.oerm", mode="wb", default_compress_method=10, workers=4)
+
+	.. note::
+		Con `workers` > 0 los contenedores se comprimen y cifran en un pool
+		de procesos, un escritor ordenado agrega los bloques al archivo y
+		registra los offsets en el :class:`openerm.Index` en la misma
+		secuencia en que fueron generados, por lo que el archivo resultante
+		es idéntico al de la escritura secuencial.
+
+		Los índices se escriben en forma incremental: cada checkpoint agrega
+		solo los contenedores y reportes nuevos (ver :class:`openerm.Index`),
+		por lo que cerrar un Database abierto en modo 'ab' no depende del
+		tamaño de lo ya cargado y una caída conserva lo salvado hasta el
+		último checkpoint.
 	"""
 	def __init__(self, file="prueba.oerm",
 						mode="rb",
 						default_compress_method=1,
 						default_compress_level=1,
 						default_encription_method=0,
-						pages_in_container=10):
+						pages_in_container=10,
+						container_size=0,
+						min_pages_in_container=1,
+						workers=0,
+						queue_depth=None,
+						checkpoint_interval=1000,
+						text_index=False,
+						bloom_fpr=0,
+						mmap=False,
+						lazy_index=False,
+						cache_size=16*1024*1024):
 
 		self.default_compress_method	= default_compress_method
 		self.default_compress_level		= default_compress_level
 		self.default_encription_method	= default_encription_method
 		self.pages_in_container			= pages_in_container
+		self.container_size				= container_size
+		self.min_pages_in_container		= min_pages_in_container
+		self.workers					= workers
+		self.queue_depth				= queue_depth if queue_depth else 2 * workers
+		self.checkpoint_interval		= checkpoint_interval
+		self.bloom_fpr					= bloom_fpr
 
 		self.flush_pages				= False
 		self.current_page				= ""
 		self._filename					= file
 		self._file						= None
 		self.mode						= mode
+		self.use_mmap					= mmap
+		self.lazy_index					= lazy_index
+		self._mmap						= None
 		self.current_page				= 0
 
 		self.current_report				= 1
+		self.report_pages				= {}		#: Páginas agregadas a cada reporte (incluso las aún no salvadas)
+		self._key_range					= None		# (mínimo, máximo) del campo clave de las páginas del contenedor en curso
 
 		self.block						= Block(default_compress_method=default_compress_method,
 												default_compress_level=default_compress_level,
@@ -102,8 +217,15 @@ class Database(object):
 										)
 		self.pcontainer					= PageContainer(self.pages_in_container)
 		self.Index						= Index(self._filename)
+		self.cache						= ContainerCache(cache_size)
+		self.TextIndex					= TextIndex(self._filename) if text_index else None
 		self.hasflush					= False
 
+		self._block_settings			= (default_compress_method, default_compress_level, default_encription_method)
+		self._pool						= None
+		self._search_executor			= None
+		self._pending					= deque()
+
 		if not file_accessible(self._filename, "r"):
 			self.mode = "wb"
 
@@ -111,14 +233,26 @@ class Database(object):
 
 	def _open_file(self):
 
+		if self.mode in ["wb", "ab"] and self.workers > 0:
+			self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
 		if self.mode == "wb":
 			self._file	= open(self._filename, mode=self.mode)
 			self._write_magicnumber()
+			self.Index.begin("wb")
+			if self.TextIndex:
+				self.TextIndex.begin("wb")
+			elif TextIndex.exists(self._filename):
+				# Índice de texto de un Database anterior con el mismo nombre
+				os.remove(TextIndex(self._filename).textidx_file)
 		else:
 			if self.mode == "ab":
 				self._file	= open(self._filename, mode=self.mode)
 				self._file.seek(0, 2)
 				self.Index.read()
+				self.Index.begin("ab")
+				if self.TextIndex:
+					self.TextIndex.begin("ab")
 			else:
 				self._file = open(self._filename, mode="rb")
 				struct_fmt	= ">4sB"
@@ -132,7 +266,13 @@ class Database(object):
 				if magic_number != "oerm":
 					raise ValueError(_('{0} no es un archivo oerm válido!').format(self._filename))
 
-				self.Index.read()
+				if self.use_mmap:
+					self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+				self.Index.read(lazy=self.lazy_index)
+				if TextIndex.exists(self._filename):
+					self.TextIndex = TextIndex(self._filename)
+					self.TextIndex.read()
 
 	def get_report(self, reporte):
 		"""Retorna el id de un Reporte
@@ -150,7 +290,12 @@ class Database(object):
 			Documentación pendiente
 
 		"""
+		if self.hasflush:
+			self.flush()
+
 		self.current_report = self.Index.get_report(reporte)
+		self.report_pages.setdefault(self.current_report, self.Index.report_pages.get(self.current_report, 0))
+		self.hasflush = True
 
 	def add_report(self, reporte="n/a", sistema="n/a", aplicacion="n/a", departamento="n/a", fecha=datetime.datetime.now().strftime("%Y%m%d")):
 		"""
@@ -176,19 +321,35 @@ class Database(object):
 		data	= MetadataContainer(metadata).dump()
 		cblock	= self.block.dump(1, data)
 
-		self.current_report = self.Index.add_report(reporte, self._file.tell(), self.pages_in_container)
+		if self._pool:
+			# El offset se conoce recién cuando el escritor salva el bloque
+			self.current_report = self.Index.add_report(reporte, None, self.pages_in_container, metadata)
+			self._pending.append((1, self.current_report, cblock, 0, 0, False, None))
+			self._write_pending()
+		else:
+			self.current_report = self.Index.add_report(reporte, self._file.tell(), self.pages_in_container, metadata)
+			self._file.write(cblock)
 
-		self._file.write(cblock)
+		self.report_pages[self.current_report] = 0
 		self.hasflush = True
 
-	def add_page(self, page):
+	def add_page(self, page, keys=None):
 		"""
 		Agregar una página al reporte
 
-		.. warning::
-			Documentación pendiente
+		Args:
+			page (string): Texto de la página
+			keys (list): (opcional) Valores del campo clave de la página. El
+				índice registra el mínimo y el máximo de cada contenedor (zone
+				map, ver :py:meth:`openerm.Report.find_key`)
 
+		Return:
+			int: Número de la página en el reporte
 		"""
+		if self.container_size and self.pcontainer.page_count >= self.min_pages_in_container and \
+			self.pcontainer.size + len(page) > self.container_size:
+			self.flush()
+
 		try:
 			self.pcontainer.add(page)
 
@@ -196,12 +357,25 @@ class Database(object):
 			self.flush()
 			self.pcontainer.add(page)
 
-	def find_text(self, text, reports=None):
+		if keys:
+			minimo, maximo = min(keys), max(keys)
+			if self._key_range is not None:
+				minimo, maximo = min(minimo, self._key_range[0]), max(maximo, self._key_range[1])
+			self._key_range = (minimo, maximo)
+
+		pagenum = self.report_pages.get(self.current_report, 0) + 1
+		self.report_pages[self.current_report] = pagenum
+		return pagenum
+
+	def find_text(self, text, reports=None, workers=None):
 		"""Búsqueda de un texto dentro de uno o más reportes
 
 		Args:
-			text (string): Patrón de texto a buscar
+			text: Texto, lista de textos o expresión regular compilada a buscar
+				(ver :py:meth:`openerm.Report.find_text`)
 			reports (list): Lista de reportes dónde buscar o None en todos
+			workers (int): Cantidad de procesos para buscar en paralelo, cada
+				uno con su propio archivo abierto (Default: `workers` del Database)
 
 		Example:
 			>>> from openerm.Database import Database
@@ -212,14 +386,33 @@ class Database(object):
 		Return:
 			Lista de reportes y páginas
 		"""
-		reports = reports or []
-		matches = []
-		for r in [r for r in self.reports() if r.id in reports or not reports]:
-			lista = r.find_text(text)
-			if lista:
-				matches.extend(lista)
+		return self.reports().find_text(text, reports, workers)
+
+	def iter_find_text(self, text, reports=None, limit=None, pages=None, with_sample=True, workers=None):
+		"""Búsqueda de un texto dentro de uno o más reportes, generando las
+		ocurrencias a medida que se encuentran (ver :py:meth:`openerm.Reports.iter_find_text`)
+
+		Example:
+			>>> from openerm.Database import Database
+			>>> db = Database(file = "out/.sin_compression_sin_encriptacion.oerm")
+			>>> next(db.iter_find_text("IWY3", limit=1))
+			(2, 10, 991, 'AGH8B2NULTCTJ0L-[IWY3]-4K6D8RRBYCRQCH')
+
+		Return:
+			generator: Ocurrencias, ver :py:meth:`openerm.Report.find_text`
+		"""
+		return self.reports().iter_find_text(text, reports, limit, pages, with_sample, workers)
+
+	def _search_pool(self, workers):
+		"""Pool de procesos de búsqueda, se crea en la primer búsqueda en
+		paralelo y se mantiene hasta cerrar el Database. Es distinto del pool
+		de escritura (`_pool`), que puede tener bloques pendientes"""
+		if self._search_executor is None or self._search_executor._max_workers != workers:
+			if self._search_executor is not None:
+				self._search_executor.shutdown()
+			self._search_executor = ProcessPoolExecutor(max_workers=workers)
 
-		return matches
+		return self._search_executor
 
 	def _write_magicnumber(self):
 
@@ -237,12 +430,71 @@ class Database(object):
 
 		"""
 		data, var_data	= self.pcontainer.dump()
-		cblock			= self.block.dump(2, data, var_data)
 
-		self.Index.add_container(self.current_report, self._file.tell())
+		if self._pool:
+			future		= self._pool.submit(_dump_block, self._block_settings, 2, data, var_data, self.bloom_fpr, self.TextIndex is not None)
+			self._pending.append((2, self.current_report, future, self.pcontainer.page_count, self.pcontainer.size, self.TextIndex is not None, self._key_range))
+			self._write_pending()
+		else:
+			ctrigrams		= trigrams(data) if self.TextIndex or self.bloom_fpr else None
+			if self.bloom_fpr:
+				var_data	+= BloomFilter.from_trigrams(ctrigrams, self.bloom_fpr).dump()
+			cblock			= self.block.dump(2, data, var_data)
+			if self.TextIndex:
+				self.TextIndex.add_container(self._file.tell(), ctrigrams)
+			self.Index.add_container(self.current_report, self._file.tell(), self.pcontainer.page_count, len(cblock), self.pcontainer.size, self._key_range)
+			self._file.write(cblock)
 
-		self._file.write(cblock)
 		self.pcontainer.clear()
+		self._key_range = None
+
+		if self.checkpoint_interval and self.Index.pending_containers >= self.checkpoint_interval:
+			self.checkpoint()
+
+	def checkpoint(self):
+		"""Salva los bloques pendientes, los sincroniza a disco y agrega al
+		índice los contenedores y reportes nuevos. Luego de un checkpoint los
+		datos salvados hasta el momento se pueden leer aún si el proceso no
+		llega a cerrar el Database. El contenedor de páginas en curso no se
+		salva.
+		"""
+		if self._pool:
+			self._write_pending(0)
+
+		self._file.flush()
+		os.fsync(self._file.fileno())
+		if self.TextIndex:
+			self.TextIndex.checkpoint()
+		self.Index.checkpoint()
+
+	def _write_pending(self, depth=None):
+		"""Escritor ordenado de los bloques generados por el pool. Salva los
+		bloques pendientes en el mismo orden en que fueron encolados, esperando
+		por el más antiguo solo si la cola supera `depth` elementos.
+
+		Args:
+			depth (int): Cantidad máxima de bloques que pueden quedar pendientes
+				(Default: queue_depth)
+		"""
+		depth = self.queue_depth if depth is None else depth
+
+		while self._pending:
+			tipo_bloque, report_id, cblock, page_count, size, with_trigrams, key_range = self._pending[0]
+			if hasattr(cblock, "result"):
+				if len(self._pending) <= depth and not cblock.done():
+					break
+				cblock = cblock.result()
+
+			self._pending.popleft()
+			if tipo_bloque == 1:
+				self.Index.set_report_offset(report_id, self._file.tell())
+			else:
+				if with_trigrams:
+					cblock, ctrigrams = cblock
+					self.TextIndex.add_container(self._file.tell(), ctrigrams)
+				self.Index.add_container(report_id, self._file.tell(), page_count, len(cblock), size, key_range)
+
+			self._file.write(cblock)
 
 	def close(self):
 		"""
@@ -254,9 +506,24 @@ class Database(object):
 		"""
 		if self.mode in ["wb", "ab"]:
 			self.flush()
+			self.checkpoint()
+			if self._pool:
+				self._pool.shutdown()
+				self._pool = None
+			if self._search_executor:
+				self._search_executor.shutdown()
+				self._search_executor = None
 			self._file.close()
-			self.Index.write()
+			if self.TextIndex:
+				self.TextIndex.close()
+			self.Index.close()
 		else:
+			if self._search_executor:
+				self._search_executor.shutdown()
+				self._search_executor = None
+			if self._mmap is not None:
+				self._mmap.close()
+				self._mmap = None
 			self._file.close()
 
 	def __str__(self):
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# FieldIndex.py
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+"""
+FieldIndex
+==========
+
+Índice de campos de los reportes de un repositorio. Durante la carga
+(:class:`openerm.LoadProcess`) se extraen de cada página los campos definidos
+para el reporte en la configuración de reportes (ver
+:class:`openerm.ReportMatcher`), mediante las mismas "cajas" de
+coordenadas que se usan para identificar los reportes, y se registra
+(campo, valor) -> (database, reporte, página) en una base sqlite
+(**fields.db**) junto al repo.db del repositorio. Una búsqueda puntual se
+resuelve con el índice y solo requiere leer el contenedor de la página.
+
+Ejemplo de configuración:
+
+.. code-block:: yaml
+
+	Reports:
+		"L80001 - CLIENTES - PERSONA NATURAL":
+			match:
+				L80001: [2, 3, 1, 8]
+			fields:
+				codigo: [7, 200, 1, 6]
+				documento: [7, 200, 77, 85]
+
+.. seealso::
+	* :class:`openerm.ReportMatcher`
+	* :class:`openerm.OermClient`
+
+"""
+
+try:
+	import gettext
+	from gettext import gettext as _
+	gettext.textdomain('openerm')
+
+	import os
+	import sys
+	import sqlite3
+
+except ImportError as err:
+	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
+	print(_("No fue posible importar el modulo: %s") % modulename)
+	sys.exit(-1)
+
+
+class FieldExtractor(object):
+	"""Extracción de los campos de las páginas de los reportes
+
+	Args:
+		fields (dict): Reporte -> {campo: [línea desde, línea hasta, columna desde, columna hasta]}.
+			Las líneas y columnas comienzan en 1 y los rangos incluyen ambos extremos
+
+	Example:
+		>>> from openerm.FieldIndex import FieldExtractor
+		>>> e = FieldExtractor({"L80001": {"codigo": [2, 3, 1, 6]}})
+		>>> e.extract("L80001", "Titulo\\n107161 Abregu\\n113171 Acuña\\n")
+		[('codigo', '107161'), ('codigo', '113171')]
+	"""
+	def __init__(self, fields):
+
+		self.fields = {reporte: [(campo, box) for campo, box in campos.items()]
+						for reporte, campos in fields.items() if campos}
+
+	def __bool__(self):
+		return bool(self.fields)
+
+	def extract(self, reporte, page):
+		"""Retorna los valores de los campos de una página
+
+		Args:
+			reporte (string): Nombre del reporte
+			page (string): Texto de la página
+
+		Return:
+			list: (campo, valor) distintos, sin los valores vacíos
+		"""
+		campos = self.fields.get(reporte)
+		if not campos:
+			return []
+
+		lines		= page.split("\n")
+		resultado	= []
+		vistos		= set()
+		for campo, (desde, hasta, col_desde, col_hasta) in campos:
+			for line in lines[desde - 1:hasta]:
+				valor = line[col_desde - 1:col_hasta].strip()
+				if valor and (campo, valor) not in vistos:
+					vistos.add((campo, valor))
+					resultado.append((campo, valor))
+
+		return resultado
+
+
+class FieldIndex(object):
+	"""Índice (sqlite) de los campos de los reportes de un repositorio
+
+	Args:
+		path (string): Carpeta del repositorio, el índice es el archivo **fields.db**
+
+	Example:
+		>>> from openerm.FieldIndex import FieldIndex
+		>>> idx = FieldIndex("/var/repo1")
+		>>> idx.add("database.oerm", 1, "L80001", 3, [("codigo", "107161")])
+		>>> idx.close()
+		>>> FieldIndex("/var/repo1").lookup("codigo", "107161")
+		[('/var/repo1/database.oerm', 1, 'L80001', 3)]
+	"""
+
+	#: Cantidad de registros que se acumulan antes de salvarlos
+	batch_size = 10000
+
+	def __init__(self, path):
+
+		self.path		= path
+		self.filename	= os.path.join(path, "fields.db")
+		self._conn		= None
+		self._pending	= []
+
+	@staticmethod
+	def exists(path):
+		"""Indica si un repositorio tiene índice de campos"""
+		return os.path.isfile(os.path.join(path, "fields.db"))
+
+	def _connect(self):
+		if self._conn is None:
+			self._conn = sqlite3.connect(self.filename)
+			c = self._conn.cursor()
+			c.execute("CREATE TABLE IF NOT EXISTS fields (field text, value text, database text, report_id int, report_name text, page int)")
+			c.execute("CREATE INDEX IF NOT EXISTS fields_field_value ON fields (field, value)")
+			c.close()
+		return self._conn
+
+	def add(self, database, report_id, reporte, page, values):
+		"""Registra los campos de una página
+
+		Args:
+			database (string): Path del database, relativo al repositorio
+			report_id (int): Id del reporte en el database
+			reporte (string): Nombre del reporte
+			page (int): Número de página en el reporte
+			values (list): (campo, valor) de la página (ver :py:meth:`FieldExtractor.extract`)
+		"""
+		self._pending.extend((campo, valor, database, report_id, reporte, page) for campo, valor in values)
+		if len(self._pending) >= self.batch_size:
+			self.commit()
+
+	def commit(self):
+		"""Salva los registros pendientes"""
+		if not self._pending:
+			return
+
+		conn = self._connect()
+		conn.executemany("INSERT INTO fields (field, value, database, report_id, report_name, page) VALUES (?,?,?,?,?,?)", self._pending)
+		conn.commit()
+		self._pending = []
+
+	def close(self):
+		"""Salva los registros pendientes y cierra el índice"""
+		self.commit()
+		if self._conn is not None:
+			self._conn.close()
+			self._conn = None
+
+	def lookup(self, field, value, reporte=None):
+		"""Páginas donde un campo tiene un valor
+
+		Args:
+			field (string): Nombre del campo
+			value (string): Valor exacto del campo
+			reporte (string): (Opcional) Nombre del reporte (búsqueda parcial tipo LIKE en sql)
+
+		Return:
+			list: (path del database, id del reporte, nombre del reporte, página)
+		"""
+		SQL = """
+		Select	database, report_id, report_name, page
+		From	fields
+		where	field = ?
+				and value = ?
+				and report_name like ?
+		order by database, report_id, page
+		"""
+		c = self._connect().cursor()
+		c.execute(SQL, (field, value, '%' if reporte is None else '%' + reporte + '%'))
+		resultado = [(os.path.normpath(os.path.join(self.path, database)), report_id, report_name, page)
+						for database, report_id, report_name, page in c.fetchall()]
+		c.close()
+		return resultado
@@ -26,8 +26,10 @@ try:
 	from gettext import gettext as _
 	gettext.textdomain('openerm')
 
+	import os
 	import struct
 	import sys
+	import json
 
 except ImportError as err:
 	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
@@ -36,87 +38,509 @@ except ImportError as err:
 
 
 class Index(object):
+	"""Índices de un :class:`openerm.Database`. Se representan físicamente por
+	dos archivos:
+
+		* **<database>**.ridx: índice de reportes
+		* **<database>**.cidx: índice de contenedores de páginas
+
+	Args:
+		oermdb_file (string): Nombre del archivo físico del Database
+
+	.. note::
+		Ambos archivos comienzan con una cabecera ``"oidx"`` + versión (5
+		bytes). Los archivos de la versión 1 no tienen cabecera y se siguen
+		pudiendo leer, al agregar datos se reescriben en la versión actual.
+
+		.. code-block:: none
+
+			Registro del índice de reportes (.ridx)
+
+			+====+========+=================+================+==================+
+			| Id | Nombre | Offset metadata | Páginas x cont.| Offset en .cidx  |
+			+====+========+=================+================+==================+
+			  L     50s           Q                H                 Q
+
+			+=========+==============+=================+==============+==========+==========+
+			| Páginas | Bytes compr. | Bytes sin compr.| Contenedores | Long.    | Metadata | --> Versión 4
+			+=========+==============+=================+==============+==========+==========+
+			   L            Q               Q                 L            L       JSON (long. variable)
+
+			Registro del índice de contenedores (.cidx)
+
+			+====+==================+===============+==========+
+			| Id | Offset en .oerm  | Primer página | Páginas  | --> Versión 4 (la 1 solo Id y Offset)
+			+====+==================+===============+==========+
+			  L          Q                 L            H
+
+		Cada contenedor registra el número de su primer página y su cantidad
+		de páginas, lo que permite contenedores con cantidades variables de
+		páginas (ver `container_size` en :class:`openerm.Database`).
+
+		Cada reporte registra su cantidad total de páginas, los bytes
+		comprimidos y sin comprimir de sus páginas y sus metadatos, de modo
+		que listar los reportes de un Database no requiere descomprimir ningún
+		bloque. Los datos desconocidos (reportes de índices de la versión 1)
+		se registran con longitud de metadatos 0 y bytes ``0xFFFFFFFFFFFFFFFF``.
+
+		Ambos archivos son de solo agregado: en cada "checkpoint" (ver
+		:py:meth:`checkpoint`) se agregan al .cidx los contenedores nuevos de
+		cada reporte modificado, en un tramo contiguo, y luego al .ridx un
+		registro del reporte con los totales actualizados, el offset del tramo
+		y su cantidad de contenedores. El último registro de un reporte define
+		sus totales, los metadatos se salvan solo en el primero. Un registro
+		incompleto al final del .ridx (una caída durante el checkpoint) se
+		descarta y los contenedores no referenciados por el .ridx se ignoran.
+		:py:meth:`write` reescribe los índices completos con un único tramo
+		por reporte (compactación). Como el .ridx registra los tramos de cada
+		reporte, en la lectura "lazy" (ver :py:meth:`read`) solo se lee el
+		.ridx y los contenedores de un reporte se recuperan cuando se
+		necesitan.
+
+		Opcionalmente (ver `keys` en :py:meth:`openerm.Database.add_page`)
+		se registran los "zone maps" de los contenedores: el valor mínimo y
+		máximo de un campo clave de sus páginas, en un tercer archivo
+		**<database>**.zidx, también de solo agregado, que se salva en cada
+		checkpoint antes que el .cidx. Comienza con una cabecera ``"ozmp"`` +
+		versión y luego un registro por contenedor:
+
+		.. code-block:: none
+
+			+====+==================+==============+==============+========+========+
+			| Id | Offset en .oerm  | Long. mínimo | Long. máximo | Mínimo | Máximo |
+			+====+==================+==============+==============+========+========+
+			  L          Q                 H              H         utf-8    utf-8
+	"""
+
+	#: Versión del formato de los índices que se escribe
+	version				= 4
+	_header_fmt			= ">4sB"
+	_report_fmt			= ">L50sQHQ"
+	_report_ext_fmt		= ">LQQLL"
+	_container_fmt		= ">LQLH"
+	_container_v1_fmt	= ">LQ"
+	_unknown_size		= 0xFFFFFFFFFFFFFFFF
+	_zone_fmt			= ">LQHH"
 
 	def __init__(self, oermdb_file):
 
 		self.oermdb_file			= oermdb_file
 		self.current_report_id		= 0
 		self.reports				= {}
+		self.report_names			= {}		#: Nombre (truncado) -> id del primer reporte con ese nombre
+		self.report_pages			= {}		#: Cantidad de páginas indexadas de cada reporte
+		self.report_sizes			= {}		#: [Bytes comprimidos, bytes sin comprimir] de cada reporte o None
+		self.report_metadata		= {}		#: Metadatos de cada reporte o None
 		self.reportidx_file			= "{0}.ridx".format(self.oermdb_file)
 		self.containeridx_file		= "{0}.cidx".format(self.oermdb_file)
+		self.zonemapidx_file		= "{0}.zidx".format(self.oermdb_file)
+		self.zone_maps				= {}		#: Id del reporte -> {offset del contenedor: (mínimo, máximo)}
 		self.metadata_objects 		= 0
 		self.container_objects 		= 0
+		self.file_version			= self.version	#: Versión de los índices leídos
+		self._unloaded				= set()		# Reportes cuyos contenedores aún no se leyeron
+		self._containers_runs		= {}		# Tramos (offset, contenedores) en .cidx de cada reporte no leído
+		self._dirty					= {}		# Contenedores de cada reporte aún no salvados en los índices
+		self._written				= set()		# Reportes con al menos un registro en el .ridx
+		self._ridx_end				= None		# Fin del último registro completo del .ridx
+		self._ridx					= None
+		self._cidx					= None
+		self._zones					= []		# Zone maps aún no salvados (id, offset, mínimo, máximo)
+		self._zidx_end				= None		# Fin del último registro completo del .zidx
 
 	def get_report(self, reporte):
 		"""Obtiene el id de un reporte en el índice"""
-		for k,r in self.reports.items():
-			if r[0] == reporte[0:50]:
-				return k
-		return None
+		return self.report_names.get(reporte[0:50])
 
-	def add_report(self, reporte, report_offset, pages_in_container):
+	def add_report(self, reporte, report_offset, pages_in_container, metadata=None):
 
 		self.current_report_id		+= 1
-		default						= (reporte[0:50], report_offset, pages_in_container, 0, [])
+		default						= (reporte[0:50], report_offset, pages_in_container, 0, [], [], [])
 		self.reports[self.current_report_id] = default
+		self.report_names.setdefault(default[0], self.current_report_id)
+		self.report_pages[self.current_report_id] = 0
+		self.report_sizes[self.current_report_id] = [0, 0]
+		self.report_metadata[self.current_report_id] = metadata
+		self._dirty[self.current_report_id] = []
 		return self.current_report_id
 
-	def add_container(self, reporte_id, container_offset):
+	def set_report_offset(self, reporte_id, report_offset):
+		"""Establece el offset del bloque de metadatos de un reporte, cuando
+		este se conoce recién al momento de salvar el bloque"""
+		report = self.reports[reporte_id]
+		self.reports[reporte_id] = (report[0], report_offset) + report[2:]
+		self._dirty.setdefault(reporte_id, [])
+
+	def add_container(self, reporte_id, container_offset, page_count, compressed_size=0, uncompressed_size=0, key_range=None):
+		"""Agrega un contenedor de páginas al reporte
 
+		Args:
+			reporte_id (int): Id del reporte
+			container_offset (int): Offset del contenedor en el Database
+			page_count (int): Cantidad de páginas del contenedor
+			compressed_size (int): Bytes del bloque del contenedor
+			uncompressed_size (int): Bytes sin comprimir de las páginas del contenedor
+			key_range (tuple): (opcional) Valor (mínimo, máximo) del campo clave
+				de las páginas del contenedor (zone map)
+		"""
+		if key_range is not None:
+			self.zone_maps.setdefault(reporte_id, {})[container_offset] = key_range
+			self._zones.append((reporte_id, container_offset) + tuple(key_range))
+
+		first_page = self.report_pages[reporte_id] + 1
 		self.reports[reporte_id][4].append(container_offset)
+		self.reports[reporte_id][5].append(first_page)
+		self.reports[reporte_id][6].append(page_count)
+		self.report_pages[reporte_id] += page_count
+		self._dirty.setdefault(reporte_id, []).append((container_offset, first_page, page_count))
+
+		sizes = self.report_sizes[reporte_id]
+		if sizes is not None:
+			sizes[0] += compressed_size
+			sizes[1] += uncompressed_size
+
+	@property
+	def pending_containers(self):
+		"""Cantidad de contenedores aún no salvados en los índices"""
+		return sum(len(c) for c in self._dirty.values())
+
+	def _pack_report(self, key, cidx_offset, containers, metadata):
+		"""Arma el registro de un reporte en el .ridx
+
+		Args:
+			key (int): Id del reporte
+			cidx_offset (int): Offset en el .cidx del (primer) tramo de contenedores
+			containers (int): Cantidad de contenedores del tramo
+			metadata (bool): Incluir los metadatos del reporte
+		"""
+		report		= self.reports[key]
+		sizes		= self.report_sizes[key] or [self._unknown_size, self._unknown_size]
+		metadata	= self.report_metadata[key] if metadata else None
+		metadata	= json.dumps(metadata).encode("utf-8") if metadata is not None else b""
+		data		= struct.pack(	self._report_fmt,
+									key,									# ID númerico del reporte en la base 1..n
+									report[0].encode("utf-8", "replace"),	# Nombre del reporte
+									report[1],								# Offset del bloque de metadatos del reporte en el contenedor
+									report[2],								# Cantidad de páginas esperadas en el contenedor de páginas
+									cidx_offset								# Offet al primer contenedores de página del reporte
+								)
+		ext			= struct.pack(	self._report_ext_fmt,
+									self.report_pages[key],					# Cantidad total de páginas del reporte
+									sizes[0],								# Bytes comprimidos de las páginas
+									sizes[1],								# Bytes sin comprimir de las páginas
+									containers,								# Cantidad de contenedores del tramo
+									len(metadata)							# Longitud de los metadatos
+								)
+
+		return data + ext + metadata
 
 	def write(self):
+		"""Reescribe los índices completos, con los contenedores de cada
+		reporte en un único tramo contiguo del .cidx"""
+		if self._zones:
+			self._write_zone_maps()
+		for key in list(self._unloaded):
+			self._load_containers(key)
+
+		header				= struct.pack(self._header_fmt, b"oidx", self.version)
+		container_len		= struct.calcsize(self._container_fmt)
 
 		# Salvar offset de los bloques de metadatos del reporte
-		struct_fmt			= ">L50sQHQ"
-		container_offsset 	= 0
+		container_offsset 	= len(header)
 		with open(self.reportidx_file, mode="wb+") as file:
+			file.write(header)
 			for key,report in self.reports.items():
-				data		= struct.pack(	struct_fmt,
-											key,									# ID númerico del reporte en la base 1..n
-											report[0].encode("utf-8", "replace"),	# Nombre del reporte
-											report[1],								# Offset del bloque de metadatos del reporte en el contenedor
-											report[2],								# Cantidad de páginas esperadas en el contenedor de páginas
-											container_offsset						# Offet al primer contenedores de página del reporte
-		  								)
-
-				container_offsset += len(report[4]) * 12
-				file.write(data)
+				file.write(self._pack_report(key, container_offsset, len(report[4]), True))
+				container_offsset += len(report[4]) * container_len
 				self.metadata_objects = +1
+			self._ridx_end = file.tell()
 
 		# Salvar offest a los contenedores de páginas
-		struct_fmt	= ">LQ"
+		struct_fmt	= self._container_fmt
 		with open(self.containeridx_file, mode="wb+") as file:
+			file.write(header)
 			for key, report in self.reports.items():
-				for group_offset in report[4]:
+				for group_offset, first_page, page_count in zip(report[4], report[5], report[6]):
 					data		= struct.pack(	struct_fmt,
 												key,								# iD númerico del reporte en la base 1..n
-												group_offset						# Offet al contenedor de páginas
+												group_offset,						# Offet al contenedor de páginas
+												first_page,							# Número de la primer página del contenedor
+												page_count							# Cantidad de páginas del contenedor
 											)
 					file.write(data)
 					self.container_objects = +1
 
-	def read(self):
+		self.file_version	= self.version
+		self._dirty			= {}
+		self._written		= set(self.reports)
+
+	def begin(self, mode="ab"):
+		"""Abre los índices para agregar registros con :py:meth:`checkpoint`.
+
+		Args:
+			mode (string): 'wb' crea índices vacíos, 'ab' agrega a los índices
+				ya leídos con :py:meth:`read`. Los índices de la versión 1 se
+				reescriben una única vez en la versión actual.
+		"""
+		if mode == "wb" or self.file_version != self.version:
+			self.write()
+		elif self._ridx_end is not None:
+			# Descartar un registro incompleto de un checkpoint interrumpido
+			with open(self.reportidx_file, mode="r+b") as file:
+				file.truncate(self._ridx_end)
+
+		if mode == "wb" and os.path.isfile(self.zonemapidx_file):
+			# Zone maps de un Database anterior con el mismo nombre
+			os.remove(self.zonemapidx_file)
+		elif self._zidx_end is not None:
+			with open(self.zonemapidx_file, mode="r+b") as file:
+				file.truncate(self._zidx_end)
+
+		self._ridx = open(self.reportidx_file, mode="ab")
+		self._cidx = open(self.containeridx_file, mode="ab")
+
+	def checkpoint(self):
+		"""Agrega a los índices los contenedores y reportes nuevos o
+		modificados desde el último checkpoint y los sincroniza a disco. El
+		costo es proporcional a los datos nuevos, no al tamaño del índice.
+
+		.. note::
+			Primero se salvan los contenedores y luego los registros de los
+			reportes que los referencian, de modo que una caída en cualquier
+			momento deja índices válidos hasta el checkpoint anterior. Los
+			bloques referenciados ya deben estar salvados en el Database.
+		"""
+		if self._ridx is None or not self._dirty:
+			return
+
+		if self._zones:
+			self._write_zone_maps()
+
+		struct_pack		= struct.Struct(self._container_fmt).pack
+		container_len	= struct.calcsize(self._container_fmt)
+		cidx_offset		= self._cidx.tell()
+		containers		= []
+		records			= []
+		for key, dirty in self._dirty.items():
+			containers.extend(struct_pack(key, *c) for c in dirty)
+			records.append(self._pack_report(key, cidx_offset, len(dirty), key not in self._written))
+			cidx_offset += len(dirty) * container_len
+			self.container_objects += len(dirty)
+
+		self._cidx.write(b"".join(containers))
+		self._sync(self._cidx)
+		self._ridx.write(b"".join(records))
+		self._sync(self._ridx)
+
+		self.metadata_objects	+= len(self._dirty.keys() - self._written)
+		self._written.update(self._dirty)
+		self._dirty				= {}
+
+	def close(self):
+		"""Salva los datos pendientes (:py:meth:`checkpoint`) y cierra los índices"""
+		if self._ridx is None:
+			return
+
+		self.checkpoint()
+		self._ridx.close()
+		self._cidx.close()
+		self._ridx = None
+		self._cidx = None
+
+	def _write_zone_maps(self):
+		"""Agrega al .zidx los zone maps pendientes y lo sincroniza a disco"""
+		records = []
+		for reporte_id, container_offset, minimo, maximo in self._zones:
+			minimo = minimo.encode("utf-8")[:0xFFFF]
+			maximo = maximo.encode("utf-8")[:0xFFFF]
+			records.append(struct.pack(self._zone_fmt, reporte_id, container_offset, len(minimo), len(maximo)) + minimo + maximo)
+
+		new = not os.path.isfile(self.zonemapidx_file)
+		with open(self.zonemapidx_file, mode="ab") as file:
+			if new:
+				file.write(struct.pack(self._header_fmt, b"ozmp", 1))
+			file.write(b"".join(records))
+			self._sync(file)
+			self._zidx_end = file.tell()
+
+		self._zones = []
+
+	def _read_zone_maps(self):
+		"""Lee los zone maps del .zidx, si existe. Un registro incompleto al
+		final (una caída durante el checkpoint) se descarta."""
+		if not os.path.isfile(self.zonemapidx_file):
+			return
+
+		with open(self.zonemapidx_file, mode="rb") as file:
+			data = file.read()
+
+		header_len	= struct.calcsize(self._header_fmt)
+		zone_len	= struct.calcsize(self._zone_fmt)
+		if data[:4] != b"ozmp":
+			raise ValueError(_('{0} no es un índice válido!').format(self.zonemapidx_file))
+
+		pos = header_len
+		while pos + zone_len <= len(data):
+			reporte_id, container_offset, lmin, lmax = struct.unpack_from(self._zone_fmt, data, pos)
+			end = pos + zone_len + lmin + lmax
+			if end > len(data):
+				break			# Registro incompleto
+			minimo = data[pos + zone_len:pos + zone_len + lmin].decode("utf-8")
+			maximo = data[pos + zone_len + lmin:end].decode("utf-8")
+			self.zone_maps.setdefault(reporte_id, {})[container_offset] = (minimo, maximo)
+			pos = end
+
+		self._zidx_end = pos
+
+	def _sync(self, file):
+		file.flush()
+		os.fsync(file.fileno())
+
+	def _read_header(self, file):
+		"""Lee la cabecera de un archivo de índice y retorna la versión del mismo.
+		Los archivos de la versión 1 no tienen cabecera."""
+		header_len	= struct.calcsize(self._header_fmt)
+		data		= file.read(header_len)
+		if len(data) == header_len:
+			magic_number, version = struct.unpack(self._header_fmt, data)
+			if magic_number == b"oidx":
+				return version
+
+		file.seek(0)
+		return 1
+
+	def get_containers(self, reporte_id):
+		"""Retorna los contenedores de páginas de un reporte, leyéndolos del
+		índice de contenedores si aún no se leyeron
+
+		Args:
+			reporte_id (int): Id del reporte
+
+		Return:
+			tuple: (Lista de offsets, lista de primeras páginas, lista de cantidades de páginas)
+		"""
+		if reporte_id in self._unloaded:
+			self._load_containers(reporte_id)
+
+		report = self.reports[reporte_id]
+		return (report[4], report[5], report[6])
+
+	def _load_containers(self, reporte_id, data=None):
+		"""Lee del índice de contenedores solo los registros de un reporte
+
+		Args:
+			reporte_id (int): Id del reporte
+			data (bytes): (opcional) Contenido completo del .cidx ya leído
+		"""
+		report			= self.reports[reporte_id]
+		struct_fmt		= self._container_fmt
+		container_len	= struct.calcsize(struct_fmt)
+		runs			= self._containers_runs.pop(reporte_id, [])
+
+		if data is None and runs:
+			with open(self.containeridx_file, mode="rb") as file:
+				chunks = []
+				for start, count in runs:
+					file.seek(start)
+					chunks.append(file.read(count * container_len))
+		else:
+			chunks = [data[start:start + count * container_len] for start, count in runs]
+
+		for chunk in chunks:
+			for _, container_offset, first_page, page_count in struct.iter_unpack(struct_fmt, chunk):
+				report[4].append(container_offset)
+				report[5].append(first_page)
+				report[6].append(page_count)
+
+		self._unloaded.discard(reporte_id)
+
+	def read(self, lazy=False):
+		"""Lee los índices del Database
+
+		Args:
+			lazy (bool): Leer solo el índice de reportes, los contenedores de
+				cada reporte se leen cuando se consultan con :py:meth:`get_containers`.
+				Los índices de la versión 1 se leen completos.
+		"""
 
 		# Recupero offsets a los metadatos
-		struct_fmt		= ">L50sQHQ"
+		struct_fmt		= self._report_fmt
 		longitud_bloque	= struct.calcsize(struct_fmt)
 		struct_unpack	= struct.Struct(struct_fmt).unpack_from
+		ext_len			= struct.calcsize(self._report_ext_fmt)
+		ext_unpack		= struct.Struct(self._report_ext_fmt).unpack_from
 
 		with open(self.reportidx_file, mode="rb") as file:
+			version = self._read_header(file)
+			if version not in (1, self.version):
+				raise ValueError(_('{0} no es un índice válido!').format(self.reportidx_file))
+			if version == 1:
+				ext_len = 0
+			order	= []
+			self.file_version = version
+			self._ridx_end = file.tell()
 			while True:
 				data	= file.read(longitud_bloque)
 				if not data:
 					break
-				fields									= struct_unpack(data)
-				default									= (fields[1].decode("utf-8").strip("\0"), fields[2], fields[3], fields[4], [])
-				self.current_report_id					= fields[0]
-				self.reports[self.current_report_id]	= default
-				self.metadata_objects					+= 1
+				ext		= file.read(ext_len)
+				if len(data) < longitud_bloque or len(ext) < ext_len:
+					break			# Registro incompleto
+				fields	= struct_unpack(data)
+				ext		= ext_unpack(ext) if ext_len else None
+				idrpt	= fields[0]
+
+				if ext is not None:
+					lmetadata	= ext[4]
+					metadata	= file.read(lmetadata)
+					if len(metadata) < lmetadata:
+						break		# Registro incompleto
+
+				if idrpt not in self.reports:
+					default						= (fields[1].decode("utf-8").strip("\0"), fields[2], fields[3], fields[4], [], [], [])
+					self.current_report_id		= idrpt
+					self.reports[idrpt]			= default
+					self.report_names.setdefault(default[0], idrpt)
+					order.append(idrpt)
+					self.report_pages[idrpt]	= 0
+					self.report_sizes[idrpt]	= None
+					self.report_metadata[idrpt]	= None
+					self._containers_runs[idrpt] = []
+					self.metadata_objects		+= 1
+
+				if ext is not None:
+					self.report_pages[idrpt] = ext[0]
+					self.report_sizes[idrpt] = [ext[1], ext[2]] if ext[1] != self._unknown_size else None
+					if lmetadata:
+						self.report_metadata[idrpt] = json.loads(metadata.decode("utf-8"))
+					if ext[3]:
+						self._containers_runs[idrpt].append((fields[4], ext[3]))
+
+				self._ridx_end = file.tell()
+
+		# Los reportes leídos ya tienen sus metadatos en el .ridx, en un
+		# checkpoint solo los reportes nuevos los salvan
+		self._written = set(self.reports)
+		self._read_zone_maps()
+
+		if version == 1:
+			self._read_containers_v1()
+			return
 
+		self.container_objects = sum(count for runs in self._containers_runs.values() for start, count in runs)
+		self._unloaded = set(order)
+		if lazy:
+			return
 
-		# Recupero offsets a los contenedores
-		struct_fmt		= ">LQ"
+		with open(self.containeridx_file, mode="rb") as file:
+			data = memoryview(file.read())
+		for idrpt in order:
+			self._load_containers(idrpt, data)
+
+	def _read_containers_v1(self):
+		"""Lee el índice de contenedores de la versión 1 (sin cabecera), con
+		contenedores de tamaño fijo"""
+		struct_fmt		= self._container_v1_fmt
 		longitud_bloque	= struct.calcsize(struct_fmt)
 		struct_unpack	= struct.Struct(struct_fmt).unpack_from
 
@@ -125,10 +549,40 @@ class Index(object):
 				data	= file.read(longitud_bloque)
 				if not data:
 					break
-				fields	= struct_unpack(data)
-				idrpt		= fields[0]
-				self.reports[idrpt][4].append(fields[1])
+				idrpt, container_offset = struct_unpack(data)
+				report		= self.reports[idrpt]
+
+				# Contenedores de tamaño fijo: se asumen todos completos
+				first_page	= len(report[4]) * report[2] + 1
+				report[4].append(container_offset)
+				report[5].append(first_page)
+				report[6].append(report[2])
+				self.report_pages[idrpt] = first_page + report[2] - 1
 				self.container_objects += 1
 
+		self._read_last_page_counts()
+
+	def _read_last_page_counts(self):
+		"""En los índices de la versión 1 no se registra la cantidad de páginas
+		de cada contenedor, la del último contenedor de cada reporte se lee de
+		los datos variables (no comprimidos) del bloque en el Database"""
+		struct_fmt	= ">LBBBL"
+		header_len	= struct.calcsize(struct_fmt)
+
+		with open(self.oermdb_file, mode="rb") as file:
+			for idrpt, report in self.reports.items():
+				if not report[4]:
+					continue
+
+				file.seek(report[4][-1])
+				fields = struct.unpack(struct_fmt, file.read(header_len))
+				if fields[0] - header_len - fields[4] < 2:
+					continue
+
+				file.seek(report[4][-1] + header_len + fields[4])
+				page_count			= struct.unpack(">H", file.read(2))[0]
+				report[6][-1]		= page_count
+				self.report_pages[idrpt] = report[5][-1] + page_count - 1
+
 	def __str__( self ) :
 		print(self.reports)
@@ -24,6 +24,12 @@ LoadProcess
 
 Esta clase define un objeto de procesamiento y carga de spool
 
+La carga es una secuencia de etapas: lectura del spool, identificación del
+reporte de cada página (:py:func:`match_pages`, opcionalmente en un pool de
+procesos, ver ``match-workers`` y ``match-batch-size`` en la configuración) y
+escritura en el :class:`openerm.Database` (que a su vez puede comprimir en
+paralelo, ver ``workers``).
+
 """
 
 
@@ -36,6 +42,9 @@ try:
 	import sys
 	import os
 	import time
+	import pickle
+	from collections import deque
+	from concurrent.futures import ProcessPoolExecutor
 	from progressbar import Bar, ETA, FileTransferSpeed, FormatLabel, ProgressBar
 
 	sys.path.append('.')
@@ -44,6 +53,7 @@ try:
 	from openerm.Block import Block
 	from openerm.Database import Database
 	from openerm.ReportMatcher import ReportMatcher
+	from openerm.FieldIndex import FieldExtractor, FieldIndex
 	from openerm.SpoolHostReprint import SpoolHostReprint
 	from openerm.SpoolFixedRecordLength import SpoolFixedRecordLength
 	from openerm.tabulate import tabulate
@@ -56,6 +66,118 @@ except ImportError as err:
 	sys.exit(-1)
 
 
+#: (ReportMatcher serializado, ReportMatcher) de cada proceso del pool de
+#: identificación de reportes
+_worker_matcher = []
+
+
+def _match_batch(matcher_data, pages):
+	"""Identifica los reportes de un lote de páginas en un proceso del pool.
+	Cada proceso carga el matcher serializado una única vez. El lote se
+	identifica sin el estado "sticky" de las páginas anteriores (ver
+	:py:func:`_merge_batch`).
+
+	Args:
+		matcher_data (bytes): :class:`openerm.ReportMatcher` serializado con `pickle`
+		pages (list): Páginas del lote
+
+	Return:
+		list: (datos del reporte, última regla que coincidió, 1 si la
+		identificó la última regla, -1 si no, 0 si no se probó) de cada página
+	"""
+	if not _worker_matcher or _worker_matcher[0] != matcher_data:
+		_worker_matcher[:] = [matcher_data, pickle.loads(matcher_data)]
+
+	matcher			= _worker_matcher[1]
+	matcher._last	= None
+	resultados		= []
+	for page in pages:
+		hits, misses = matcher.hits, matcher.misses
+		data = matcher.match(page)
+		resultados.append((data, matcher._last, (matcher.hits - hits) - (matcher.misses - misses)))
+	return resultados
+
+
+def _merge_batch(matcher, pages, resultados):
+	"""Resultados de un lote identificado en el pool, iguales a los de
+	identificarlo en este proceso a continuación de los lotes anteriores.
+
+	Con "sticky" el resultado de una página depende de la regla de la página
+	anterior: las páginas del inicio del lote se vuelven a identificar con
+	`matcher` hasta que su estado coincide con el del proceso del pool, a
+	partir de ahí los resultados son los mismos. Los contadores `hits` y
+	`misses` del proceso del pool se suman a los de `matcher`.
+
+	Return:
+		list: (página, datos del reporte)
+	"""
+	merged		= []
+	previous	= None					# Estado del proceso del pool antes de cada página
+	converged	= not matcher.sticky
+	for page, (data, last, sticky) in zip(pages, resultados):
+		if not converged and matcher._last == previous:
+			converged = True
+		if converged:
+			matcher._last	= last
+			matcher.hits	+= sticky > 0
+			matcher.misses	+= sticky < 0
+			merged.append((page, data))
+		else:
+			merged.append((page, matcher.match(page)))
+			previous = last
+
+	return merged
+
+
+def match_pages(pages, matcher, workers=0, batch_size=100):
+	"""Etapa de identificación de los reportes de las páginas de un spool
+
+	Con `workers` las páginas se agrupan en lotes que se identifican en un
+	pool de procesos, cada uno con su copia del :class:`openerm.ReportMatcher`,
+	y los resultados se retornan en el orden de las páginas. Se mantienen a lo
+	sumo 2 lotes pendientes por proceso. Los resultados y los contadores del
+	matcher son los mismos que sin `workers` (ver :py:func:`_merge_batch`).
+
+	Args:
+		pages (iterable): Páginas del spool
+		matcher (:class:`openerm.ReportMatcher`): Matcher de los reportes
+		workers (int): Procesos del pool, 0 = en el mismo proceso (Default: 0)
+		batch_size (int): Páginas de cada lote (Default: 100)
+
+	Return:
+		generator: (página, datos del reporte, ver :py:meth:`openerm.ReportMatcher.match`)
+	"""
+	if not workers:
+		for page in pages:
+			yield page, matcher.match(page)
+		return
+
+	matcher_data	= pickle.dumps(matcher)
+	pool			= ProcessPoolExecutor(max_workers=workers)
+	pending			= deque()
+	try:
+		batch = []
+		for page in pages:
+			batch.append(page)
+			if len(batch) >= batch_size:
+				pending.append((batch, pool.submit(_match_batch, matcher_data, batch)))
+				batch = []
+				while len(pending) > 2 * workers:
+					batch_pages, future = pending.popleft()
+					yield from _merge_batch(matcher, batch_pages, future.result())
+
+		if batch:
+			pending.append((batch, pool.submit(_match_batch, matcher_data, batch)))
+		while pending:
+			batch_pages, future = pending.popleft()
+			yield from _merge_batch(matcher, batch_pages, future.result())
+
+	finally:
+		for _, future in pending:
+			future.cancel()
+		pool.shutdown(wait=True)
+
+
 class LoadProcess(object):
 
 	def __init__(self, configfile, input_file=None):
@@ -71,8 +193,8 @@ class LoadProcess(object):
 		size_test_file  = os.path.getsize(self.input_file)
 
 		self.spool_types = {
-						"fixed": SpoolFixedRecordLength(self.input_file, buffer_size=self.config.buffer_size, encoding=self.config.encoding, newpage_code=self.config.EOP ),
-					  	"fcfc":	SpoolHostReprint(self.input_file, buffer_size=self.config.buffer_size, encoding=self.config.encoding )
+						"fixed": SpoolFixedRecordLength(self.input_file, buffer_size=self.config.buffer_size, encoding=self.config.encoding, newpage_code=self.config.EOP, mmap=self.config.mmap, translate=self.config.translate),
+					  	"fcfc":	SpoolHostReprint(self.input_file, buffer_size=self.config.buffer_size, encoding=self.config.encoding, translate=self.config.translate)
 					  }
 
 		compresiones 	= [e for e in block.compressor.available_types if e[0] == self.config.compress_type]
@@ -81,7 +203,9 @@ class LoadProcess(object):
 		mode = "ab"
 
 		r = ReportMatcher(self.config.report_cfg)
-		reports = []
+		extractor = FieldExtractor(r.fields)
+		keys = FieldExtractor({k: {"key": box} for k, box in r.keys.items()})
+		reports = set()
 		for encriptado in encriptados:
 			for compress in compresiones:
 
@@ -96,11 +220,22 @@ class LoadProcess(object):
 								default_compress_method=compress[0],
 								default_compress_level=self.config.compress_level,
 								default_encription_method=encriptado[0],
-								pages_in_container = self.config.pages_in_group)
+								pages_in_container = self.config.pages_in_group,
+								container_size = self.config.container_size,
+								min_pages_in_container = self.config.min_pages_in_group,
+								workers = self.config.workers,
+								queue_depth = self.config.queue_depth,
+								checkpoint_interval = self.config.checkpoint_interval,
+								text_index = self.config.text_index,
+								bloom_fpr = self.config.bloom_fpr)
 
 				file_size	= os.path.getsize(file_name)
 				reportname_anterior = ""
 
+				# Índice de campos del repositorio (solo si hay reportes con campos definidos)
+				fields		= FieldIndex(self.config.output_path) if extractor else None
+				db_path		= os.path.relpath(file_name, self.config.output_path)
+
 				widgets = [ os.path.basename(self.input_file), ': ',
 							FormatLabel('%(value)d bytes de %(max_value)d (%(percentage)0.2f)'),
 			   				Bar(marker='#',left='[',right=']'), ' ',
@@ -111,14 +246,12 @@ class LoadProcess(object):
 				with ProgressBar(max_value=size_test_file, widgets=widgets) as bar:
 					spool = self.spool_types[self.config.file_type]
 					with spool as s:
-						for page in s:
+						for page, data in match_pages(s, r, self.config.match_workers, self.config.match_batch_size):
 							p_size += len(page)
 							bar.update(p_size)
-							data = r.match(page)
 							reportname = data[0]
 
-							if reportname not in reports:
-								reports.append(reportname)
+							reports.add(reportname)
 
 							if reportname != reportname_anterior:
 								rpt_id = db.get_report(reportname)
@@ -129,9 +262,16 @@ class LoadProcess(object):
 								reportname_anterior = reportname
 
 							paginas = paginas + 1
-							db.add_page(page)
+							pagenum = db.add_page(page, [v for _, v in keys.extract(reportname, page)])
+
+							if fields is not None:
+								values = extractor.extract(reportname, page)
+								if values:
+									fields.add(db_path, db.current_report, reportname, pagenum, values)
 
 					db.close()
+					if fields is not None:
+						fields.close()
 
 				compress_time	= time.time() - start
 				compress_size	= os.path.getsize(file_name) - file_size
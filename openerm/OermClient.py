@@ -46,10 +46,15 @@ try:
 	import yaml
 	import os
 	import sqlite3
+	import queue
+	import multiprocessing
+	from concurrent.futures import ProcessPoolExecutor
 	# from openerm.Utils import *
 	from openerm.tabulate import tabulate
 	from openerm.Utils import file_accessible, AutoNum, filesInPath
 	from openerm.Database import Database
+	from openerm.FieldIndex import FieldIndex
+	from openerm.TextMatcher import TextMatcher
 
 
 except ImportError as err:
@@ -58,6 +63,76 @@ except ImportError as err:
 	sys.exit(-1)
 
 
+def _iter_search_database(filename, text, filters, cancel=None):
+	"""Búsqueda de un texto en los reportes de un Database que cumplen los
+	filtros (como un LIKE '%valor%' sobre los metadatos del reporte). Las
+	ocurrencias se generan a medida que se busca en cada contenedor de
+	páginas.
+
+	Args:
+		filename (string): Archivo del Database
+		text: Texto, lista de textos o expresión regular a buscar
+		filters (dict): Filtro -> valor, ver :py:meth:`OermClient.search_text`
+		cancel (Event): (opcional) La búsqueda termina cuando se activa, se
+			consulta antes de leer cada contenedor
+
+	Return:
+		generator: (database, reporte, página, posición, extracto) de cada ocurrencia
+	"""
+	# Un database del repo.db que ya no existe no se abre: Database lo
+	# crearía vacío
+	if not os.path.isfile(filename):
+		return
+
+	db = Database(file=filename, mode="rb", lazy_index=True)
+	try:
+		matcher = TextMatcher(text)
+		for report in db.reports():
+			if not all(v.lower() in str(report.metadata.get(k, "")).lower() for k, v in filters.items()):
+				continue
+			for offset, first_page, _ in report._candidate_containers(text):
+				if cancel is not None and cancel.is_set():
+					return
+				# (longitud_bloque, tipo_bloque, tipo_compresion, tipo_encriptacion, longitud_datos, data, variable_data)
+				_, _, _, _, _, data, var_data = report._get_block_data_from_offset(offset)
+				for ocurrence in matcher.find_ocurrences(data, var_data, report.id, first_page):
+					yield (filename,) + ocurrence
+	finally:
+		db.close()
+
+
+def _search_database(filename, text, filters, limit, cancel, results, batch_size=100):
+	"""Búsqueda de un texto en un Database dentro de un proceso del pool de
+	:py:meth:`OermClient.search_text`. Las ocurrencias se envían a medida
+	que se encuentran, en lotes de hasta `batch_size`, y al terminar se envía
+	`None`.
+
+	Args:
+		filename (string): Archivo del Database
+		text: Texto, lista de textos o expresión regular a buscar
+		filters (dict): Filtro -> valor, ver :py:meth:`OermClient.search_text`
+		limit (int): Cantidad máxima de ocurrencias o `None`
+		cancel (Event): La búsqueda termina cuando se activa
+		results (Queue): Cola donde se envían los lotes de ocurrencias
+		batch_size (int): Cantidad máxima de ocurrencias de cada lote
+	"""
+	batch = []
+	count = 0
+	try:
+		for ocurrence in _iter_search_database(filename, text, filters, cancel):
+			batch.append(ocurrence)
+			count += 1
+			if count == limit:
+				break
+			if len(batch) >= batch_size:
+				results.put(batch)
+				batch = []
+		if batch:
+			results.put(batch)
+	finally:
+		results.put(None)
+
+
 class OermClient(object):
 	"""Clase Cliente para acceso a reportes Oerm. Los reportes OERM
 	se clasifican en: Catalogos y Repositorios. Un catalogo en
@@ -306,6 +381,168 @@ class OermClient(object):
 
 		return lista
 
+	def _candidate_databases(self, reporte=None, sistema=None, departamento=None, fecha=None):
+		"""Databases de los repositorios del catalogo activo que tienen
+		reportes que cumplen los filtros, según el repo.db de cada repositorio
+
+		Return:
+			list: Path completo de cada database
+		"""
+		SQL = """
+		Select	distinct
+				databases.database_id,
+				databases.path
+		From
+				reports Inner Join
+				department On reports.department_id = department.department_id Inner Join
+				date On reports.date_id = date.date_id Inner Join
+				report On reports.report_id = report.report_id Inner Join
+				system On reports.system_id = system.system_id Inner Join
+				databases On reports.database_id = databases.database_id
+		where	report.report_name like ?
+				and date.date like ?
+				and system.system_name like ?
+				and department.department_name like ?
+		order by databases.database_id
+		"""
+		params = tuple('%' if v is None else '%' + v + '%' for v in (reporte, fecha, sistema, departamento))
+
+		databases = []
+		for dbname in self._repos.values():
+			conn = sqlite3.connect(dbname)
+			c = conn.cursor()
+			c.execute(SQL, params)
+			databases.extend(os.path.normpath(os.path.join(os.path.dirname(dbname), path)) for _, path in c.fetchall())
+			c.close()
+			conn.close()
+
+		return databases
+
+	def search_text(self, text, reporte=None, sistema=None, aplicacion=None, departamento=None, fecha=None, limit=None, workers=None):
+		"""Búsqueda de un texto en los reportes de todos los repositorios del
+		catalogo activo. Los repo.db de los repositorios reducen la búsqueda a
+		los databases con reportes que cumplen los filtros (búsquedas parciales
+		tipo LIKE en sql, como en :py:meth:`query_reports`) y los databases se
+		reparten en un pool de procesos.
+
+		Las ocurrencias se generan a medida que se encuentran, en lotes por
+		database (sin un orden entre databases). Al alcanzar `limit` o al
+		cerrar el generador (por ejemplo con un ``break``) se cancelan las
+		búsquedas pendientes y las que están en curso terminan antes de leer
+		el siguiente contenedor de páginas.
+
+		Args:
+			text: Texto, lista de textos o expresión regular compilada a buscar
+				(ver :py:meth:`openerm.Report.find_text`)
+			reporte (string): Nombre del reporte
+			sistema (string): Nombre del sistema
+			aplicacion (string): Nombre de la aplicación
+			departamento (string): Nombre del departamento
+			fecha (string): Fecha de emsión del reporte
+			limit (int): cantidad máxima de resultados
+			workers (int): Cantidad de procesos, 0 busca en este proceso
+				(Default: cantidad de cpus)
+
+		Return:
+			generator: (database, reporte, página, posición, extracto) de cada
+			ocurrencia, más el texto encontrado si se busca una lista de textos
+			o una expresión regular
+
+		Ejemplo:
+			>>> from openerm.OermClient import OermClient
+			>>> c = OermClient("samples/openermcfg.yaml")
+			>>> c.open_catalog("local-test")
+			>>> for o in c.search_text("IWY3", fecha="201609", limit=10):
+			...     print(o)
+			('D:\\repo\\test1\\database.oerm', 2, 10, 991, 'AGH8B2NULTCTJ0L-[IWY3]-4K6D8RRBYCRQCH')
+		"""
+		filters		= {k: v for k, v in (("reporte", reporte), ("sistema", sistema), ("aplicacion", aplicacion),
+										("departamento", departamento), ("fecha", fecha)) if v is not None}
+		databases	= self._candidate_databases(reporte, sistema, departamento, fecha)
+		workers		= os.cpu_count() if workers is None else workers
+		if not databases or (limit is not None and limit <= 0):
+			return
+
+		count = 0
+		if not workers:
+			for filename in databases:
+				for ocurrence in _iter_search_database(filename, text, filters):
+					yield ocurrence
+					count += 1
+					if count == limit:
+						return
+			return
+
+		manager	= multiprocessing.Manager()
+		cancel	= manager.Event()
+		results	= manager.Queue()
+		pool	= ProcessPoolExecutor(max_workers=workers)
+		futures	= [pool.submit(_search_database, filename, text, filters, limit, cancel, results) for filename in databases]
+		try:
+			running = len(futures)
+			while running:
+				try:
+					batch = results.get(timeout=1)
+				except queue.Empty:
+					# Un proceso que terminó con un error no llega a enviar su fin
+					for future in futures:
+						if future.done() and future.exception() is not None:
+							raise future.exception()
+					continue
+
+				if batch is None:
+					running -= 1
+					continue
+				for ocurrence in batch:
+					yield ocurrence
+					count += 1
+					if count == limit:
+						return
+
+			for future in futures:
+				future.result()
+		finally:
+			# Las búsquedas pendientes se cancelan y las que están en curso
+			# terminan en el próximo contenedor
+			cancel.set()
+			for future in futures:
+				future.cancel()
+			pool.shutdown(wait=True)
+			manager.shutdown()
+
+	def find_field(self, field, value, reporte=None):
+		"""Búsqueda puntual del valor de un campo en los índices de campos
+		(:class:`openerm.FieldIndex`) de los repositorios del catalogo activo.
+		Los campos se extraen de las páginas durante la carga, según la
+		configuración de cada reporte.
+
+		Args:
+			field (string): Nombre del campo
+			value (string): Valor exacto del campo
+			reporte (string): (Opcional) Nombre del reporte (búsqueda parcial tipo LIKE en sql)
+
+		Return:
+			list: (path del database, id del reporte, nombre del reporte, página)
+
+		Ejemplo:
+			>>> from openerm.OermClient import OermClient
+			>>> from openerm.Database import Database
+			>>> c = OermClient("samples/openermcfg.yaml")
+			>>> c.open_catalog("local-test")
+			>>> database, report_id, _, page = c.find_field("documento", "092935069", reporte="L80001")[0]
+			>>> db = Database(file=database, mode="rb", lazy_index=True)
+			>>> print(db.reports().get_report(report_id).get_page(page))
+		"""
+		resultado = []
+		for dbname in self._repos.values():
+			path = os.path.dirname(dbname)
+			if FieldIndex.exists(path):
+				idx = FieldIndex(path)
+				resultado.extend(idx.lookup(field, value, reporte))
+				idx.close()
+
+		return resultado
+
 	def catalog_create(self, catalogdict):
 		"""Crear un catálogo (lógico) de repositorios Oerm.
 
@@ -116,6 +116,7 @@ class PageContainer(object):
 		self._pages			= []
 		self.page_count		= 0
 		self.current_page	= 0
+		self.size			= 0		#: Tamaño (sin comprimir) de las páginas del contenedor
 
 	def add(self, page):
 		"""Agrega una página al grupo. 	Esta rutina agrega un "string" que representa
@@ -147,6 +148,7 @@ class PageContainer(object):
 
 		self._pages.append(page)
 		self.page_count = self.page_count + 1
+		self.size		= self.size + len(page)
 
 	def dump(self):
 		"""Retorna en bytes el contenido de la lista de páginas del grupo. Este método
@@ -188,18 +190,16 @@ class PageContainer(object):
 					| Cant.Paginas | Long. Pagina 1 | .. | Long. Pagina N |
 					+==============+================+    +================+
 
-		"""
-		data = b''
-		for p in self._pages:
-			data += p.encode("latin1")
-
-		a_list = [len(p) for p in self._pages]
-		ln = len(a_list)
+			Un :class:`openerm.Database` puede agregar a los datos adicionales
+			el filtro de Bloom del contenedor (ver :class:`openerm.BloomFilter`),
+			por lo que la tabla de longitudes se lee a partir de la cantidad de
+			páginas.
 
-		var_data	= b''
-		var_data	+= struct.pack('>H', len(self._pages))
-		var_data	+= struct.pack('>' + 'L'*ln, *a_list)
-		data		= struct.pack('>{0}s'.format(len(data)), data)
+		"""
+		pages		= [p.encode("latin1") for p in self._pages]
+		ln			= len(pages)
+		var_data	= struct.pack('>H' + 'L'*ln, ln, *[len(p) for p in pages])
+		data		= b''.join(pages)
 		return (data, var_data)
 
 	def load(self, container_data):
@@ -221,13 +221,13 @@ class PageContainer(object):
 
 		(data, var_data) 	= container_data
 		self.max_page_count	= struct.unpack(">H", var_data[0:2])[0]
-		pages_lenght		= struct.unpack('>'+'L'*self.max_page_count, var_data[2:])
+		pages_lenght		= struct.unpack_from('>'+'L'*self.max_page_count, var_data, 2)
 
+		data = memoryview(data)
 		off = 0
 		for l in pages_lenght:
-			page = data[off:off+l]
+			self.add(str(data[off:off+l], "latin1"))
 			off += l
-			self.add(page.decode("latin1"))
 
 	def get_page(self, pagenum):
 		"""Retorna una página determinada del grupo.
@@ -44,9 +44,13 @@ try:
 	gettext.textdomain('openerm')
 
 	import struct
+	import bisect
+	from itertools import islice
 	from openerm.Block import Block
 	from openerm.PageContainer import PageContainer
 	from openerm.MetadataContainer import MetadataContainer
+	from openerm.TextMatcher import TextMatcher
+	from openerm.BloomFilter import BloomFilter, container_filter
 
 except ImportError as err:
 	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
@@ -91,8 +95,18 @@ class Report(object):
 		long      Max cantidad de páginas en los PageContainers
 		long      Offset al primer PageContainer
 		list      Lista de Offsets a los PageContainers
+		list      Lista de números de la primer página de cada PageContainer
+		list      Lista de cantidades de páginas de cada PageContainer
 		========= ================================================
 
+	.. note::
+		La construcción de un Report no lee el Database: la cantidad de
+		páginas sale del índice, y los metadatos también si el índice los
+		registra (no los de la versión 1). En caso contrario los metadatos se
+		leen del bloque correspondiente recién cuando se los consulta. Los
+		metadatos son accesibles también como atributos (`report.fecha`,
+		`report.sistema`, etc.)
+
 	"""
 	# def __init__(self, file, data):
 	def __init__(self, database, idrpt):
@@ -100,23 +114,45 @@ class Report(object):
 		data 						= (idrpt,) + database.Index.reports[idrpt]
 
 		self.file					= database._file
+		self.database				= database
 		self.id 					= data[0]							#: id del reporte
 		self.nombre 				= data[1]							#: Nombre del reporte
 		self.metadata_offset 		= data[2]
 		self.max_pages_in_container = data[3]
 		self.first_p_container 		= data[4]
-		self.containers_offset		= data[5]
-		self.total_containers		= len(self.containers_offset)
 		self.current_page			= 1
 		self.current_container		= -1
 		self.current_block_data		= None
 		self.block					= Block()
 		self.pagecontainer 			= PageContainer()
 		self.metadatacontainer		= MetadataContainer()
-		self.metadata				= {}								#: Metadatos del reporte
-		self.total_pages			= 0									#: Cantidad total de páginas del reporte
-
-		self._get_report_data()
+		self.total_pages			= database.Index.report_pages[idrpt]	#: Cantidad total de páginas del reporte
+
+		sizes						= database.Index.report_sizes[idrpt]
+		self.compressed_size		= sizes[0] if sizes else None		#: Bytes comprimidos de las páginas o None si el índice no lo registra
+		self.uncompressed_size		= sizes[1] if sizes else None		#: Bytes sin comprimir de las páginas o None si el índice no lo registra
+		self._metadata				= database.Index.report_metadata[idrpt]
+		self._key_zones				= None		# Zone maps de los contenedores para find_key
+
+	@property
+	def containers_offset(self):
+		"""Lista de offsets a los PageContainers"""
+		return self.database.Index.get_containers(self.id)[0]
+
+	@property
+	def containers_first_page(self):
+		"""Lista de números de la primer página de cada PageContainer"""
+		return self.database.Index.get_containers(self.id)[1]
+
+	@property
+	def containers_page_count(self):
+		"""Lista de cantidades de páginas de cada PageContainer"""
+		return self.database.Index.get_containers(self.id)[2]
+
+	@property
+	def total_containers(self):
+		"""Cantidad de PageContainers del reporte"""
+		return len(self.containers_offset)
 
 	def _get_block_data_from_container(self, container):
 
@@ -162,39 +198,57 @@ class Report(object):
 			string: Texto completo de la página
 
 		"""
-		container = int((pagenum - 1) / self.max_pages_in_container)
-		if container > self.total_containers - 1:
+		# Búsqueda binaria en el directorio de primeras páginas de los contenedores
+		container = bisect.bisect_right(self.containers_first_page, pagenum) - 1
+		if container < 0 or pagenum > self.total_pages:
 			return None
 
 		if container != self.current_container:
-			self.current_block_data = self._get_block_data_from_container(container)
-			# (longitud_bloque, tipo_bloque, tipo_compresion, tipo_encriptacion, longitud_datos, data, variable_data)
-			self.pagecontainer.load((self.current_block_data[5], self.current_block_data[6]))
-			self.current_container = container
+			container_offset	= self.containers_offset[container]
+			pagecontainer		= self.database.cache.get(container_offset)
+			if pagecontainer is None:
+				self.current_block_data = self._get_block_data_from_offset(container_offset)
+				# (longitud_bloque, tipo_bloque, tipo_compresion, tipo_encriptacion, longitud_datos, data, variable_data)
+				pagecontainer = PageContainer()
+				pagecontainer.load((self.current_block_data[5], self.current_block_data[6]))
+				self.database.cache.put(container_offset, pagecontainer)
 
-		relative_pagenum = pagenum - (container * self.max_pages_in_container)
+			self.pagecontainer		= pagecontainer
+			self.current_container	= container
+
+		relative_pagenum = pagenum - self.containers_first_page[container] + 1
 
 		return self.pagecontainer.get_page(relative_pagenum)
 
-	def _get_report_data(self):
+	@property
+	def metadata(self):
+		"""Metadatos del reporte (dict). Se leen del bloque de metadatos
+		solo si el índice no los registra"""
+		if self._metadata is None:
+			_, _, _, _, _, data, _ = self._get_block_data_from_offset(self.metadata_offset)
+			self._metadata = self.metadatacontainer.load(data)
 
-		# La cantidad de contenedores - 1 por la cantidad de paginas x contenedor da el primer número
-		last_container_offset = self.total_containers - 1
-		total = (self.total_containers - 1) * self.max_pages_in_container
-		# Leer el último contenedor para saber cuantas páginas quedaron en él
-		data = self._get_block_data_from_container(last_container_offset)
-		self.pagecontainer.load((data[5], data[6]))
-		total += len(self.pagecontainer)
+		return self._metadata
 
-		self.total_pages = total
+	def __getattr__(self, name):
+		# Los metadatos se acceden como atributos del reporte
+		if name.startswith("_") or name == "metadata":
+			raise AttributeError(name)
 
-		# Metadatos
-		_, _, tipo_compresion, _, _, data, _ = self._get_block_data_from_offset(self.metadata_offset)
-		self.metadata = self.metadatacontainer.load(data)
-		self.__dict__.update(self.metadata)
+		try:
+			return self.metadata[name]
+		except KeyError:
+			raise AttributeError(name)
 
 	def _get_block_data_from_offset(self, container_offset):
 
+		mm = self.database._mmap
+		if mm is not None:
+			# Lectura directa del archivo mapeado en memoria, sin copias
+			longitud_bloque = struct.unpack_from(">L", mm, container_offset)[0]
+			with memoryview(mm)[container_offset:container_offset + longitud_bloque] as data:
+				return self.block.load(data)
+
 		self.file.seek(container_offset)
 
 		struct_fmt = '>L'
@@ -215,11 +269,35 @@ class Report(object):
 		# (longitud_bloque, tipo_bloque, tipo_compresion, tipo_encriptacion, longitud_datos, data, variable_data)
 		return self.block.load(data)
 
-	def find_text(self, text):
-		"""Búsqueda de un texto dentro del reporte
+	def _get_variable_data_from_offset(self, container_offset):
+		"""Datos adicionales de un bloque, sin leer ni descomprimir sus datos"""
+		mm = self.database._mmap
+		if mm is not None:
+			longitud_bloque = struct.unpack_from(">L", mm, container_offset)[0]
+			with memoryview(mm)[container_offset:container_offset + longitud_bloque] as data:
+				return Block.load_variable_data(data)
+
+		struct_fmt = '>LBBBL'
+		struct_len = struct.calcsize(struct_fmt)
+
+		self.file.seek(container_offset)
+		longitud_bloque, _, _, _, longitud_datos = struct.unpack(struct_fmt, self.file.read(struct_len))
+		if longitud_bloque <= struct_len + longitud_datos:
+			return None
+
+		self.file.seek(container_offset + struct_len + longitud_datos)
+		return self.file.read(longitud_bloque - struct_len - longitud_datos)
+
+	def find_text(self, text, pages=None, with_sample=True):
+		"""Búsqueda de un texto, una lista de textos o una expresión regular
+		dentro del reporte. Ver :py:meth:`iter_find_text`
 
 		Args:
-			text (string): Patrón de texto a buscar
+			text: Texto (`str`), lista de textos o expresión regular compilada
+				(`re.compile`) a buscar. Con una lista de textos o una expresión
+				regular se informa además el texto encontrado
+			pages (tuple): (opcional) Rango (desde, hasta) de páginas donde buscar
+			with_sample (bool): Armar el extracto de cada ocurrencia (Default: True)
 
 		Example:
 			>>> from openerm.Database import Database
@@ -228,6 +306,17 @@ class Report(object):
 			>>> r = Report(db, 1)
 			>>> report.find_text("IWY3")
 			[(2, 10, 991, 'AGH8B2NULTCTJ0L-[IWY3]-4K6D8RRBYCRQCH')]
+			>>> report.find_text(["IWY3", "XXA1"])
+			[(2, 10, 991, 'AGH8B2NULTCTJ0L-[IWY3]-4K6D8RRBYCRQCH', 'IWY3')]
+
+		.. note::
+			Cada contenedor de páginas se lee una única vez y el texto se busca
+			sobre sus bytes descomprimidos (:class:`openerm.TextMatcher`), solo
+			se decodifican las páginas con ocurrencias.
+			Si el Database tiene índice de texto (:class:`openerm.TextIndex`)
+			solo se leen los contenedores de páginas candidatos. Los
+			contenedores con filtro de Bloom (:class:`openerm.BloomFilter`) que
+			no tienen los trigramas del texto no se descomprimen.
 
 		Return:
 			Lista de reportes y páginas
@@ -235,29 +324,142 @@ class Report(object):
 				* Página
 				* Posición en la página
 				* Extracto de la ocurrencia a modo de ejemplo
+				* Texto encontrado (solo con una lista de textos o una expresión regular)
 		"""
-		def sample(find, text, pos, lfind):
+		return list(self.iter_find_text(text, pages=pages, with_sample=with_sample))
+
+	def iter_find_text(self, text, limit=None, pages=None, with_sample=True):
+		"""Búsqueda de un texto, una lista de textos o una expresión regular
+		dentro del reporte, generando las ocurrencias a medida que se
+		encuentran. Los contenedores de páginas se leen recién cuando se
+		consumen las ocurrencias anteriores, por lo que cortar la iteración
+		termina la búsqueda.
+
+		Args:
+			text: Texto, lista de textos o expresión regular a buscar (ver :py:meth:`find_text`)
+			limit (int): (opcional) Cantidad máxima de ocurrencias
+			pages (tuple): (opcional) Rango (desde, hasta) de páginas donde
+				buscar, `None` en un extremo es sin límite
+			with_sample (bool): Armar el extracto de cada ocurrencia, sino se
+				informa `None` (Default: True)
+
+		Example:
+			>>> from openerm.Database import Database
+			>>> from openerm.Report import Report
+			>>> db = Database(file = "out/.sin_compression_sin_encriptacion.oerm")
+			>>> r = Report(db, 1)
+			>>> for o in r.iter_find_text("IWY3", limit=1, pages=(5, None), with_sample=False):
+			...     print(o)
+			(2, 10, 991, None)
 
-			start 	= pos - 15
-			end 	= pos + lfind + 15
+		Return:
+			generator: Ocurrencias con el formato de :py:meth:`find_text`
+		"""
+		if limit is not None:
+			yield from islice(self.iter_find_text(text, pages=pages, with_sample=with_sample), max(limit, 0))
+			return
+
+		# Búsqueda sobre los bytes de cada contenedor: solo se decodifican las
+		# páginas con ocurrencias (ver :class:`openerm.TextMatcher`)
+		matcher = TextMatcher(text)
+		for offset, first_page, _ in self._candidate_containers(text, pages=pages):
+			# (longitud_bloque, tipo_bloque, tipo_compresion, tipo_encriptacion, longitud_datos, data, variable_data)
+			_, _, _, _, _, data, var_data = self._get_block_data_from_offset(offset)
+			yield from matcher.iter_ocurrences(data, var_data, self.id, first_page, pages, with_sample)
 
-			if start < 0:
-				start = 0
+	def find_key(self, value, with_sample=True):
+		"""Búsqueda de un valor del campo clave del reporte con los "zone
+		maps" del índice (ver :class:`openerm.Index`): valor mínimo y máximo
+		de la clave en cada contenedor de páginas. Si el reporte está ordenado
+		por la clave se hace una búsqueda binaria y solo se leen los
+		contenedores cuyo rango incluye el valor (uno o dos). Los valores se
+		comparan como textos, las claves numéricas deben tener longitud fija.
 
-			if end > len(text):
-				end = len(text)
+		Args:
+			value (string): Valor de la clave
+			with_sample (bool): Armar el extracto de cada ocurrencia (Default: True)
 
-			return text[start:pos] + "-[" + find + "]-" + text[pos + lfind + 1:end]
+		Example:
+			>>> from openerm.Database import Database
+			>>> db = Database(file="out/L80001.oerm")
+			>>> db.reports().get_report(1).find_key("107161")
+			[(1, 1, 0, '-[107161]- Abregu        ')]
 
-		lfind 	= len(text)
-		ocurrences 	= []
-		for np in range(1, self.total_pages+1):
-			p = self.get_page(np)
-			if p:
-				pos = p.find(text)
-				while pos >= 0:
-					sampletext = sample(text, p, pos, lfind)
-					ocurrences.append((self.id, np, pos, sampletext.replace("\n", "")))
-					pos = p.find(text, pos + 1)
+		Return:
+			list: Ocurrencias del valor en los contenedores candidatos, con el
+			formato de :py:meth:`find_text`. Los contenedores sin zone map siempre
+			son candidatos.
+		"""
+		matcher = TextMatcher(value)
+		ocurrences = []
+		for offset, first_page in self._key_containers(value):
+			# (longitud_bloque, tipo_bloque, tipo_compresion, tipo_encriptacion, longitud_datos, data, variable_data)
+			_, _, _, _, _, data, var_data = self._get_block_data_from_offset(offset)
+			ocurrences.extend(matcher.iter_ocurrences(data, var_data, self.id, first_page, with_sample=with_sample))
 
 		return ocurrences
+
+	def _key_containers(self, value):
+		"""Contenedores cuyo zone map incluye un valor de la clave
+
+		Return:
+			list: (offset, primer página) de cada contenedor
+		"""
+		if self._key_zones is None:
+			zone_maps	= self.database.Index.zone_maps.get(self.id, {})
+			containers	= list(zip(self.containers_offset, self.containers_first_page))
+			con_zona	= [(c, zone_maps[c[0]]) for c in containers if c[0] in zone_maps]
+			sin_zona	= [c for c in containers if c[0] not in zone_maps]
+			ordenado	= all(a[1][1] <= b[1][0] for a, b in zip(con_zona, con_zona[1:]))
+			self._key_zones = (con_zona, sin_zona, ordenado, [z[1] for _, z in con_zona])
+
+		con_zona, sin_zona, ordenado, maximos = self._key_zones
+		if ordenado:
+			# Primer contenedor cuyo máximo no es menor al valor
+			i = bisect.bisect_left(maximos, value)
+			j = i
+			while j < len(con_zona) and con_zona[j][1][0] <= value:
+				j += 1
+			candidatos = [c for c, _ in con_zona[i:j]]
+		else:
+			candidatos = [c for c, z in con_zona if z[0] <= value <= z[1]]
+
+		return sorted(candidatos + sin_zona) if sin_zona else candidatos
+
+	def _candidate_containers(self, text, bloom=True, pages=None):
+		"""Contenedores donde buscar un texto: todos, o solo los que el índice
+		de texto (:class:`openerm.TextIndex`) y los filtros de Bloom de los
+		contenedores (:class:`openerm.BloomFilter`) no permiten descartar
+
+		Args:
+			text: Texto, lista de textos o expresión regular a buscar
+			bloom (bool): Consultar los filtros de Bloom. La búsqueda en
+				paralelo los consulta en cada proceso del pool
+			pages (tuple): (opcional) Solo los contenedores con páginas del
+				rango (desde, hasta)
+
+		Return:
+			generator: (offset, primer página, cantidad de páginas) de cada contenedor
+		"""
+		containers = zip(self.containers_offset, self.containers_first_page, self.containers_page_count)
+		text_index = self.database.TextIndex
+		candidates = text_index.candidates(text) if text_index is not None else None
+		if candidates is not None:
+			covered		= text_index.covered
+			containers	= (c for c in containers if c[0] in candidates or c[0] not in covered)
+
+		if pages is not None:
+			desde, hasta	= pages
+			containers		= (c for c in containers
+								if (desde is None or c[1] + c[2] - 1 >= desde) and (hasta is None or c[1] <= hasta))
+
+		query = BloomFilter.query(text) if bloom else None
+		if query is None:
+			return containers
+
+		return (c for c in containers if self._may_contain(c[0], query))
+
+	def _may_contain(self, container_offset, query):
+		"""Consulta el filtro de Bloom de un contenedor, True si no tiene"""
+		bloom_filter = container_filter(self._get_variable_data_from_offset(container_offset))
+		return bloom_filter is None or bloom_filter.may_contain(query)
@@ -22,6 +22,60 @@
 **ReportMatcher** es el objeto que identifica los reportes de una
 determinada cola de impresión. Lo hace mediante una serie de reglas que se
 definene en una archivo de configuración en formato YAML
+
+Las reglas se compilan al crear el matcher: los textos de todas las reglas
+se buscan en una única pasada por la página (ver
+:class:`openerm.TextMatcher`, que a partir de
+:py:attr:`openerm.TextMatcher.TextMatcher.automaton_threshold` textos usa un
+autómata de Aho-Corasick) y para cada ocurrencia solo resta verificar si
+cae dentro de la "caja" (líneas y columnas) de alguna regla. Si hay más de
+una regla que coincide se toma la primera según el orden de la configuración.
+
+Como las páginas consecutivas de un spool casi siempre son del mismo
+reporte, opcionalmente se prueba primero la última regla que coincidió
+("sticky", ver la nota y :py:attr:`ReportMatcher.hits` y
+:py:attr:`ReportMatcher.misses`). Además
+cada reporte, o todos mediante la sección ``Matcher``, puede limitar sus
+reglas a una ventana de cabecera: las primeras líneas y/o bytes de la
+página, fuera de la cual nunca se busca:
+
+.. code-block:: yaml
+
+	Matcher:
+		sticky: true			# Probar primero la última regla (Default: false)
+		window:					# Ventana de cabecera de todos los reportes
+			lines: 10
+			bytes: 2048
+	Reports:
+		"L80001 - CLIENTES - PERSONA NATURAL":
+			match:
+				L80001: [2, 3, 1, 8]
+			window:				# Ventana del reporte, tiene prioridad sobre la global
+				lines: 5
+
+Las reglas también pueden ser expresiones regulares (``regex``), que se
+aplican sobre la ventana de cabecera del reporte. Las de todos los reportes
+con la misma ventana se compilan en una única alternativa, de modo que
+alcanza con un solo ``re.search`` por página. Los grupos con nombre
+``fecha``, ``sistema`` y ``departamento`` completan los datos del reporte:
+
+.. code-block:: yaml
+
+	Reports:
+		"L80001 - CLIENTES - PERSONA NATURAL":
+			regex:
+				- 'L8000[12] +(?P<sistema>\\w+) .*(?P<fecha>\\d{8})'
+			window:
+				lines: 3
+
+Entre las expresiones regulares de una misma ventana gana la ocurrencia más
+cercana al inicio de la página (y en la misma posición la primera regla),
+no se pueden usar referencias numéricas (``\\1``) entre grupos.
+
+.. note::
+	Con "sticky" activo, si las reglas de dos reportes pueden coincidir con
+	una misma página se mantiene el reporte de la página anterior, en lugar
+	del primero según el orden de la configuración.
 """
 
 
@@ -31,14 +85,20 @@ try:
 	from gettext import gettext as _
 	gettext.textdomain('openerm')
 
+	import re
 	import yaml
+	import bisect
 	# import datetime
 
+	from openerm.TextMatcher import TextMatcher
+
 except ImportError as err:
 	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
 	print(_("No fue posible importar el modulo: %s") % modulename)
 	sys.exit(-1)
 
+_Pattern = type(re.compile(""))		# re.Pattern recién existe en Python 3.7
+
 
 class ReportMatcher(object):
 	"""Matcher de reportes
@@ -79,6 +139,82 @@ class ReportMatcher(object):
 			matches = rpt.get("match", {})
 			for match, box in matches.items():
 				self.matches.append((k, match, box))
+			for pattern in rpt.get("regex") or []:
+				try:
+					self.matches.append((k, re.compile(pattern), None))
+				except re.error as err:
+					raise ValueError(_("Expresión regular inválida en el reporte {0}: {1} ({2})").format(k, pattern, err))
+
+		#: Campos a extraer de las páginas de cada reporte (ver :class:`openerm.FieldIndex`)
+		self.fields = {k: rpt.get("fields") or {} for k, rpt in self.reports.items()}
+		#: Caja del campo clave de cada reporte (ver :py:meth:`openerm.Report.find_key`)
+		self.keys = {k: rpt["key"] for k, rpt in self.reports.items() if rpt.get("key")}
+
+		self._compile()
+
+	def _compile(self):
+		"""Compila las reglas: un único :class:`openerm.TextMatcher` con los
+		textos de todas las reglas y, por cada texto, las reglas (en orden)
+		que lo usan con sus límites (caja y ventana de cabecera)"""
+
+		opciones		= self.config.get("Matcher") or {}
+		ventana			= opciones.get("window") or {}
+
+		#: Probar primero la última regla que coincidió
+		self.sticky		= opciones.get("sticky", False)
+		self.hits		= 0			#: Páginas identificadas por la última regla que coincidió
+		self.misses		= 0			#: Páginas en las que la última regla no coincidió
+
+		#: Resultado de cada regla (ver :py:meth:`match`)
+		self._results	= []
+		self._limits	= []		# (línea desde, línea hasta, columna desde, columna hasta, bytes) de cada regla
+		self._rules		= {}		# Texto -> [(nro. de regla,) + límites]
+		self._direct	= False		# Hay textos que no se pueden buscar en latin1
+		self._last		= None		# Última regla que coincidió
+		grupos			= {}		# Ventana -> [(nro. de regla, expresión regular)]
+
+		for i, (reporte, match, box) in enumerate(self.matches):
+			rpt		= self.reports[reporte]
+			lineas	= (rpt.get("window") or {}).get("lines", ventana.get("lines"))
+			limite	= (rpt.get("window") or {}).get("bytes", ventana.get("bytes"))
+			self._results.append((reporte, rpt.get("system", "n/a"), rpt.get("department", "n/a"), None))
+
+			if box:
+				hasta	= box[1] if lineas is None else min(box[1], lineas)
+				limits	= (box[0], hasta, box[2] - 1, box[3] + 1, limite)
+			else:
+				limits	= (1, lineas, None, None, limite)
+			self._limits.append(limits)
+
+			if isinstance(match, _Pattern):
+				grupos.setdefault((lineas, limite), []).append((i, match))
+				continue
+
+			match = str(match)
+			if box and "\n" in match:
+				# Nunca coincide: las cajas se revisan línea por línea
+				continue
+			try:
+				match.encode("latin1")
+			except UnicodeEncodeError:
+				self._direct = True
+
+			self._rules.setdefault(match, []).append((i,) + limits)
+
+		# Hasta dónde revisar la página: la última línea o el último byte
+		# alcanzado por alguna regla de texto (0 = toda la página)
+		limits				= [l for l, (_, m, _) in zip(self._limits, self.matches) if not isinstance(m, _Pattern)]
+		self._scan_lines	= max((l[1] for l in limits if l[1] is not None), default=0)
+		self._scan_bytes	= max((l[4] for l in limits if l[1] is None and l[4] is not None), default=0)
+		if any(l[1] is None and l[4] is None for l in limits):
+			self._scan_lines = self._scan_bytes = 0
+
+		self._matcher = TextMatcher(list(self._rules)) if self._rules else None
+
+		#: Expresiones regulares de cada ventana de cabecera en una única
+		#: alternativa: (líneas, bytes, primer regla, expresión regular)
+		self._groups = [(lineas, limite, reglas[0][0], re.compile("|".join(_group_pattern(i, r) for i, r in reglas)))
+						for (lineas, limite), reglas in grupos.items()]
 
 	def __load_config_file(self):
 
@@ -116,21 +252,158 @@ class ReportMatcher(object):
 
 	@staticmethod
 	def _match_none(page):
-		return ("Sin Identificar", "n/a", "n/a", "n/a", None)
+		return ("Sin Identificar", "n/a", "n/a", None)
 
 	def _match_report(self, text):
 
-		for reporte, match, box in self.matches:
+		if self.sticky and self._last is not None:
+			result = self._match_rule(self._last, text)
+			if result:
+				self.hits += 1
+				return result
+			self.misses += 1
 
-			if box:
-				for i, l in enumerate(text.split("\n"), 1):
-					if i in range(box[0], box[1]+1):
-						if match in l[box[2]-1:box[3]+1]:
-							r = self.reports[reporte]
-							return (reporte, r["system"], r["department"], None)
+		best	= self._match_texts(text)
+		result	= None
+		for lineas, limite, primera, regex in self._groups:
+			if primera >= best:
+				continue
+			m = regex.search(_head(text, lineas, limite))
+			if m:
+				i = int(m.lastgroup[2:])
+				if i < best:
+					best, result = i, self._regex_result(i, m.groupdict(), "_r{0}_".format(i))
+
+		if best < len(self._results):
+			self._last = best
+			return result or self._results[best]
+
+		return self._match_none(text)
+
+	def _match_texts(self, text):
+		"""Primer regla de texto (no expresión regular) que coincide
+
+		Return:
+			int: Número de la regla o la cantidad de reglas si ninguna coincide
+		"""
+		if self._matcher is None:
+			return len(self._results)
+
+		if self._direct:
+			return self._match_lines(text)
+
+		try:
+			data = text.encode("latin1")
+		except UnicodeEncodeError:
+			return self._match_lines(text)
+
+		if self._scan_lines or self._scan_bytes:
+			# Solo las líneas y bytes alcanzados por alguna regla
+			end = _line_end(data, self._scan_lines, b"\n") if self._scan_lines else 0
+			end = max(end, self._scan_bytes)
+			if end < len(data):
+				data = data[:end]
+
+		best	= len(self._results)
+		starts	= None
+		for pos, length, match in self._matcher.finditer(data):
+			for i, desde, hasta, col_desde, col_hasta, limite in self._rules[match]:
+				if i >= best:
+					break
+				if limite is not None and pos + length > limite:
+					continue
+				if hasta is None and col_desde is None:
+					best = i
+					break
+
+				if starts is None:
+					starts = [0]
+					nl = data.find(b"\n")
+					while nl >= 0:
+						starts.append(nl + 1)
+						nl = data.find(b"\n", nl + 1)
+
+				line	= bisect.bisect_right(starts, pos)
+				if line < desde or (hasta is not None and bisect.bisect_right(starts, pos + length - 1) > hasta):
+					continue
+				col		= pos - starts[line - 1]
+				if col_desde is None or (col_desde <= col and col + length <= col_hasta):
+					best = i
+					break
+
+			if best == 0:
+				break
+
+		return best
+
+	def _match_lines(self, text):
+		"""Evaluación de las reglas de texto una por una (páginas o textos
+		con caracteres fuera de latin1)"""
+		for i, (_, match, _) in enumerate(self.matches):
+			if not isinstance(match, _Pattern) and self._match_rule(i, text):
+				return i
+
+		return len(self._results)
+
+	def _match_rule(self, i, text):
+		"""Evalúa una única regla sobre el texto de una página
+
+		Return:
+			tuple: Datos del reporte (ver :py:meth:`match`) o None si no coincide
+		"""
+		match				= self.matches[i][1]
+		desde, hasta, col_desde, col_hasta, limite = self._limits[i]
+
+		head = _head(text, hasta, limite)
+		if isinstance(match, _Pattern):
+			m = match.search(head)
+			return self._regex_result(i, m.groupdict()) if m else None
+
+		match = str(match)
+		if col_desde is None:
+			found = match in head
+		else:
+			found = any(match in l[col_desde:col_hasta] for l in head.split("\n")[desde - 1:])
+
+		return self._results[i] if found else None
+
+	def _regex_result(self, i, groups, prefix=""):
+		"""Datos del reporte de una regla con expresión regular: los grupos
+		`sistema`, `departamento` y `fecha` reemplazan a los de la configuración"""
+		reporte, sistema, departamento, fecha = self._results[i]
+		return (reporte,
+				groups.get(prefix + "sistema") or sistema,
+				groups.get(prefix + "departamento") or departamento,
+				groups.get(prefix + "fecha") or fecha)
+
+
+def _head(text, lines, limit):
+	"""Ventana de cabecera de una página: las primeras líneas y/o bytes"""
+	head = text[:limit] if limit is not None else text
+	if lines is not None:
+		head = head[:_line_end(head, lines, "\n")]
+	return head
+
+
+def _group_pattern(i, regex):
+	"""Expresión regular de una regla como alternativa de un grupo: se
+	identifica con el grupo `_r<regla>` y sus grupos con nombre se prefijan
+	con el mismo nombre para que no se repitan entre reglas"""
+	pattern = regex.pattern
+	flags	= re.match(r"\(\?([aiLmsux]+)\)", pattern)
+	if flags:
+		# Las opciones globales solo pueden ir al inicio de la expresión
+		pattern = "(?{0}:{1})".format(flags.group(1), pattern[flags.end():])
+	pattern = re.sub(r"\(\?P<(\w+)>", r"(?P<_r{0}_\1>".format(i), pattern)
+	pattern = re.sub(r"\(\?P=(\w+)\)", r"(?P=_r{0}_\1)".format(i), pattern)
+	return "(?P<_r{0}>{1})".format(i, pattern)
 
-			else:
-				if match in text:
-					return (reporte, "n/a", "n/a", "n/a", None)
 
-		return (reporte, r["system"], r["department"], None)
+def _line_end(text, lines, nl):
+	"""Fin de las primeras líneas de un texto (sin el último salto de línea)"""
+	end = -1
+	for _ in range(lines):
+		end = text.find(nl, end + 1)
+		if end < 0:
+			return len(text)
+	return end
@@ -39,8 +39,13 @@ try:
 	from gettext import gettext as _
 	gettext.textdomain('openerm')
 	import sys
+	import struct
+	from itertools import repeat, islice
 
 	from openerm.Report import Report
+	from openerm.Block import Block
+	from openerm.TextMatcher import TextMatcher
+	from openerm.BloomFilter import BloomFilter, container_filter
 
 except ImportError as err:
 	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
@@ -48,6 +53,69 @@ except ImportError as err:
 	sys.exit(-1)
 
 
+#: Archivos, bloques y último TextMatcher de cada proceso del pool de búsqueda
+_worker_files	= {}
+_worker_block	= []
+_worker_matcher	= {}
+
+
+def _read_block(filename, offset):
+	"""Lee un bloque del Database con el archivo abierto por el proceso"""
+	file = _worker_files.get(filename)
+	if file is None:
+		file = open(filename, mode="rb")
+		_worker_files[filename] = file
+
+	file.seek(offset)
+	longitud_bloque = struct.unpack(">L", file.read(4))[0]
+	file.seek(offset)
+	return file.read(longitud_bloque)
+
+
+def _find_in_containers(filename, text, containers, pages=None, with_sample=True):
+	"""Búsqueda de un texto en un grupo de contenedores de páginas dentro
+	de un proceso del pool de búsqueda. Cada proceso abre su propio archivo
+	y busca sobre los bytes de las páginas, solo se decodifican las páginas
+	con ocurrencias (para armar el extracto). Los contenedores cuyo filtro de
+	Bloom (:class:`openerm.BloomFilter`) no tiene los trigramas del texto no
+	se descomprimen.
+
+	Args:
+		filename (string): Archivo del Database
+		text: Texto, lista de textos o expresión regular a buscar (ver :class:`openerm.TextMatcher`)
+		containers (list): (id del reporte, offset, primer página) de cada contenedor
+		pages (tuple): (opcional) Rango (desde, hasta) de páginas
+		with_sample (bool): Armar el extracto de cada ocurrencia
+
+	Return:
+		list: Ocurrencias, ver :py:meth:`openerm.Report.find_text`
+	"""
+	if not _worker_block:
+		_worker_block.append(Block())
+
+	# El autómata de una lista de textos se arma una única vez por búsqueda
+	key		= TextMatcher.key(text)
+	if key not in _worker_matcher:
+		_worker_matcher.clear()
+		_worker_matcher[key] = (TextMatcher(text), BloomFilter.query(text))
+	matcher, query = _worker_matcher[key]
+
+	block		= _worker_block[0]
+	ocurrences	= []
+	for report_id, offset, first_page in containers:
+		raw = _read_block(filename, offset)
+		if query is not None:
+			bloom_filter = container_filter(Block.load_variable_data(raw))
+			if bloom_filter is not None and not bloom_filter.may_contain(query):
+				continue
+
+		# (longitud_bloque, tipo_bloque, tipo_compresion, tipo_encriptacion, longitud_datos, data, variable_data)
+		_, _, _, _, _, data, var_data = block.load(raw)
+		ocurrences.extend(matcher.iter_ocurrences(data, var_data, report_id, first_page, pages, with_sample))
+
+	return ocurrences
+
+
 class Reports(object):
 	"""Clase base para manejar una colección de reportes correspondientes a
 	un Database OERM.
@@ -117,12 +185,15 @@ class Reports(object):
 
 		return r
 
-	def find_text(self, text, search_in_reports=None):
+	def find_text(self, text, search_in_reports=None, workers=None):
 		"""Búsqueda de un texto dentro de uno o más reportes
 
 		Args:
-			text (string): Patrón de texto a buscar
+			text: Texto, lista de textos o expresión regular compilada a buscar
+				(ver :py:meth:`openerm.Report.find_text`)
 			search_in_reports (list): Lista de id´s de reportes dónde buscar o None en todos
+			workers (int): Cantidad de procesos para buscar en paralelo, 0 en
+				este proceso (Default: `workers` del Database)
 
 		Example:
 			>>> from openerm.Database import Database
@@ -139,15 +210,65 @@ class Reports(object):
 				* Posición en la página
 				* Extracto de la ocurrencia a modo de ejemplo
 		"""
-		matches = []
-		if not search_in_reports:
-			reports = []
+		return list(self.iter_find_text(text, search_in_reports, workers=workers))
+
+	def iter_find_text(self, text, search_in_reports=None, limit=None, pages=None, with_sample=True, workers=None):
+		"""Búsqueda de un texto dentro de uno o más reportes, generando las
+		ocurrencias a medida que se encuentran. Cortar la iteración termina la
+		búsqueda (y cancela los grupos de contenedores pendientes de la
+		búsqueda en paralelo).
+
+		Args:
+			text: Texto, lista de textos o expresión regular compilada a buscar
+				(ver :py:meth:`openerm.Report.find_text`)
+			search_in_reports (list): Lista de id´s de reportes dónde buscar o None en todos
+			limit (int): (opcional) Cantidad máxima de ocurrencias
+			pages (tuple): (opcional) Rango (desde, hasta) de páginas de cada
+				reporte, ver :py:meth:`openerm.Report.iter_find_text`
+			with_sample (bool): Armar el extracto de cada ocurrencia, sino se
+				informa `None` (Default: True)
+			workers (int): Cantidad de procesos para buscar en paralelo, 0 en
+				este proceso (Default: `workers` del Database)
+
+		Return:
+			generator: Ocurrencias con el formato de :py:meth:`find_text`
+		"""
+		workers = self.database.workers if workers is None else workers
+		if workers:
+			ocurrences = self._parallel_find_text(text, search_in_reports, workers, pages, with_sample)
 		else:
-			reports	= search_in_reports
+			reports		= search_in_reports or []
+			ocurrences	= (o for r in self if r.id in reports or not reports
+							for o in r.iter_find_text(text, pages=pages, with_sample=with_sample))
+
+		if limit is not None:
+			ocurrences = islice(ocurrences, max(limit, 0))
 
-		for r in [r for r in self if r.id in reports or not reports]:
-			lista = r.find_text(text)
-			if lista:
-				matches.extend(lista)
+		yield from ocurrences
 
-		return matches
+	def _parallel_find_text(self, text, search_in_reports, workers, pages=None, with_sample=True):
+		"""Búsqueda de un texto repartiendo los contenedores de páginas en un
+		pool de procesos. Las ocurrencias se generan a medida que terminan los
+		grupos de contenedores, en orden de reporte, página y posición.
+
+		Return:
+			generator: (reporte, página, posición, extracto) de cada ocurrencia
+		"""
+		reports		= search_in_reports or []
+		containers	= [(r.id, offset, first_page)
+						for r in self if r.id in reports or not reports
+						for offset, first_page, _ in r._candidate_containers(text, bloom=False, pages=pages)]
+		if not containers:
+			return
+
+		chunksize	= max(1, min(32, len(containers) // (4 * workers)))
+		chunks		= [containers[i:i + chunksize] for i in range(0, len(containers), chunksize)]
+		pool		= self.database._search_pool(workers)
+		results		= pool.map(_find_in_containers, repeat(self.database._filename), repeat(text), chunks,
+								repeat(pages), repeat(with_sample))
+		try:
+			for ocurrences in results:
+				yield from ocurrences
+		finally:
+			# Cancela los grupos pendientes si se corta la iteración
+			results.close()
@@ -25,11 +25,47 @@ plataformas IBM, archivos en EBCDIC con una longitud de registro de 256 bytes
 son habituales de ver. Cada registro representa una línea, puede eventualmente
 ser del tipo FCFC, y contar con un canal de control.
 
+Con `mmap` el archivo se lee como bytes mapeados en memoria: los inicios de
+página se buscan sobre el primer byte de cada registro (un único recorte
+"salteado" de la memoria por bloque de registros) y cada página se decodifica
+de una sola vez, separando sus registros sin código Python por registro. Este
+modo requiere una codificación de un byte por carácter (cp500, cp037,
+latin1, etc.) y, a diferencia de la lectura como texto, no traduce los
+``\r`` de los datos a saltos de línea.
+
+Con `translate` (archivos EBCDIC: cp037, cp500, cp1140, etc.) cada bloque
+leído se traduce completo a latin1 con una tabla de `bytes.translate` (ver
+:func:`openerm.Utils.latin1_table`) antes de buscar los saltos de página y
+las páginas se decodifican como latin1, sin pasar por el codec de la
+codificación. Los códigos de control de carro (primer byte de cada registro)
+se evalúan con el mismo recorte "salteado" de cada bloque traducido. Se puede
+combinar con `mmap`, sin `mmap` el archivo se lee con `read` en bloques de
+registros completos.
+
 
 .. seealso::
 	* :class:`openerm.SpoolHostReprint`
 """
 
+try:
+	import gettext
+	from gettext import gettext as _
+	gettext.textdomain('openerm')
+
+	import os
+	import sys
+	import mmap
+
+	sys.path.append('.')
+	sys.path.append('..')
+
+	from openerm.Utils import single_byte_encoding, latin1_table
+
+except ImportError as err:
+	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
+	print(_("No fue posible importar el modulo: %s") % modulename)
+	sys.exit(-1)
+
 
 class SpoolFixedRecordLength(object):
 	"""Clase base para lectura de archivos de tamaño de registro fijo.
@@ -42,6 +78,10 @@ class SpoolFixedRecordLength(object):
 		record_len (int): 	Opcional, Longitud de registro (por defecto 256)
 		newpage_code (string):
 							Opcional, Cadena o carácter que determina el salto de página
+		mmap (bool): 		Opcional, Leer el archivo como bytes mapeados en memoria.
+							Por defecto False
+		translate (bool): 	Opcional, Traducir los bloques leídos a latin1 con
+							`bytes.translate` (codificaciones EBCDIC). Por defecto False
 
 	Return:
 		None
@@ -53,7 +93,7 @@ class SpoolFixedRecordLength(object):
 		>>>			print(page)
 
 	"""
-	def __init__(self, inputfile, buffer_size=102400, encoding="Latin1", record_len=256, newpage_code="1"):
+	def __init__(self, inputfile, buffer_size=102400, encoding="Latin1", record_len=256, newpage_code="1", mmap=False, translate=False):
 
 		self.filename		= inputfile
 		self.buffer_size	= buffer_size
@@ -69,14 +109,45 @@ class SpoolFixedRecordLength(object):
 		self._lines			= []
 		self._newpage		= False
 
+		self.use_mmap		= mmap
+		self._mmap			= None
+		self._pages			= None
+
+		self.translate		= translate
+		self._table			= None
+		self._replaces		= []
+		self._codec			= encoding
+
 	def __enter__(self):
 		"Apertura del archivo del spool a procesar"
 		# file_size		= os.path.getsize(self.filename)
-		self.open_file 	= open(self.filename, mode="r", encoding=self.encoding)
+		if self.use_mmap or self.translate:
+			if not single_byte_encoding(self.encoding):
+				raise ValueError(_("La lectura como bytes (mmap, translate) requiere una codificación de un byte por carácter: {0}").format(self.encoding))
+			if self.translate:
+				latin1 = latin1_table(self.encoding)
+				if latin1 is None:
+					raise ValueError(_("La codificación no se puede traducir a latin1: {0}").format(self.encoding))
+				self._table, self._replaces = latin1
+				self._codec	= "latin1"
+			self.open_file 	= open(self.filename, mode="rb")
+			if self.use_mmap and os.fstat(self.open_file.fileno()).st_size:
+				self._mmap	= mmap.mmap(self.open_file.fileno(), 0, access=mmap.ACCESS_READ)
+			if self.translate:
+				self._pages	= self._iter_translated_pages(self._mmap if self._mmap is not None else self.open_file)
+			else:
+				self._pages	= self._iter_pages(self._mmap if self._mmap is not None else b"")
+		else:
+			self.open_file 	= open(self.filename, mode="r", encoding=self.encoding)
 		return self
 
 	def __exit__(self, *args):
 		"Cierre automatico del spool"
+		if self._pages is not None:
+			self._pages.close()
+		if self._mmap is not None:
+			self._mmap.close()
+			self._mmap = None
 		self.open_file.close()
 		return True
 
@@ -86,6 +157,9 @@ class SpoolFixedRecordLength(object):
 	def __next__(self):
 		"""Devuelve una página del spool"""
 
+		if self._pages is not None:
+			return next(self._pages)
+
 		if self._current_page is None:
 			raise StopIteration
 
@@ -105,3 +179,86 @@ class SpoolFixedRecordLength(object):
 				return page
 			else:
 				self._current_page += line
+
+	def _iter_pages(self, data):
+		"""Páginas de un spool mapeado en memoria (ver `mmap`)"""
+		size		= len(data)
+		record_len	= self.record_len
+		first_byte	= self.newpage_code.encode(self.encoding)[:1]
+		chunk		= max(self.buffer_size // record_len, 1) * record_len
+		view		= memoryview(data)
+		start		= 0
+		try:
+			for base in range(0, size, chunk):
+				# Primer byte de cada registro del bloque
+				firsts	= bytes(view[base:base + chunk:record_len])
+				pos		= firsts.find(first_byte)
+				while 0 <= pos < len(firsts):
+					offset = base + pos * record_len
+					if offset > start and self._is_newpage(data, offset):
+						yield self._decode_page(data[start:offset])
+						start = offset
+					pos = firsts.find(first_byte, pos + 1)
+
+			yield self._decode_page(data[start:size])
+		finally:
+			view.release()
+
+	def _iter_translated_pages(self, source):
+		"""Páginas de un spool leído en bloques de registros completos (del
+		archivo o del mmap) traducidos a latin1 (ver `translate`). Una página
+		incompleta al final de un bloque continúa en el siguiente"""
+		record_len	= self.record_len
+		table		= self._table
+		first_byte	= self.newpage_code.encode(self.encoding).translate(table)[:1]
+		size		= max(self.buffer_size // record_len, 1) * record_len
+		parts		= []				# Trozos de la página en curso
+
+		chunk = source.read(size)
+		while chunk:
+			chunk	= chunk.translate(table)
+			firsts	= chunk[::record_len]
+			start	= 0
+			pos		= firsts.find(first_byte)
+			while 0 <= pos < len(firsts):
+				offset = pos * record_len
+				if (offset > start or parts) and self._is_newpage(chunk, offset):
+					parts.append(chunk[start:offset])
+					yield self._decode_page(b"".join(parts))
+					parts = []
+					start = offset
+				pos = firsts.find(first_byte, pos + 1)
+
+			parts.append(chunk[start:])
+			chunk = source.read(size)
+
+		yield self._decode_page(b"".join(parts))
+
+	def _is_newpage(self, data, offset):
+		"""Indica si el registro de un offset comienza una página"""
+		code = self.newpage_code
+		if self._decode(data[offset:offset + self.lnewpage_code]) != code:
+			return False
+		if code and not code[-1].isspace():
+			return True
+
+		# Como en la lectura como texto, el código se compara con la línea sin los espacios finales
+		line = self._decode(data[offset:offset + self.record_len]).rstrip() + "\n"
+		return line[0:self.lnewpage_code] == code
+
+	def _decode(self, data):
+		"""Decodifica bytes del archivo (o traducidos a latin1)"""
+		text = data.decode(self._codec)
+		for char, original in self._replaces:
+			text = text.replace(char, original)
+		return text
+
+	def _decode_page(self, data):
+		"""Decodifica los registros de una página de una sola vez y los
+		separa en líneas (sin los espacios finales)"""
+		text	= self._decode(data)
+		size	= len(text)
+		if not size:
+			return ""
+		lines	= map(str.rstrip, map(text.__getitem__, map(slice, range(0, size, self.record_len), range(self.record_len, size + self.record_len, self.record_len))))
+		return "\n".join(lines) + "\n"
@@ -25,11 +25,43 @@ representa un "canal" de control para la impresora. Esta clase considera esta
 columna  y particularmente el codigo "1" que representa el salto de pagina.
 Esta columna podra ser quitada o no segun se requiera.
 
+El archivo se lee en bloques de `buffer_size` bytes y en cada bloque se buscan
+los saltos de página (un salto de línea seguido de un "1") con ``find``. Las
+páginas se arman con los trozos de los bloques y se decodifican de una sola
+vez, una página incompleta al final de un bloque continúa en el siguiente.
+Con codificaciones de un byte por carácter o UTF-8 la búsqueda se hace sobre
+los bytes, los ``\r\n`` y ``\r`` se convierten en ``\n`` igual que en la
+lectura como texto.
+
+Con `translate` (archivos EBCDIC: cp037, cp500, cp1140, etc.) cada bloque
+leído se traduce completo a latin1 con una tabla de `bytes.translate` (ver
+:func:`openerm.Utils.latin1_table`) antes de buscar los saltos de página y
+las páginas se decodifican como latin1, sin pasar por el codec de la
+codificación.
+
 .. seealso::
 	* :class:`openerm.SpoolFixedRecordLength`
 
 """
 
+try:
+	import gettext
+	from gettext import gettext as _
+	gettext.textdomain('openerm')
+
+	import sys
+	import codecs
+
+	sys.path.append('.')
+	sys.path.append('..')
+
+	from openerm.Utils import single_byte_encoding, latin1_table
+
+except ImportError as err:
+	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
+	print(_("No fue posible importar el modulo: %s") % modulename)
+	sys.exit(-1)
+
 
 class SpoolHostReprint(object):
 	"""Clase base para lectura de archivos tipo "host reprint".
@@ -39,6 +71,8 @@ class SpoolHostReprint(object):
 		buffer_size (int): 	Opcional, tamaño del buffer de lectura.
 							Por defecto 102400 bytes.
 		encoding (string): 	Opcional, Codificación de lectura. Por defecto `Latin1`
+		translate (bool): 	Opcional, Traducir los bloques leídos a latin1 con
+							`bytes.translate` (codificaciones EBCDIC). Por defecto False
 
 	Return:
 		None
@@ -50,25 +84,35 @@ class SpoolHostReprint(object):
 		>>>			print(page)
 
 	"""
-	def __init__(self, inputfile, buffer_size=102400, encoding="Latin1"):
+	def __init__(self, inputfile, buffer_size=102400, encoding="Latin1", translate=False):
 
 		self.filename		= inputfile
 		self.buffer_size	= buffer_size
 		self.encoding		= encoding
 
-		self._current_line	= 0
-		self._current_page	= ""
-		self._last_chunk	= False
+		#: Lectura de los bytes del archivo (o del texto si la codificación no lo permite)
+		self.binary			= single_byte_encoding(encoding) or codecs.lookup(encoding).name == "utf-8"
+		self._pages			= None
 
-		self._lines			= []
+		self.translate		= translate
+		self._latin1		= None
 
 	def __enter__(self):
 		"Apertura del archivo del spool a procesar"
-		self.open_file = open(self.filename, mode="rt", encoding=self.encoding)
+		if self.translate:
+			self._latin1 = latin1_table(self.encoding) if single_byte_encoding(self.encoding) else None
+			if self._latin1 is None:
+				raise ValueError(_("La codificación no se puede traducir a latin1: {0}").format(self.encoding))
+		if self.binary:
+			self.open_file = open(self.filename, mode="rb")
+		else:
+			self.open_file = open(self.filename, mode="rt", encoding=self.encoding)
+		self._pages = self._iter_pages()
 		return self
 
 	def __exit__(self, *args):
 		"Cierre automatico del spool"
+		self._pages.close()
 		self.open_file.close()
 		return True
 
@@ -82,28 +126,66 @@ class SpoolHostReprint(object):
 			string: Texto completo de la página
 
 		"""
-
-		if self._current_line >= len(self._lines):
-			self._lines = self.open_file.readlines(self.buffer_size)
-			if not self._lines:
-				if self._current_page == "":
-					raise StopIteration
-				else:
-					page = self._current_page
-					self._current_page = ""
-					return page
-
-			self._current_line = 0
-
-		for line in self._lines[self._current_line:]:
-			self._current_line += 1
-			if line[0] == "1" and self._current_page != "":
-				page = self._current_page
-				#s elf._current_page =  line[1:] # <- Se quita la pimer columna de comandos
-				self._current_page = line
-				return page
-
-			# self._current_page = self._current_page + line[1:] # <- Se quita la pimer columna de comandos
-			self._current_page += line
-
-		return self.__next__()
+		return next(self._pages)
+
+	def _iter_pages(self):
+		"""Páginas del spool: los bloques leídos se cortan en cada salto de
+		página y los trozos de cada página se unen y decodifican una sola vez"""
+		table, replaces	= self._latin1 if self._latin1 is not None else (None, [])
+		if self.binary:
+			newline, newpage, cr	= (c.encode(self.encoding).translate(table) for c in "\n1\r")
+			codec					= "latin1" if table else self.encoding
+
+			def decode(parts):
+				text = b"".join(parts).decode(codec)
+				for char, original in replaces:
+					text = text.replace(char, original)
+				return text
+		else:
+			newline, newpage, cr	= ("\n", "1", None)
+			decode					= "".join
+
+		separator	= newline + newpage
+		crlf		= cr + newline if cr else None
+		parts		= []				# Trozos de la página en curso
+		newline_end	= False				# El bloque anterior termina en un salto de línea
+		pending_cr	= cr[:0] if cr else None	# \r del final del bloque anterior
+
+		while True:
+			chunk	= self.open_file.read(self.buffer_size)
+			eof		= not chunk
+			if table:
+				chunk = chunk.translate(table)
+			if cr:
+				# Fin de línea universal, como en la lectura como texto. Un \r al
+				# final del bloque espera al siguiente por si sigue un \n
+				chunk, pending_cr = pending_cr + chunk, cr[:0]
+				if cr in chunk:
+					if not eof and chunk.endswith(cr):
+						chunk, pending_cr = chunk[:-len(cr)], cr
+					chunk = chunk.replace(crlf, newline).replace(cr, newline)
+
+			if chunk:
+				pos = 0
+				if newline_end and parts and chunk.startswith(newpage):
+					yield decode(parts)
+					parts = []
+
+				found = chunk.find(separator)
+				while found >= 0:
+					end = found + len(newline)
+					parts.append(chunk[pos:end])
+					yield decode(parts)
+					parts = []
+					pos = end
+					found = chunk.find(separator, pos)
+
+				if pos < len(chunk):
+					parts.append(chunk[pos:])
+				newline_end = chunk.endswith(newline)
+
+			if eof:
+				break
+
+		if parts:
+			yield decode(parts)
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# TextIndex.py
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+"""
+TextIndex
+=========
+
+Índice de texto completo (opcional) de un :class:`openerm.Database`. Registra
+para cada contenedor de páginas los trigramas (secuencias de 3 bytes) de sus
+páginas, de modo que una búsqueda de texto solo descomprime los contenedores
+que tienen todos los trigramas del texto buscado.
+
+Se representa físicamente por el archivo **<database>**.tidx
+
+.. seealso::
+	* :class:`openerm.Database`
+	* :class:`openerm.Index`
+
+"""
+
+try:
+	import gettext
+	from gettext import gettext as _
+	gettext.textdomain('openerm')
+
+	import os
+	import sys
+	import struct
+	from collections import defaultdict
+
+except ImportError as err:
+	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
+	print(_("No fue posible importar el modulo: %s") % modulename)
+	sys.exit(-1)
+
+
+#: Posición de cada byte del trigrama en un entero de 4 bytes nativo, de
+#: modo que su valor sea el del trigrama en big endian
+_trigram_slots = (2, 1, 0) if sys.byteorder == "little" else (1, 2, 3)
+
+
+def trigrams(data):
+	"""Retorna los trigramas distintos de un texto. Los trigramas se
+	intercalan en un buffer de enteros de 4 bytes con asignaciones por
+	slices, de modo que su extracción no requiere un ciclo en Python.
+
+	Args:
+		data (bytes): Texto (las páginas de un contenedor codificadas en latin1)
+
+	Return:
+		set: Trigramas, como enteros (``int.from_bytes(trigrama, "big")``)
+	"""
+	total = len(data) - 2
+	if total <= 0:
+		return set()
+
+	buffer = bytearray(4 * total)
+	for i, slot in enumerate(_trigram_slots):
+		buffer[slot::4] = data[i:i + total]
+
+	return set(memoryview(buffer).cast("I"))
+
+
+class TextIndex(object):
+	"""Índice de trigramas de los contenedores de páginas de un Database.
+
+	Args:
+		oermdb_file (string): Nombre del archivo físico del Database
+
+	Example:
+		>>> from openerm.Database import Database
+		>>> db = Database(file="out/test.oerm", mode="wb", text_index=True)
+		>>> # ...
+		>>> db = Database(file="out/test.oerm")
+		>>> db.TextIndex.candidates("IWY3")
+		{1234, 56789}
+
+	.. note::
+		El archivo comienza con una cabecera ``"otix"`` + versión (5 bytes) y
+		luego se agrega un segmento por cada checkpoint del Database (ver
+		:py:meth:`checkpoint`), con los contenedores salvados desde el
+		anterior:
+
+		.. code-block:: none
+
+			+========+==========+=============+=================+===========+=============+=============+===========+
+			| "tseg" | Longitud | Contenedores| Offsets en .oerm| Trigramas | Trigramas   | Inicio lista| Listas    |
+			+========+==========+=============+=================+===========+=============+=============+===========+
+			   4s         Q            L          Q x n             L         3s x t (ord.)  L x (t + 1)   H x total (*)
+
+		Para cada trigrama (ordenados) se registra la lista de contenedores
+		del segmento (por posición en el segmento) que lo contienen (*) los
+		elementos de las listas son ``L`` si el segmento tiene más de 65535
+		contenedores. La selectividad del índice depende del tamaño de los
+		contenedores: cuanto menos páginas tienen, menos trigramas comparten
+		y más contenedores se descartan en una búsqueda. Un
+		segmento incompleto al final del archivo (una caída durante el
+		checkpoint) se descarta. Los contenedores que no están en ningún
+		segmento (por ejemplo agregados a un Database sin índice de texto)
+		no se pueden descartar y siempre son candidatos.
+	"""
+
+	#: Versión del formato del índice que se escribe
+	version			= 1
+	_header_fmt		= ">4sB"
+	_segment_fmt	= ">4sQ"
+
+	def __init__(self, oermdb_file):
+
+		self.textidx_file	= "{0}.tidx".format(oermdb_file)
+		self.covered		= set()		#: Offsets de los contenedores indexados
+		self._segments		= []		# (offsets, cantidad de trigramas, offset del directorio en .tidx)
+		self._directories	= []		# (trigramas, inicios) de cada segmento, se leen al consultarlos
+		self._pending		= []		# (offset, trigramas) de los contenedores aún no salvados
+		self._end			= None		# Fin del último segmento completo
+		self._file			= None
+
+	@staticmethod
+	def exists(oermdb_file):
+		"""Indica si un Database tiene índice de texto"""
+		return os.path.isfile("{0}.tidx".format(oermdb_file))
+
+	def add_container(self, container_offset, container_trigrams):
+		"""Agrega un contenedor de páginas al índice
+
+		Args:
+			container_offset (int): Offset del contenedor en el Database
+			container_trigrams (set): Trigramas de las páginas del contenedor (ver :py:func:`trigrams`)
+		"""
+		self._pending.append((container_offset, container_trigrams))
+		self.covered.add(container_offset)
+
+	def begin(self, mode="ab"):
+		"""Abre el índice para agregar segmentos con :py:meth:`checkpoint`
+
+		Args:
+			mode (string): 'wb' crea un índice vacío, 'ab' agrega al índice existente
+		"""
+		if mode == "ab" and os.path.isfile(self.textidx_file):
+			if self._end is None:
+				self.read()
+			# Descartar un segmento incompleto de un checkpoint interrumpido
+			with open(self.textidx_file, mode="r+b") as file:
+				file.truncate(self._end)
+			self._file = open(self.textidx_file, mode="ab")
+		else:
+			self._file = open(self.textidx_file, mode="wb")
+			self._file.write(struct.pack(self._header_fmt, b"otix", self.version))
+
+	def checkpoint(self):
+		"""Salva un segmento con los contenedores agregados desde el último
+		checkpoint y lo sincroniza a disco"""
+		if self._file is None or not self._pending:
+			return
+
+		postings = defaultdict(list)
+		for i, (_, container_trigrams) in enumerate(self._pending):
+			for t in container_trigrams:
+				postings[t].append(i)
+
+		keys	= sorted(postings)
+		starts	= [0]
+		lists	= []
+		for t in keys:
+			lists.extend(postings[t])
+			starts.append(len(lists))
+
+		offsets	= [offset for offset, _ in self._pending]
+		data	= b"".join((struct.pack(">L{0}Q".format(len(offsets)), len(offsets), *offsets),
+							struct.pack(">L", len(keys)),
+							b"".join(t.to_bytes(3, "big") for t in keys),
+							struct.pack(">{0}L".format(len(starts)), *starts),
+							struct.pack(">{0}{1}".format(len(lists), self._list_type(len(offsets))), *lists)))
+
+		self._file.write(struct.pack(self._segment_fmt, b"tseg", len(data)))
+		self._file.write(data)
+		self._file.flush()
+		os.fsync(self._file.fileno())
+
+		self._pending = []
+
+	def close(self):
+		"""Salva los datos pendientes (:py:meth:`checkpoint`) y cierra el índice"""
+		if self._file is None:
+			return
+
+		self.checkpoint()
+		self._file.close()
+		self._file = None
+
+	def read(self):
+		"""Lee los offsets de los contenedores de los segmentos del índice,
+		los directorios de trigramas y las listas de contenedores se leen
+		recién al consultarlos (ver :py:meth:`candidates`)"""
+		segment_len = struct.calcsize(self._segment_fmt)
+
+		with open(self.textidx_file, mode="rb") as file:
+			size = os.fstat(file.fileno()).st_size
+			magic_number, _ = struct.unpack(self._header_fmt, file.read(struct.calcsize(self._header_fmt)))
+			if magic_number != b"otix":
+				raise ValueError(_('{0} no es un índice de texto válido!').format(self.textidx_file))
+
+			self._end = file.tell()
+			while True:
+				data = file.read(segment_len)
+				if len(data) < segment_len:
+					break
+				magic_number, length = struct.unpack(self._segment_fmt, data)
+				start = file.tell()
+				if magic_number != b"tseg" or start + length > size:
+					break			# Segmento incompleto
+
+				n		= struct.unpack(">L", file.read(4))[0]
+				offsets	= struct.unpack(">{0}Q".format(n), file.read(8 * n))
+				t		= struct.unpack(">L", file.read(4))[0]
+
+				self._segments.append((offsets, t, file.tell()))
+				self._directories.append(None)
+				self.covered.update(offsets)
+				self._end = start + length
+				file.seek(self._end)
+
+	def _directory(self, file, segment):
+		"""Directorio de trigramas de un segmento: (trigramas, inicios de
+		las listas, offset de las listas en .tidx). Se lee una única vez"""
+		if self._directories[segment] is None:
+			_, t, pos = self._segments[segment]
+			file.seek(pos)
+			keys	= file.read(3 * t)
+			starts	= struct.unpack(">{0}L".format(t + 1), file.read(4 * (t + 1)))
+			self._directories[segment] = (keys, starts, pos + 3 * t + 4 * (t + 1))
+
+		return self._directories[segment]
+
+	@staticmethod
+	def _list_type(containers):
+		"""Tipo (struct) de los elementos de las listas de un segmento"""
+		return "H" if containers <= 0xFFFF else "L"
+
+	def _find(self, keys, trigram):
+		"""Búsqueda binaria de un trigrama en el directorio de un segmento"""
+		lo, hi = 0, len(keys) // 3
+		while lo < hi:
+			mid = (lo + hi) // 2
+			if keys[mid * 3:mid * 3 + 3] < trigram:
+				lo = mid + 1
+			else:
+				hi = mid
+		if lo < len(keys) // 3 and keys[lo * 3:lo * 3 + 3] == trigram:
+			return lo
+		return None
+
+	def candidates(self, text):
+		"""Retorna los contenedores indexados que pueden contener un texto
+
+		Args:
+			text: Texto a buscar o lista de textos (contenedores con alguno de
+				ellos). Otros objetos (expresiones regulares) no se pueden
+				resolver con el índice
+
+		Return:
+			set: Offsets de los contenedores indexados con todos los trigramas
+			del texto o `None` si el índice no permite descartar ninguno
+			(texto de menos de 3 caracteres)
+		"""
+		if isinstance(text, (list, tuple, set, frozenset)):
+			resultado = set()
+			for t in text:
+				candidates = self.candidates(t)
+				if candidates is None:
+					return None
+				resultado |= candidates
+			return resultado
+
+		if not isinstance(text, str) or len(text) < 3:
+			return None
+
+		try:
+			data = text.encode("latin1")
+		except UnicodeEncodeError:
+			# Las páginas solo tienen caracteres latin1
+			return set()
+
+		query		= trigrams(data)
+		resultado	= set()
+		with open(self.textidx_file, mode="rb") as file:
+			for segment, (offsets, _, _) in enumerate(self._segments):
+				keys, starts, lists_pos = self._directory(file, segment)
+				matches = None
+				for t in query:
+					i = self._find(keys, t.to_bytes(3, "big"))
+					if i is None:
+						matches = set()
+						break
+					list_type	= self._list_type(len(offsets))
+					list_len	= struct.calcsize(list_type)
+					count		= starts[i + 1] - starts[i]
+					file.seek(lists_pos + list_len * starts[i])
+					lista		= struct.unpack(">{0}{1}".format(count, list_type), file.read(list_len * count))
+					matches		= set(lista) if matches is None else matches.intersection(lista)
+					if not matches:
+						break
+
+				resultado.update(offsets[i] for i in matches)
+
+		return resultado
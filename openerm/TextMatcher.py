@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# TextMatcher.py
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+"""
+TextMatcher
+===========
+
+Búsqueda de texto sobre los datos (ya descomprimidos) de un contenedor de
+páginas, sin decodificar las páginas: el texto se codifica una única vez en
+latin1 y se busca sobre los bytes del contenedor. Las posiciones encontradas
+se traducen a (página, posición en la página) con la tabla de longitudes de
+las páginas de los datos variables del bloque (ver :class:`openerm.PageContainer`).
+
+Se puede buscar:
+
+	* Un texto (`str`)
+	* Una lista de textos, en una única pasada por los datos con un autómata
+	  de Aho-Corasick
+	* Una expresión regular compilada (`re.compile`)
+
+.. seealso::
+	* :class:`openerm.PageContainer`
+	* :class:`openerm.Report`
+
+"""
+
+try:
+	import gettext
+	from gettext import gettext as _
+	gettext.textdomain('openerm')
+
+	import sys
+	import struct
+	import bisect
+	import re
+	from collections import deque
+	from itertools import accumulate
+
+except ImportError as err:
+	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
+	print(_("No fue posible importar el modulo: %s") % modulename)
+	sys.exit(-1)
+
+_Pattern = type(re.compile(""))		# re.Pattern recién existe en Python 3.7
+
+
+def sample(page, pos, find):
+	"""Extracto de una ocurrencia a modo de ejemplo
+
+	Args:
+		page (string): Texto de la página
+		pos (int): Posición de la ocurrencia en la página
+		find (string): Texto encontrado
+
+	Return:
+		string: Hasta 15 caracteres antes y después de la ocurrencia
+	"""
+	lfind	= len(find)
+	start 	= max(pos - 15, 0)
+	end 	= min(pos + lfind + 15, len(page))
+
+	return (page[start:pos] + "-[" + find + "]-" + page[pos + lfind + 1:end]).replace("\n", "")
+
+
+def page_starts(var_data):
+	"""Offsets del inicio de cada página en los datos de un contenedor
+
+	Args:
+		var_data (bytes): Datos variables del bloque del contenedor
+
+	Return:
+		list: Offset de cada página más el fin de la última
+	"""
+	page_count	= struct.unpack_from(">H", var_data)[0]
+	lengths		= struct.unpack_from(">{0}L".format(page_count), var_data, 2)
+	return [0] + list(accumulate(lengths))
+
+
+def _automaton(patterns):
+	"""Arma el autómata (determinístico) de Aho-Corasick de una lista de
+	textos. El alfabeto se reduce a los bytes de los textos más uno para
+	cualquier otro byte, y las transiciones se guardan en una única lista
+	donde cada estado es el offset de su fila.
+
+	Args:
+		patterns (list): Textos codificados en latin1
+
+	Return:
+		tuple: (Tabla para `bytes.translate` al alfabeto reducido,
+		transiciones, dict estado -> textos que terminan en el estado)
+	"""
+	alphabet	= sorted({b for p in patterns for b in p})
+	table		= bytearray(256)
+	for i, b in enumerate(alphabet, 1):
+		table[b] = i
+	table		= bytes(table)
+	width		= len(alphabet) + 1
+
+	# Trie de los textos
+	goto		= [{}]
+	outputs		= [()]
+	for pattern in patterns:
+		state = 0
+		for c in pattern.translate(table):
+			next_state = goto[state].get(c)
+			if next_state is None:
+				next_state = len(goto)
+				goto.append({})
+				outputs.append(())
+				goto[state][c] = next_state
+			state = next_state
+		outputs[state] += (pattern,)
+
+	# Transiciones completas, recorriendo el trie por niveles
+	delta		= [0] * (len(goto) * width)
+	fail		= [0] * len(goto)
+	queue		= deque([0])
+	while queue:
+		state	= queue.popleft()
+		row		= state * width
+		frow	= fail[state] * width
+		if state:
+			delta[row:row + width] = delta[frow:frow + width]
+		for c, next_state in goto[state].items():
+			if state:
+				fail[next_state] = delta[frow + c] // width
+			outputs[next_state] += outputs[fail[next_state]]
+			delta[row + c] = next_state * width
+			queue.append(next_state)
+
+	return (table, delta, {state * width: o for state, o in enumerate(outputs) if o})
+
+
+class TextMatcher(object):
+	"""Búsqueda de un texto, una lista de textos o una expresión regular en
+	los bytes de los contenedores de páginas
+
+	Args:
+		text: Texto (`str`), lista de textos o expresión regular compilada a buscar
+
+	.. note::
+		Las expresiones regulares se aplican sobre los bytes (latin1) de las
+		páginas: las clases como ``\\w`` o ``re.IGNORECASE`` solo
+		consideran caracteres ASCII.
+
+	Example:
+		>>> from openerm.PageContainer import PageContainer
+		>>> from openerm.TextMatcher import TextMatcher, page_starts
+		>>> p = PageContainer(10)
+		>>> p.add("Pagina 1")
+		>>> p.add("Pagina 2")
+		>>> data, var_data = p.dump()
+		>>> TextMatcher("na 2").find_pages(data, page_starts(var_data))
+		[(2, 4, 'na 2')]
+	"""
+	#: Cantidad de textos a partir de la cual se busca con el autómata de
+	#: Aho-Corasick en lugar de con un `bytes.find` por texto
+	automaton_threshold = 200
+
+	def __init__(self, text):
+
+		self.text		= text
+		self.multiple	= not isinstance(text, str)		#: Lista de textos o expresión regular
+		self._regex		= None
+		self._patterns	= []
+		self._automaton	= None
+
+		if isinstance(text, _Pattern):
+			pattern = text.pattern
+			if isinstance(pattern, str):
+				try:
+					pattern = pattern.encode("latin1")
+				except UnicodeEncodeError:
+					raise ValueError(_("La expresión regular debe tener solo caracteres latin1: {0}").format(text.pattern))
+			self._regex = re.compile(pattern, text.flags & ~re.UNICODE)
+			return
+
+		# Las páginas solo tienen caracteres latin1: los textos con otros
+		# caracteres no pueden tener ocurrencias
+		for t in ([text] if isinstance(text, str) else text):
+			try:
+				self._patterns.append((t.encode("latin1"), t))
+			except UnicodeEncodeError:
+				pass
+
+		self._patterns = [p for p in self._patterns if p[0]]
+		if len(self._patterns) >= self.automaton_threshold:
+			self._found		= dict(self._patterns)
+			self._automaton	= _automaton(list(self._found))
+
+	@staticmethod
+	def key(text):
+		"""Clave (hashable) de un texto, lista de textos o expresión regular,
+		para reusar un TextMatcher ya armado"""
+		if isinstance(text, _Pattern):
+			return (text.pattern, text.flags)
+		if isinstance(text, str):
+			return text
+		return tuple(text)
+
+	def finditer(self, data):
+		"""Ocurrencias en un buffer, ordenadas por posición
+
+		Args:
+			data (bytes): Buffer donde buscar
+
+		Return:
+			iterable: (posición, longitud, texto encontrado). Con una lista de
+			textos se informa el texto que coincidió, con una expresión regular
+			el texto encontrado
+		"""
+		if self._regex is not None:
+			return ((m.start(), m.end() - m.start(), m.group().decode("latin1"))
+					for m in self._regex.finditer(data) if m.end() > m.start())
+
+		if self._automaton is not None:
+			return self._finditer_automaton(data)
+
+		if len(self._patterns) == 1:
+			return self._finditer_pattern(data, *self._patterns[0])
+
+		ocurrences = [o for pattern, text in self._patterns for o in self._finditer_pattern(data, pattern, text)]
+		ocurrences.sort(key=lambda o: o[0])
+		return ocurrences
+
+	@staticmethod
+	def _finditer_pattern(data, pattern, text):
+		lpattern	= len(pattern)
+		pos			= data.find(pattern)
+		while pos >= 0:
+			yield (pos, lpattern, text)
+			pos = data.find(pattern, pos + 1)
+
+	def _finditer_automaton(self, data):
+		"""Búsqueda de todos los textos en una única pasada por los datos"""
+		table, delta, outputs	= self._automaton
+		found					= self._found
+		ocurrences				= []
+		state					= 0
+		for i, c in enumerate(data.translate(table)):
+			state = delta[state + c]
+			if state in outputs:
+				for pattern in outputs[state]:
+					ocurrences.append((i - len(pattern) + 1, len(pattern), found[pattern]))
+
+		ocurrences.sort(key=lambda o: o[0])
+		return ocurrences
+
+	def find_pages(self, data, starts):
+		"""Ocurrencias del texto en las páginas de un contenedor. No se
+		consideran las ocurrencias que abarcan dos páginas.
+
+		Args:
+			data (bytes): Datos (descomprimidos) del contenedor
+			starts (list): Inicio de cada página en los datos (ver :py:func:`page_starts`)
+
+		Return:
+			list: (número de página en el contenedor 1..n, posición en la página, texto encontrado)
+		"""
+		ocurrences	= []
+		for pos, length, found in self.finditer(data):
+			page = bisect.bisect_right(starts, pos) - 1
+			if pos + length <= starts[page + 1]:
+				ocurrences.append((page + 1, pos - starts[page], found))
+
+		return ocurrences
+
+	def find_ocurrences(self, data, var_data, report_id, first_page, pages=None, with_sample=True):
+		"""Ocurrencias en un contenedor de páginas de un reporte, ver
+		:py:meth:`iter_ocurrences`
+
+		Return:
+			list: (reporte, página, posición, extracto) de cada ocurrencia, más
+			el texto encontrado si se busca una lista de textos o una expresión
+			regular
+		"""
+		return list(self.iter_ocurrences(data, var_data, report_id, first_page, pages, with_sample))
+
+	def iter_ocurrences(self, data, var_data, report_id, first_page, pages=None, with_sample=True):
+		"""Ocurrencias en un contenedor de páginas de un reporte, con el
+		formato de :py:meth:`openerm.Report.find_text`. Solo se decodifican
+		las páginas con ocurrencias, para armar el extracto.
+
+		Args:
+			data (bytes): Datos (descomprimidos) del contenedor
+			var_data (bytes): Datos variables del bloque del contenedor
+			report_id (int): Id del reporte
+			first_page (int): Número de la primer página del contenedor
+			pages (tuple): (opcional) Rango (desde, hasta) de páginas del
+				reporte, `None` en un extremo es sin límite
+			with_sample (bool): Armar el extracto de cada ocurrencia, sino se
+				informa `None`
+
+		Return:
+			generator: (reporte, página, posición, extracto) de cada ocurrencia,
+			más el texto encontrado si se busca una lista de textos o una
+			expresión regular
+		"""
+		desde, hasta	= pages or (None, None)
+		starts			= page_starts(var_data)
+		last_page		= None
+		for page, pos, found in self.find_pages(data, starts):
+			pagenum = first_page + page - 1
+			if (desde is not None and pagenum < desde) or (hasta is not None and pagenum > hasta):
+				continue
+			extracto = None
+			if with_sample:
+				if page != last_page:
+					p			= data[starts[page - 1]:starts[page]].decode("latin1")
+					last_page	= page
+				extracto = sample(p, pos, found)
+			ocurrence = (report_id, pagenum, pos, extracto)
+			yield ocurrence + (found,) if self.multiple else ocurrence
@@ -103,6 +103,66 @@ def file_accessible(filepath, mode):
 	return True
 
 
+def single_byte_encoding(encoding):
+	"""Indica si una codificación usa un byte por carácter (latin1, cp500,
+	cp037, etc.), es decir si las posiciones en los bytes y en el texto
+	decodificado coinciden.
+
+	Args:
+		encoding (string): Nombre de la codificación
+
+	Example:
+		>>> from openerm.Utils import *
+		>>> single_byte_encoding("cp500"), single_byte_encoding("utf-8")
+		(True, False)
+	"""
+	return len("a".encode(encoding)) == 1 and len(b"\xc3\xb1\x82\xa0".decode(encoding, errors="replace")) == 4
+
+
+def latin1_table(encoding):
+	"""Tabla de `bytes.translate` que convierte los bytes de una codificación
+	de un byte por carácter (típicamente EBCDIC: cp037, cp500, cp1140) a
+	latin1, de modo que un bloque completo se traduce y decodifica sin pasar
+	por el codec.
+
+	Los caracteres que no existen en latin1 (el € de cp1140) se traducen a un
+	carácter latin1 que la codificación no usa (¤) y se restituyen en el texto
+	decodificado con los reemplazos retornados.
+
+	Args:
+		encoding (string): Nombre de la codificación
+
+	Return:
+		tuple: (tabla, [(carácter latin1, carácter original)]) o `None` si la
+		codificación no se puede traducir (no define los 256 bytes o tiene
+		más caracteres fuera de latin1 que lugares libres)
+
+	Example:
+		>>> from openerm.Utils import *
+		>>> table, replaces = latin1_table("cp1140")
+		>>> b"\\xc8\\x96\\x93\\x81\\x40\\x9f".translate(table).decode("latin1")
+		'Hola ¤'
+		>>> replaces
+		[('¤', '€')]
+	"""
+	try:
+		chars = bytes(range(256)).decode(encoding)
+	except (UnicodeDecodeError, LookupError):
+		return None
+	if len(chars) != 256:
+		return None
+
+	free		= [chr(c) for c in range(256) if chr(c) not in chars]
+	others		= [c for c in chars if ord(c) > 255]
+	if len(others) > len(free):
+		return None
+
+	replaces	= list(zip(free, others))
+	mapped		= dict((o, f) for f, o in replaces)
+	table		= bytes(ord(mapped.get(c, c)) for c in chars)
+	return table, replaces
+
+
 def str_to_list(str_value, maxvalue):
 	"""Devuelve una lista de enteros a partir de un string
 
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# test of BloomFilter
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+"""
+
+
+import os
+import re
+import unittest
+
+from openerm.BloomFilter import BloomFilter, container_filter
+from openerm.PageContainer import PageContainer
+from openerm.Database import Database
+from OermTestFixtures import OermTestCatalogFixtures
+
+
+class BloomFilterTest(unittest.TestCase):
+
+	def test_may_contain(self):
+		"""Sin falsos negativos y dump/load sin pérdidas"""
+		text	= b"Pagina de una sola linea"
+		f		= BloomFilter.load(BloomFilter.from_text(text, 0.01).dump())
+
+		for i in range(len(text) - 3):
+			self.assertTrue(f.may_contain(BloomFilter.query(text[i:].decode("latin1"))))
+		self.assertFalse(f.may_contain(BloomFilter.query("otra cosa")))
+		self.assertTrue(f.may_contain(BloomFilter.query(["otra cosa", "una sola"])))
+		self.assertFalse(f.may_contain(BloomFilter.query("Pagina €")))
+
+	def test_query(self):
+		"""Textos que no se pueden descartar con los filtros"""
+		self.assertIsNone(BloomFilter.query("Pa"))
+		self.assertIsNone(BloomFilter.query(["Pagina", "Pa"]))
+		self.assertIsNone(BloomFilter.query(re.compile("Pagina")))
+
+	def test_container_filter(self):
+		"""El filtro se salva a continuación de las longitudes de las páginas"""
+		p = PageContainer(10)
+		p.add("Pagina 1")
+		p.add("Pagina 2")
+		data, var_data = p.dump()
+		self.assertIsNone(container_filter(var_data))
+
+		var_data += BloomFilter.from_text(data, 0.01).dump()
+		self.assertTrue(container_filter(var_data).may_contain(BloomFilter.query("na 2")))
+
+		p.load((data, var_data))
+		self.assertEqual(list(p), ["Pagina 1", "Pagina 2"])
+
+
+class BloomFilterDatabaseTest(OermTestCatalogFixtures):
+
+	def test_find_text_with_bloom_filter(self):
+		"""La búsqueda con filtros de Bloom retorna lo mismo que sin filtros
+		descomprimiendo solo los contenedores candidatos"""
+
+		filename	= os.path.join(self._repopath, "bloom.oerm")
+		texto		= self._paginas_escritas[6][100:112]
+
+		for workers in [0, 2]:
+			db = Database(file=filename, mode="wb", default_compress_method=1, pages_in_container=2, workers=workers, bloom_fpr=0.01)
+			db.add_report(reporte="Reporte 1", sistema="Sistema 1", aplicacion="Aplicacion 1", departamento="Departamento 1")
+			for p in self._paginas_escritas:
+				db.add_page(p)
+			db.close()
+
+			for mmap in [False, True]:
+				db = Database(file=filename, mode="rb", mmap=mmap)
+				self.assertEqual([(m[0], m[1]) for m in db.find_text(texto)], [(1, 7)])
+				self.assertLessEqual(db.cache.misses, 2)
+				self.assertEqual([(m[0], m[1]) for m in db.find_text(texto, workers=2)], [(1, 7)])
+				self.assertEqual(len(db.find_text("Pagina")), 2 * len(self._paginas_escritas))
+				self.assertEqual(db.reports().get_report(1).get_page(7), self._paginas_escritas[6])
+				db.close()
+
+		for ext in ["", ".ridx", ".cidx"]:
+			os.remove(filename + ext)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# test of ContainerCache
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+"""
+
+import os
+import unittest
+
+from openerm.ContainerCache import ContainerCache
+from openerm.PageContainer import PageContainer
+from openerm.Database import Database
+from OermTestFixtures import OermTestCatalogFixtures
+
+
+class ContainerCacheTest(unittest.TestCase):
+
+	@staticmethod
+	def _container(size):
+		p = PageContainer(1)
+		p.add("X" * size)
+		return p
+
+	def test_lru_eviction(self):
+		"""Verifica el descarte LRU por tamaño y los contadores"""
+
+		cache = ContainerCache(300)
+		for offset in [10, 20, 30]:
+			cache.put(offset, self._container(100))
+
+		self.assertIsNotNone(cache.get(10))
+		cache.put(40, self._container(100))
+
+		self.assertIsNone(cache.get(20))
+		self.assertIsNotNone(cache.get(30))
+		self.assertEqual((len(cache), cache.size), (3, 300))
+		self.assertEqual((cache.hits, cache.misses, cache.evictions), (2, 1, 1))
+
+		cache.put(50, self._container(301))
+		self.assertIsNone(cache.get(50))
+
+
+class ContainerCacheDatabaseTest(OermTestCatalogFixtures):
+
+	def test_shared_cache(self):
+		"""Verifica que la cache se comparta entre los reportes de un Database"""
+
+		filename = os.path.join(self._repopath, "test.1-0.oerm")
+		db       = Database(file=filename, mode="rb")
+
+		r1 = db.reports().get_report(1)
+		self.assertEqual(r1.get_page(1), self._paginas_escritas[0])
+		r2 = db.reports().get_report(1)
+		self.assertEqual(r2.get_page(2), self._paginas_escritas[1])
+		self.assertEqual((db.cache.hits, db.cache.misses), (1, 1))
+
+		db.close()
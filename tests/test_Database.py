@@ -21,9 +21,12 @@
 """
 
 import os
+from unittest import mock
 
 from openerm.Database import Database
+from openerm.Index import Index
 from openerm.Block import Block
+from openerm.Report import Report
 from OermTestFixtures import OermTestCatalogFixtures
 
 class DatabaseTest(OermTestCatalogFixtures):
@@ -43,6 +46,154 @@ class DatabaseTest(OermTestCatalogFixtures):
 			db.close()
 			self.assertEqual(self._paginas_escritas, paginas_leidas)
 
+	def test_read_database_mmap(self):
+		"""Lee un database mapeado en memoria y verifica los resultados"""
+		block = Block()  # Generic
+
+		for item in block.compressor.available_types:
+
+			filename       = os.path.join(self._repopath, "test.{0}-{1}.oerm".format(item[0], 0))
+			db             = Database(file=filename, mode="rb", mmap=True)
+			paginas_leidas = []
+			for report in db.reports():
+				for p in report:
+					paginas_leidas.append(p)
+			self.assertEqual(db.reports().get_report(2).get_page(5), self._paginas_escritas[14])
+			db.close()
+			self.assertEqual(self._paginas_escritas, paginas_leidas)
+
+	def test_read_database_lazy_index(self):
+		"""Lee un database cargando los contenedores de cada reporte a demanda"""
+
+		filename = os.path.join(self._repopath, "test.1-0.oerm")
+		db       = Database(file=filename, mode="rb", lazy_index=True)
+		self.assertEqual(db.Index.container_objects, 2)
+		self.assertEqual([r[4] for r in db.Index.reports.values()], [[], []])
+
+		report = db.reports().get_report(2)
+		self.assertEqual(report.total_pages, 10)
+		self.assertEqual(report.get_page(3), self._paginas_escritas[12])
+		self.assertEqual([len(r[4]) for r in db.Index.reports.values()], [0, 1])
+
+		paginas_leidas = [p for report in db.reports() for p in report]
+		db.close()
+		self.assertEqual(self._paginas_escritas, paginas_leidas)
+
+	def test_append_index(self):
+		"""Agrega páginas a un database existente: los índices solo crecen"""
+
+		import shutil
+
+		source   = os.path.join(self._repopath, "test.1-0.oerm")
+		filename = os.path.join(self._repopath, "append.oerm")
+		for ext in ["", ".ridx", ".cidx"]:
+			shutil.copy(source + ext, filename + ext)
+
+		indices = {}
+		for ext in [".ridx", ".cidx"]:
+			with open(filename + ext, "rb") as f:
+				indices[ext] = f.read()
+
+		db = Database(file=filename, mode="ab", default_compress_method=1, pages_in_container=5)
+		db.set_report("Reporte 2")
+		db.add_page("Pagina agregada al Reporte 2")
+		db.add_report(reporte="Reporte 3", sistema="Sistema 3", aplicacion="Aplicacion 3", departamento="Departamento 3")
+		db.add_page("Pagina del Reporte 3")
+		db.close()
+
+		# Solo el reporte nuevo salva sus metadatos
+		self.assertEqual(db.Index.metadata_objects, 3)
+		for ext in [".ridx", ".cidx"]:
+			with open(filename + ext, "rb") as f:
+				self.assertTrue(f.read().startswith(indices[ext]))
+		self.assertNotIn(b"Sistema 2", open(filename + ".ridx", "rb").read()[len(indices[".ridx"]):])
+
+		for lazy in [False, True]:
+			db = Database(file=filename, mode="rb", lazy_index=lazy)
+			self.assertEqual([r.total_pages for r in db.reports()], [10, 11, 1])
+			self.assertEqual([r.sistema for r in db.reports()], ["Sistema 1", "Sistema 2", "Sistema 3"])
+			paginas_leidas = [p for report in db.reports() for p in report]
+			db.close()
+			self.assertEqual(self._paginas_escritas[:20] + ["Pagina agregada al Reporte 2"], paginas_leidas[:21])
+			self.assertEqual(paginas_leidas[21], "Pagina del Reporte 3")
+
+		for ext in ["", ".ridx", ".cidx"]:
+			os.remove(filename + ext)
+
+	def test_checkpoint(self):
+		"""Lee los datos salvados hasta el último checkpoint de un database no cerrado"""
+
+		import shutil
+
+		filename = os.path.join(self._repopath, "checkpoint.oerm")
+		copia    = os.path.join(self._repopath, "checkpoint.copia.oerm")
+		paginas  = ["Pagina {0}".format(i) for i in range(1, 21)]
+
+		db = Database(file=filename, mode="wb", default_compress_method=1, pages_in_container=2, checkpoint_interval=3)
+		db.add_report(reporte="Reporte 1", sistema="Sistema 1", aplicacion="Aplicacion 1", departamento="Departamento 1")
+		for p in paginas[:15]:
+			db.add_page(p)
+
+		# Una caída ahora: se recupera lo salvado hasta el checkpoint y se
+		# descarta un registro incompleto al final del índice de reportes
+		for ext in ["", ".ridx", ".cidx"]:
+			shutil.copy(filename + ext, copia + ext)
+		with open(copia + ".ridx", "ab") as f:
+			f.write(b"\0\0\0\1Reporte")
+
+		dbc = Database(file=copia, mode="rb")
+		report = dbc.reports().get_report(1)
+		self.assertEqual(report.total_pages, 12)
+		self.assertEqual(list(report), paginas[:12])
+		dbc.close()
+
+		dbc = Database(file=copia, mode="ab", default_compress_method=1, pages_in_container=2)
+		dbc.set_report("Reporte 1")
+		dbc.add_page("Pagina agregada")
+		dbc.close()
+		dbc = Database(file=copia, mode="rb")
+		self.assertEqual(list(dbc.reports().get_report(1)), paginas[:12] + ["Pagina agregada"])
+		dbc.close()
+
+		for p in paginas[15:]:
+			db.add_page(p)
+		db.close()
+		db = Database(file=filename, mode="rb")
+		self.assertEqual(list(db.reports().get_report(1)), paginas)
+		db.close()
+
+		for name in [filename, copia]:
+			for ext in ["", ".ridx", ".cidx"]:
+				os.remove(name + ext)
+
+	def test_read_index_unknown_version(self):
+		"""Un índice de una versión que no es la 1 ni la actual no se lee"""
+
+		import shutil
+
+		source   = os.path.join(self._repopath, "test.1-0.oerm")
+		filename = os.path.join(self._repopath, "index_v3.oerm")
+		for ext in [".ridx", ".cidx"]:
+			shutil.copy(source + ext, filename + ext)
+		with open(filename + ".ridx", "r+b") as file:
+			file.write(b"oidx\x03")
+
+		with self.assertRaises(ValueError):
+			Index(filename).read()
+
+		for ext in [".ridx", ".cidx"]:
+			os.remove(filename + ext)
+
+	def test_get_report_by_name(self):
+		"""Resuelve el id de un reporte por nombre luego de leer el índice"""
+
+		filename = os.path.join(self._repopath, "test.1-0.oerm")
+		db       = Database(file=filename, mode="rb")
+		for rpt_id, nombre in self._reports:
+			self.assertEqual(db.get_report(nombre), rpt_id)
+		self.assertIsNone(db.get_report("Reporte inexistente"))
+		db.close()
+
 	def test_database_find_text(self):
 		"""Genera un database con info random, y realiza un búsqueda de texto"""
 
@@ -57,3 +208,230 @@ class DatabaseTest(OermTestCatalogFixtures):
 			matches  = db.find_text("Pagina", reports=[1])
 
 			self.assertEqual([(x[0], x[1], x[2]) for x in matches], esperado)
+
+	def test_parallel_find_text(self):
+		"""La búsqueda en paralelo retorna lo mismo y en el mismo orden que la secuencial"""
+
+		filename = os.path.join(self._repopath, "test.1-0.oerm")
+		texto    = self._paginas_escritas[13][500:503]
+		db       = Database(file=filename, mode="rb")
+		for text, reports in [("Pagina", None), ("Pagina", [2]), (texto, None), ("No existe", None)]:
+			esperado = db.find_text(text, reports)
+			self.assertEqual(db.find_text(text, reports, workers=2), esperado)
+		db.close()
+
+		db = Database(file=filename, mode="rb", workers=2)
+		self.assertEqual(len(db.reports().find_text("Pagina")), 40)
+		db.close()
+
+	def test_find_text_multiple(self):
+		"""Búsqueda de una lista de textos y de una expresión regular"""
+
+		import re
+
+		filename = os.path.join(self._repopath, "test.1-0.oerm")
+		textos   = [self._paginas_escritas[3][700:706], self._paginas_escritas[15][90:96], "No existe"]
+		db       = Database(file=filename, mode="rb")
+
+		esperado = sorted(m + (t,) for t in textos for m in db.find_text(t))
+		matches  = db.find_text(textos)
+		self.assertEqual(sorted(matches), esperado)
+		self.assertEqual(db.find_text(textos, workers=2), matches)
+
+		matches = db.find_text(re.compile(r"Pagina 1\d "))
+		self.assertEqual([(m[0], m[1], m[4]) for m in matches if m[2] == 0],
+						[(1, 10, "Pagina 10 ")] + [(2, i - 10, "Pagina {0} ".format(i)) for i in range(11, 20)])
+		db.close()
+
+	def test_iter_find_text(self):
+		"""Búsqueda incremental con límite, rango de páginas y sin extractos"""
+
+		import re
+
+		filename = os.path.join(self._repopath, "test.1-0.oerm")
+		db       = Database(file=filename, mode="rb")
+
+		for text in ["Pagina", ["Pagina", "-----"], re.compile("Pagina")]:
+			matches = db.find_text(text)
+			for workers in [0, 2]:
+				self.assertEqual(list(db.iter_find_text(text, workers=workers)), matches)
+				self.assertEqual(list(db.iter_find_text(text, limit=3, workers=workers)), matches[:3])
+				self.assertEqual([m[:3] for m in db.iter_find_text(text, with_sample=False, workers=workers)],
+								[m[:3] for m in matches])
+				self.assertTrue(all(m[3] is None for m in db.iter_find_text(text, with_sample=False, workers=workers)))
+				self.assertEqual(list(db.iter_find_text(text, pages=(4, 6), workers=workers)),
+								[m for m in matches if 4 <= m[1] <= 6])
+				self.assertEqual(list(db.iter_find_text(text, pages=(None, 2), workers=workers)),
+								[m for m in matches if m[1] <= 2])
+
+		# Cortar la iteración termina la búsqueda
+		with mock.patch.object(Report, "_get_block_data_from_offset", autospec=True,
+								side_effect=Report._get_block_data_from_offset) as leidos:
+			ocurrences = db.iter_find_text("Pagina", workers=0)
+			next(ocurrences)
+			ocurrences.close()
+			self.assertEqual(leidos.call_count, 1)
+		db.close()
+
+	def test_find_key(self):
+		"""Zone maps de la clave por contenedor y búsqueda de un valor leyendo solo los contenedores candidatos"""
+
+		filename = os.path.join(self._repopath, "zonemap.oerm")
+		claves   = ["{0:06}".format(i) for i in range(100, 100 + 3 * len(self._paginas_escritas), 3)]
+		paginas  = ["Cliente {0} {1}".format(c, p) for c, p in zip(claves, self._paginas_escritas)]
+
+		for workers in [0, 2]:
+			db = Database(file=filename, mode="wb", default_compress_method=1, pages_in_container=3, workers=workers, checkpoint_interval=2)
+			db.add_report(reporte="Reporte 1", sistema="Sistema 1", aplicacion="Aplicacion 1", departamento="Departamento 1")
+			for c, p in zip(claves[:12], paginas[:12]):
+				db.add_page(p, [c])
+			db.close()
+
+			db = Database(file=filename, mode="ab", default_compress_method=1, pages_in_container=3, workers=workers)
+			db.set_report("Reporte 1")
+			for c, p in zip(claves[12:], paginas[12:]):
+				db.add_page(p, [c, "{0}X".format(c)])
+			db.close()
+
+			for lazy in [False, True]:
+				db = Database(file=filename, mode="rb", lazy_index=lazy)
+				report = db.reports().get_report(1)
+				zones  = [db.Index.zone_maps[1][o] for o in report.containers_offset]
+				self.assertEqual(zones[0], (claves[0], claves[2]))
+				self.assertEqual(zones[4], (claves[12], claves[14] + "X"))
+				self.assertEqual(zones[-1], (claves[-2], claves[-1] + "X"))
+
+				with mock.patch.object(Report, "_get_block_data_from_offset", autospec=True,
+										side_effect=Report._get_block_data_from_offset) as leidos:
+					self.assertEqual(report.find_key(claves[13], with_sample=False), [(1, 14, 8, None)])
+					self.assertEqual(leidos.call_count, 1)
+					self.assertEqual(report.find_key("000099"), [])
+					self.assertEqual(report.find_key("999999"), [])
+					self.assertEqual(leidos.call_count, 1)
+				db.close()
+
+		# Reporte no ordenado por la clave y contenedores sin zone map
+		db = Database(file=filename, mode="wb", default_compress_method=1, pages_in_container=3)
+		db.add_report(reporte="Reporte 1", sistema="Sistema 1", aplicacion="Aplicacion 1", departamento="Departamento 1")
+		for c, p in reversed(list(zip(claves[:9], paginas[:9]))):
+			db.add_page(p, [c])
+		for p in paginas[9:12]:
+			db.add_page(p)
+		db.close()
+
+		db = Database(file=filename, mode="rb")
+		report = db.reports().get_report(1)
+		self.assertEqual(len(report._key_containers(claves[4])), 2)
+		self.assertEqual([m[1] for m in report.find_key(claves[4])], [5])
+		self.assertEqual([m[1] for m in report.find_key(claves[10])], [11])
+		db.close()
+
+		# Un registro incompleto al final del índice de zone maps se descarta
+		with open(filename + ".zidx", "ab") as f:
+			f.write(b"\0\0\0\1")
+		db = Database(file=filename, mode="rb")
+		self.assertEqual(len(db.Index.zone_maps[1]), 3)
+		db.close()
+
+		for ext in ["", ".ridx", ".cidx", ".zidx"]:
+			os.remove(filename + ext)
+
+	def test_parallel_write(self):
+		"""Genera un database comprimiendo en paralelo y verifica que sea idéntico al secuencial"""
+
+		filenames = []
+		for workers in [0, 2]:
+			filename = os.path.join(self._repopath, "parallel.{0}.oerm".format(workers))
+			db = Database(file=filename, mode="wb", default_compress_method=1, pages_in_container=3, workers=workers, queue_depth=2)
+			for i, rpt in enumerate(self._reports):
+				db.add_report(reporte=rpt[1], sistema="Sistema", aplicacion="Aplicacion", departamento="Departamento", fecha="20160101")
+				for p in self._paginas_escritas[i*10:(i+1)*10]:
+					db.add_page(p)
+				if workers and i == 0:
+					# El pool de búsqueda no reemplaza al de escritura
+					pool = db._pool
+					self.assertIsNot(db._search_pool(3), pool)
+					self.assertIs(db._pool, pool)
+			db.close()
+			filenames.append(filename)
+
+		for ext in ["", ".ridx", ".cidx"]:
+			with open(filenames[0] + ext, "rb") as f0, open(filenames[1] + ext, "rb") as f1:
+				self.assertEqual(f0.read(), f1.read())
+
+		db             = Database(file=filenames[1], mode="rb")
+		paginas_leidas = [p for report in db.reports() for p in report]
+		db.close()
+		self.assertEqual(self._paginas_escritas, paginas_leidas)
+
+		for f in filenames:
+			for ext in ["", ".ridx", ".cidx"]:
+				os.remove(f + ext)
+
+	def test_container_size(self):
+		"""Genera un database con contenedores por tamaño y verifica el acceso a las páginas"""
+
+		filename = os.path.join(self._repopath, "container_size.oerm")
+		paginas  = [p[:200 * (i % 7 + 1)] for i, p in enumerate(self._paginas_escritas * 5)]
+
+		db = Database(file=filename, mode="wb", pages_in_container=6, container_size=2000, min_pages_in_container=2)
+		db.add_report(reporte="Reporte", sistema="Sistema", aplicacion="Aplicacion", departamento="Departamento", fecha="20160101")
+		for p in paginas:
+			db.add_page(p)
+		db.close()
+
+		db     = Database(file=filename, mode="rb")
+		report = db.reports().get_report(1)
+		self.assertTrue(len(set(report.containers_page_count)) > 1)
+		self.assertTrue(max(report.containers_page_count) <= 6)
+		self.assertEqual(report.total_pages, len(paginas))
+		for n in [50, 1, len(paginas), 13, 12, 77]:
+			self.assertEqual(report.get_page(n), paginas[n - 1])
+		self.assertIsNone(report.get_page(len(paginas) + 1))
+		db.close()
+
+		for ext in ["", ".ridx", ".cidx"]:
+			os.remove(filename + ext)
+
+	def test_read_index_v1(self):
+		"""Convierte los índices de un database a la versión 1 (sin cabecera) y verifica la lectura"""
+
+		import struct
+		import shutil
+
+		source   = os.path.join(self._repopath, "test.1-0.oerm")
+		filename = os.path.join(self._repopath, "index_v1.oerm")
+		shutil.copy(source, filename)
+
+		db = Database(file=source, mode="rb")
+		with open(filename + ".ridx", "wb") as ridx, open(filename + ".cidx", "wb") as cidx:
+			offset = 0
+			for key, report in db.Index.reports.items():
+				ridx.write(struct.pack(">L50sQHQ", key, report[0].encode("utf-8"), report[1], report[2], offset))
+				for container_offset in report[4]:
+					cidx.write(struct.pack(">LQ", key, container_offset))
+					offset += 12
+		db.close()
+
+		for lazy in [False, True]:
+			db             = Database(file=filename, mode="rb", lazy_index=lazy)
+			paginas_leidas = [p for report in db.reports() for p in report]
+			self.assertEqual(db.Index.file_version, 1)
+			self.assertEqual([r.total_pages for r in db.reports()], [10, 10])
+			self.assertEqual([r.sistema for r in db.reports()], ["Sistema 1", "Sistema 2"])
+			db.close()
+			self.assertEqual(self._paginas_escritas, paginas_leidas)
+
+		# Al agregar datos los índices se reescriben en la versión actual
+		db = Database(file=filename, mode="ab", default_compress_method=1)
+		db.set_report("Reporte 1")
+		db.add_page("Pagina agregada")
+		db.close()
+
+		db = Database(file=filename, mode="rb")
+		self.assertEqual(db.Index.file_version, db.Index.version)
+		self.assertEqual(list(db.reports().get_report(1)), self._paginas_escritas[:10] + ["Pagina agregada"])
+		db.close()
+
+		for ext in ["", ".ridx", ".cidx"]:
+			os.remove(filename + ext)
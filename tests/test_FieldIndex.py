@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# test of FieldIndex
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+"""
+
+
+import os
+import unittest
+
+from openerm.FieldIndex import FieldExtractor, FieldIndex
+from openerm.ReportMatcher import ReportMatcher
+from openerm.OermClient import OermClient
+from openerm.Database import Database
+from OermTestFixtures import OermTestCatalogFixtures
+
+
+class FieldExtractorTest(unittest.TestCase):
+
+	config = """
+	Reports:
+		"L80001":
+			match:
+				"L80001": [1, 1, 1, 6]
+			fields:
+				codigo: [2, 200, 1, 6]
+				documento: [2, 200, 12, 20]
+			system: "Sistema"
+			department: "Departamento"
+		"L80010":
+			match:
+				"L80010": [1, 1, 1, 6]
+			system: "Sistema"
+			department: "Departamento"
+	"""
+
+	def test_extract(self):
+		"""Extracción de los campos con las cajas de la configuración de reportes"""
+		e = FieldExtractor(ReportMatcher(configbuffer=self.config).fields)
+		self.assertTrue(e)
+
+		page = "L80001 Titulo\n107161 DNI 092935069\n113171\n107161 DNI 092935069\n"
+		self.assertEqual(e.extract("L80001", page),
+						[("codigo", "107161"), ("codigo", "113171"), ("documento", "092935069")])
+		self.assertEqual(e.extract("L80010", page), [])
+		self.assertFalse(FieldExtractor(ReportMatcher(configbuffer=self.config.replace("fields", "nada")).fields))
+
+
+class FieldIndexTest(OermTestCatalogFixtures):
+
+	def test_lookup(self):
+		"""Registro de los campos de las páginas y búsqueda puntual en el catalogo"""
+
+		filename	= os.path.join(self._repopath, "test.1-0.oerm")
+		db			= Database(file=filename, mode="rb")
+		idx			= FieldIndex(self._repopath)
+		extractor	= FieldExtractor({"Reporte 2": {"pagina": [1, 1, 1, 9]}})
+		for report in db.reports():
+			for pagenum, page in enumerate(report, 1):
+				idx.add("test.1-0.oerm", report.id, report.nombre, pagenum, extractor.extract(report.nombre, page))
+		db.close()
+		idx.close()
+
+		self.assertTrue(FieldIndex.exists(self._repopath))
+		self.assertEqual(FieldIndex(self._repopath).lookup("pagina", "Pagina 13"), [(filename, 2, "Reporte 2", 3)])
+		self.assertEqual(FieldIndex(self._repopath).lookup("pagina", "Pagina 3"), [])
+
+		c = OermClient(self._configfile)
+		c.open_catalog("catalogo1")
+		self.assertEqual(c.find_field("pagina", "Pagina 13", reporte="Reporte 2"), [(filename, 2, "Reporte 2", 3)])
+		self.assertEqual(c.find_field("pagina", "Pagina 13", reporte="Reporte 1"), [])
+
+		database, report_id, _, page = c.find_field("pagina", "Pagina 13")[0]
+		db = Database(file=database, mode="rb", lazy_index=True)
+		self.assertEqual(db.reports().get_report(report_id).get_page(page), self._paginas_escritas[12])
+		self.assertEqual(db.cache.misses, 1)
+		db.close()
+
+		os.remove(os.path.join(self._repopath, "fields.db"))
+
+	def test_add_page_number(self):
+		"""Número de página de cada página agregada a un Database"""
+
+		filename	= os.path.join(self._repopath, "pagenum.oerm")
+		for workers in [0, 2]:
+			db = Database(file=filename, mode="wb", pages_in_container=3, workers=workers)
+			db.add_report(reporte="Reporte 1")
+			self.assertEqual([db.add_page(p) for p in self._paginas_escritas[:5]], [1, 2, 3, 4, 5])
+			db.add_report(reporte="Reporte 2")
+			self.assertEqual(db.add_page("Pagina"), 1)
+			db.set_report("Reporte 1")
+			self.assertEqual(db.add_page("Pagina"), 6)
+			db.close()
+
+		db = Database(file=filename, mode="ab", pages_in_container=3)
+		db.set_report("Reporte 1")
+		self.assertEqual(db.add_page("Pagina"), 7)
+		db.close()
+
+		for ext in ["", ".ridx", ".cidx"]:
+			os.remove(filename + ext)
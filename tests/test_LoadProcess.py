@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# test of LoadProcess
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+"""
+
+
+import unittest
+
+from openerm.LoadProcess import match_pages
+from openerm.ReportMatcher import ReportMatcher
+
+
+class MatchPagesTest(unittest.TestCase):
+
+	config = """
+	Reports:
+		"Reporte 1":
+			match:
+				"Reporte 1": [1, 1, 1, 20]
+			system: "Sistema"
+			department: "Departamento"
+		"Reporte 2":
+			match:
+				"Reporte 2": [1, 1, 1, 20]
+			system: "Sistema"
+			department: "Departamento"
+	"""
+
+	def test_match_pages(self):
+		"""Identificación en un pool de procesos: mismos resultados y en el
+		orden de las páginas que en el mismo proceso"""
+
+		pages	= ["Reporte {0}\nPagina {1}\n".format(1 + (i // 7) % 2, i) for i in range(60)] + ["Otra\n"]
+		matcher	= ReportMatcher(configbuffer=self.config)
+		serial	= list(match_pages(iter(pages), matcher))
+		self.assertEqual([p for p, _ in serial], pages)
+		self.assertEqual(serial[8][1][0], "Reporte 2")
+		self.assertEqual(serial[-1][1][0], "Sin Identificar")
+
+		for batch_size in [1, 7, 100]:
+			self.assertEqual(list(match_pages(iter(pages), matcher, workers=2, batch_size=batch_size)), serial)
+
+		# Cortar la iteración cancela los lotes pendientes
+		paginas = match_pages(iter(pages), matcher, workers=2, batch_size=5)
+		self.assertEqual(next(paginas), serial[0])
+		paginas.close()
+
+	def test_match_pages_sticky(self):
+		"""Con "sticky" y reglas que se superponen los resultados y los
+		contadores no dependen de los lotes ni de los procesos"""
+
+		config = self.config + """
+		"Comun":
+			match:
+				"Pagina":
+			system: "Sistema"
+			department: "Departamento"
+	Matcher:
+		sticky: true
+	"""
+		pages = ["Reporte {0}\\nPagina {1}\\n".format(1 + (i // 3) % 2, i) if i % 5 else "Pagina {0}\\n".format(i) for i in range(40)] + ["Otra\\n"]
+		matcher	= ReportMatcher(configbuffer=config)
+		serial	= list(match_pages(iter(pages), matcher))
+		self.assertIn("Comun", [d[0] for _, d in serial])
+		contadores = (matcher.hits, matcher.misses)
+
+		for batch_size in [1, 4, 7, 100]:
+			matcher = ReportMatcher(configbuffer=config)
+			self.assertEqual(list(match_pages(iter(pages), matcher, workers=2, batch_size=batch_size)), serial)
+			self.assertEqual((matcher.hits, matcher.misses), contadores)
@@ -1,4 +1,4 @@
-from openerm.OermClient import OermClient
+from openerm.OermClient import OermClient, _iter_search_database, _search_database
 from OermTestFixtures import OermTestCatalogFixtures
 from openerm.Block import Block
 import os
@@ -34,3 +34,58 @@ class OermClientTest(OermTestCatalogFixtures):
 		block = Block()  # Generic
 
 		self.assertEqual(len(resultados), len(block.compressor.available_types))
+
+	def test_search_text(self):
+		"""Búsqueda de un texto en todos los databases del catalogo"""
+		c = OermClient(self._configfile)
+		c.open_catalog("catalogo1")
+		texto	= self._paginas_escritas[14][100:112]
+		total	= len(Block().compressor.available_types)
+
+		for workers in [0, 2]:
+			resultados = list(c.search_text(texto, workers=workers))
+			self.assertEqual(len(resultados), total)
+			self.assertEqual({(r[1], r[2]) for r in resultados}, {(2, 5)})
+			self.assertEqual(len({r[0] for r in resultados}), total)
+			self.assertTrue(all(os.path.isfile(r[0]) for r in resultados))
+
+			self.assertEqual(len(list(c.search_text(texto, reporte="Reporte 2", workers=workers))), total)
+			self.assertEqual(list(c.search_text(texto, reporte="Reporte 1", workers=workers)), [])
+			self.assertEqual(list(c.search_text(texto, aplicacion="Aplicacion 1", workers=workers)), [])
+			self.assertEqual(len(list(c.search_text("Pagina", limit=3, workers=workers))), 3)
+
+		# Cancelación al cerrar el generador
+		resultados = c.search_text("Pagina", workers=2)
+		self.assertEqual(len(next(resultados)), 5)
+		resultados.close()
+
+	def test_search_database(self):
+		"""Búsqueda en un database: lotes de ocurrencias, límite, cancelación
+		y databases que ya no existen"""
+
+		import queue
+		import threading
+
+		c = OermClient(self._configfile)
+		c.open_catalog("catalogo1")
+		database	= next(c.search_text("Pagina", workers=0))[0]
+		todas		= list(_iter_search_database(database, "Pagina", {}))
+		self.assertEqual(len(todas), 2 * len(self._paginas_escritas))
+
+		for limit, esperadas in [(None, todas), (5, todas[:5])]:
+			results = queue.Queue()
+			_search_database(database, "Pagina", {}, limit, threading.Event(), results, batch_size=3)
+			lotes = list(iter(results.get, None))
+			self.assertTrue(all(0 < len(lote) <= 3 for lote in lotes))
+			self.assertEqual([o for lote in lotes for o in lote], esperadas)
+			self.assertTrue(results.empty())
+
+		# Cancelada: no se lee ningún contenedor
+		cancel = threading.Event()
+		cancel.set()
+		self.assertEqual(list(_iter_search_database(database, "Pagina", {}, cancel)), [])
+
+		# Un database del repo.db que ya no existe no se crea al buscar
+		faltante = os.path.join(self._repopath, "faltante.oerm")
+		self.assertEqual(list(_iter_search_database(faltante, "Pagina", {})), [])
+		self.assertFalse(any(os.path.exists(faltante + ext) for ext in ["", ".ridx", ".cidx"]))
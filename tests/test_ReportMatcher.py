@@ -83,3 +83,163 @@ class ReportMatcherTest(unittest.TestCase):
 		r = ReportMatcher(configbuffer=config)
 
 		self.assertEqual(r.match(self.test_page)[0], "Prueba")
+
+	def test_no_match(self):
+		"""Páginas que no coinciden con ninguna regla"""
+
+		config = """
+		Reports:
+			"Prueba":
+				match:
+					"No existe": [1, 5, 1, 40]
+					"Tampoco existe":
+				system: "Sistema"
+				department: "Departamento"
+		"""
+		self.assertEqual(ReportMatcher(configbuffer=config).match(self.test_page), ("Sin Identificar", "n/a", "n/a", None))
+		self.assertEqual(ReportMatcher(configbuffer="Reports: {}").match(self.test_page)[0], "Sin Identificar")
+
+	def test_compiled_rules(self):
+		"""Las reglas compiladas identifican lo mismo que evaluar las reglas una
+		por una, en el orden de la configuración, con pocas reglas y con el
+		autómata de Aho-Corasick"""
+
+		import random
+		from unittest import mock
+		from openerm.TextMatcher import TextMatcher
+
+		def reference(matcher, text):
+			for reporte, match, box in matcher.matches:
+				if box:
+					for i, l in enumerate(text.split("\n"), 1):
+						if i in range(box[0], box[1]+1) and match in l[box[2]-1:box[3]+1]:
+							return reporte
+				elif match in text:
+					return reporte
+			return "Sin Identificar"
+
+		rnd		= random.Random(1)
+		lines	= self.test_page.split("\n")
+		rules	= []
+		for n in range(400):
+			l = rnd.randrange(1, len(lines))
+			line = lines[l - 1]
+			start = rnd.randrange(0, max(len(line) - 5, 1))
+			match = line[start:start + rnd.randrange(3, 8)] or "x"
+			if n % 50 == 49:
+				rules.append('"Reporte {0}":\n  match:\n    "{1}":\n  system: "S"\n  department: "D"\n'.format(n, match))
+			else:
+				box = [max(l - rnd.randrange(0, 2), 1), l + rnd.randrange(0, 2), max(start + 1 + rnd.randrange(-1, 2), 1), start + len(match) + rnd.randrange(-2, 2)]
+				rules.append('"Reporte {0}":\n  match:\n    "{1}": {2}\n  system: "S"\n  department: "D"\n'.format(n, match, box))
+
+		pages = [self.test_page, self.test_page.replace("Lorem", "lorem"), "\n".join(lines[3:]), "\n".join(lines[:3]) + "\nñandú €"]
+		for cantidad in [5, 60, 400]:
+			config = "Matcher:\n  sticky: false\nReports:\n" + "".join("  " + l + "\n" for r in rules[-cantidad:] for l in r.split("\n"))
+			for threshold in [1, 1000]:
+				with mock.patch.object(TextMatcher, "automaton_threshold", threshold):
+					r = ReportMatcher(configbuffer=config)
+				for page in pages:
+					self.assertEqual(r.match(page)[0], reference(r, page))
+
+		r = ReportMatcher(configbuffer=config)
+		self.assertEqual(r.match(self.test_page)[1:], ("S", "D", None))
+
+	def test_sticky_and_window(self):
+		"""Última regla primero y ventana de cabecera global y por reporte"""
+
+		config = """
+		Matcher:
+			sticky: true
+			window:
+				lines: 12
+		Reports:
+			"Prueba 1":
+				match:
+					"Lorem ipsum": [1, 3, 1, 40]
+				system: "Sistema"
+				department: "Departamento"
+			"Prueba 2":
+				match:
+					"Suspendisse potenti":
+				system: "Sistema"
+				department: "Departamento"
+			"Prueba 3":
+				match:
+					"In semper nec":
+				window:
+					lines: 20
+				system: "Sistema"
+				department: "Departamento"
+		"""
+		otra = self.test_page.replace("Lorem ipsum", "Otro texto")
+		r = ReportMatcher(configbuffer=config)
+		self.assertEqual([r.match(p)[0] for p in [self.test_page, self.test_page, otra, otra, self.test_page]],
+						["Prueba 1", "Prueba 1", "Prueba 2", "Prueba 2", "Prueba 2"])
+		self.assertEqual((r.hits, r.misses), (3, 1))
+
+		# Por defecto sin "sticky": siempre la primera regla según la configuración
+		r = ReportMatcher(configbuffer=config.replace("sticky: true", ""))
+		self.assertEqual([r.match(p)[0] for p in [self.test_page, otra, self.test_page]], ["Prueba 1", "Prueba 2", "Prueba 1"])
+		self.assertEqual((r.hits, r.misses), (0, 0))
+
+		# "Suspendisse potenti" está en la línea 11 y "In semper nec" en la 16
+		for lines, esperado in [(10, "Prueba 3"), (11, "Prueba 2")]:
+			r = ReportMatcher(configbuffer=config.replace("lines: 12", "lines: {0}".format(lines)))
+			self.assertEqual(r.match(otra)[0], esperado)
+			self.assertEqual(r.match(otra + "ñandú €")[0], esperado)
+			self.assertEqual(r.match(otra)[0], esperado)
+
+		# La ventana del reporte solo define las líneas, los bytes son los globales
+		r = ReportMatcher(configbuffer=config.replace("lines: 12", "bytes: {0}".format(otra.index("Suspendisse") + 18)))
+		self.assertEqual(r.match(otra)[0], "Sin Identificar")
+		r = ReportMatcher(configbuffer=config.replace("lines: 12", "bytes: {0}".format(otra.index("Suspendisse") + 19)))
+		self.assertEqual(r.match(otra)[0], "Prueba 2")
+
+	def test_regex_match(self):
+		"""Reglas con expresiones regulares, una única alternativa por ventana
+		y fecha y sistema tomados de los grupos con nombre"""
+
+		config = r"""
+		Matcher:
+			sticky: false
+		Reports:
+			"Prueba 1":
+				regex:
+					- 'Vestibulum (?P<sistema>\w+) augue .* (?P<fecha>\d{8})'
+				system: "Sistema"
+				department: "Departamento"
+			"Prueba 2":
+				regex:
+					- '(?i)PHASELLUS (?P<fecha>\d{8})'
+				window:
+					lines: 11
+				system: "Sistema 2"
+				department: "Departamento 2"
+			"Prueba 3":
+				match:
+					"Praesent maximus": [6, 7, 1, 120]
+				regex:
+					- 'In semper (?P<sistema>\w+)'
+				system: "Sistema 3"
+				department: "Departamento 3"
+		"""
+		pagina = self.test_page.replace("Vestibulum placerat augue orci,", "Vestibulum placerat augue orci, 20160914")
+		pagina = pagina.replace("Phasellus interdum", "Phasellus 20170101 interdum")
+
+		for sticky in ["false", "true"]:
+			r = ReportMatcher(configbuffer=config.replace("sticky: false", "sticky: " + sticky))
+			self.assertEqual(len(r._groups), 2)
+			self.assertEqual(r.match(pagina), ("Prueba 1", "placerat", "Departamento", "20160914"))
+			self.assertEqual(r.match(pagina.replace("20160914", "20160915")), ("Prueba 1", "placerat", "Departamento", "20160915"))
+			self.assertEqual(r.match(self.test_page.replace("Phasellus interdum", "phasellus 20170101")),
+							("Prueba 2", "Sistema 2", "Departamento 2", "20170101"))
+			# La primer regla de texto de "Prueba 3" tiene prioridad sobre la expresión regular
+			self.assertEqual(r.match(self.test_page), ("Prueba 3", "Sistema 3", "Departamento 3", None))
+			self.assertEqual(r.match(self.test_page.replace("Praesent maximus", "")), ("Prueba 3", "nec", "Departamento 3", None))
+
+		# Fuera de la ventana no se busca
+		self.assertEqual(r.match(self.test_page.replace("Phasellus dictum", "Phasellus 20170101").replace("In semper", "")
+								.replace("Praesent maximus", ""))[0], "Sin Identificar")
+
+		with self.assertRaises(ValueError):
+			ReportMatcher(configbuffer=config.replace("(?P<sistema>", "(?P<sistema"))
@@ -44,3 +44,25 @@ class ReportsTest(OermTestCatalogFixtures):
 					(2, 7, 0), (2, 7, 12029), (2, 8, 0), (2, 8, 12029), (2, 9, 0), (2, 9, 12029), (2, 10, 0), (2, 10, 12029)]
 
 			self.assertEqual([(x[0], x[1], x[2]) for x in matches], esperado)
+
+	def test_reports_list_from_index(self):
+		"""Verifica que la lista de reportes salga del índice sin leer bloques del database"""
+
+		filename = os.path.join(self._repopath, "test.1-0.oerm")
+		db = Database(file=filename, mode="rb")
+
+		def no_block_read(*args):
+			raise AssertionError("Se leyó un bloque del database")
+
+		reports = []
+		for r in db.reports():
+			r._get_block_data_from_offset = no_block_read
+			reports.append((r.id, r.nombre, r.total_pages, r.sistema, r.departamento, r.uncompressed_size))
+			self.assertTrue(0 < r.compressed_size < r.uncompressed_size)
+
+		paginas = self._paginas_escritas
+		self.assertEqual(reports, [
+			(1, "Reporte 1", 10, "Sistema 1", "Departamento 1", sum(len(p) for p in paginas[:10])),
+			(2, "Reporte 2", 10, "Sistema 2", "Departamento 2", sum(len(p) for p in paginas[10:]))
+		])
+		db.close()
@@ -47,3 +47,61 @@ class SpoolFixedRecordLengthtTest(OermTestSpoolFixtures):
 		self.maxDiff = None
 		self.assertEqual(pagina, 10)
 		self.assertListEqual(self._paginas, read_pages)
+
+	def test_mmap(self):
+		"""Lectura como bytes mapeados en memoria: mismas páginas que la
+		lectura como texto"""
+
+		import os
+
+		filename = self._spools['SpoolFixedRecordLength'].get('filename')
+		with SpoolFixedRecordLength(filename, 102400, encoding="cp500", record_len=132, mmap=True) as s:
+			self.assertListEqual(self._paginas, list(s))
+
+		# Registro incompleto al final, código de más de un carácter,
+		# bloques de lectura menores a un registro y archivo vacío
+		otro = os.path.join(self._startpath, "otro.spool")
+		with open(otro, "wb") as f:
+			f.write(b"".join(l.ljust(20).encode("cp500") for l in ["NEVADO 1", "A   ", "", "NEVADO  2", "B  \t", "NEVADO", "  C"]) + "D  ".encode("cp500"))
+		open(os.path.join(self._startpath, "vacio.spool"), "wb").close()
+
+		for name, code in [(otro, "NEVADO"), (otro, "NEVADO "), (otro, ""), (os.path.join(self._startpath, "vacio.spool"), "1")]:
+			with SpoolFixedRecordLength(name, 10, encoding="cp500", record_len=20, newpage_code=code) as s:
+				esperadas = list(s)
+			with SpoolFixedRecordLength(name, 10, encoding="cp500", record_len=20, newpage_code=code, mmap=True) as s:
+				self.assertListEqual(esperadas, list(s))
+
+		self.assertEqual(esperadas, [""])
+		with self.assertRaises(ValueError):
+			with SpoolFixedRecordLength(otro, encoding="utf-8", mmap=True) as s:
+				list(s)
+
+	def test_translate(self):
+		"""Lectura de bloques traducidos a latin1: mismas páginas que la
+		lectura como texto"""
+
+		import os
+
+		filename = self._spools['SpoolFixedRecordLength'].get('filename')
+		for mmap in [False, True]:
+			with SpoolFixedRecordLength(filename, 102400, encoding="cp500", record_len=132, mmap=mmap, translate=True) as s:
+				self.assertListEqual(self._paginas, list(s))
+
+		# cp1140 (€ fuera de latin1), páginas que continúan en el bloque
+		# siguiente, registro incompleto al final y archivo vacío
+		otro = os.path.join(self._startpath, "otro.spool")
+		with open(otro, "wb") as f:
+			f.write(b"".join(l.ljust(20).encode("cp1140") for l in ["1 Total € 1", "A ñ", "", "1", "1 B  \t", "  C", " D"]) + "1 €".encode("cp1140"))
+		open(os.path.join(self._startpath, "vacio.spool"), "wb").close()
+
+		for name, code in [(otro, "1"), (otro, "1 "), (otro, ""), (os.path.join(self._startpath, "vacio.spool"), "1")]:
+			with SpoolFixedRecordLength(name, 10, encoding="cp1140", record_len=20, newpage_code=code) as s:
+				esperadas = list(s)
+			for buffer_size, mmap in [(10, False), (40, True), (60, False), (102400, True)]:
+				with SpoolFixedRecordLength(name, buffer_size, encoding="cp1140", record_len=20, newpage_code=code, mmap=mmap, translate=True) as s:
+					self.assertListEqual(esperadas, list(s))
+
+		self.assertEqual(esperadas, [""])
+		with self.assertRaises(ValueError):
+			with SpoolFixedRecordLength(otro, encoding="utf-8", translate=True) as s:
+				list(s)
@@ -38,3 +38,55 @@ class SpoolHostReprintTest(OermTestSpoolFixtures):
 
 		self.assertEqual(pagina, 10)
 		self.assertEqual(self._paginas, read_pages)
+
+	def test_page_boundaries(self):
+		"""Mismos saltos de página que la lectura línea por línea como texto,
+		con bloques de distintos tamaños, fines de línea \\r\\n y \\r y
+		distintas codificaciones"""
+
+		import os
+		import random
+
+		def reference(filename, encoding):
+			pages, page = [], ""
+			with open(filename, mode="rt", encoding=encoding) as f:
+				for line in f:
+					if line[0] == "1" and page != "":
+						pages.append(page)
+						page = ""
+					page += line
+			return pages + [page] if page else pages
+
+		rnd			= random.Random(1)
+		filename	= os.path.join(self._startpath, "boundaries.spool")
+		for n in range(40):
+			lines = ["".join(rnd.choice("1 AÑ\r") for _ in range(rnd.randrange(0, 6))) for _ in range(rnd.randrange(0, 30))]
+			text = "".join(l + rnd.choice(["\n", "\r\n", "\r", "\n1"]) for l in lines)
+			for encoding in ["latin1", "cp500", "utf-8", "utf-16"]:
+				with open(filename, "wb") as f:
+					f.write(text.encode(encoding))
+				for buffer_size in [1, 2, 3, 7, 102400]:
+					with SpoolHostReprint(filename, buffer_size, encoding=encoding) as s:
+						self.assertEqual(list(s), reference(filename, encoding), (text, encoding, buffer_size))
+
+	def test_translate(self):
+		"""Lectura de bloques traducidos a latin1: mismas páginas que la
+		lectura sin traducir"""
+
+		import os
+
+		filename = os.path.join(self._startpath, "translate.spool")
+		text = "1 Total € 1\r\n Ñandú\n\n1\r1 B  \n  C\n1 €"
+		for encoding in ["cp037", "cp500", "cp1140"]:
+			with open(filename, "wb") as f:
+				f.write(text.encode(encoding, errors="replace"))
+			with SpoolHostReprint(filename, encoding=encoding) as s:
+				esperadas = list(s)
+			for buffer_size in [1, 5, 102400]:
+				with SpoolHostReprint(filename, buffer_size, encoding=encoding, translate=True) as s:
+					self.assertEqual(list(s), esperadas)
+
+		self.assertEqual(esperadas, ["1 Total € 1\n Ñandú\n\n", "1\n", "1 B  \n  C\n", "1 €"])
+		with self.assertRaises(ValueError):
+			with SpoolHostReprint(filename, encoding="utf-8", translate=True) as s:
+				list(s)
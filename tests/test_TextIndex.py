@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# test of TextIndex
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+"""
+
+
+import os
+import unittest
+
+from openerm.TextIndex import TextIndex, trigrams
+from openerm.Database import Database
+from OermTestFixtures import OermTestCatalogFixtures
+
+
+class TextIndexTest(unittest.TestCase):
+
+	def test_trigrams(self):
+		"""Trigramas distintos de un texto"""
+		self.assertEqual(trigrams(b"abcabc"), {int.from_bytes(t, "big") for t in [b"abc", b"bca", b"cab"]})
+		self.assertEqual(trigrams(b"ab"), set())
+
+
+class TextIndexDatabaseTest(OermTestCatalogFixtures):
+
+	def _generate(self, filename, **kwargs):
+		db = Database(file=filename, mode="wb", default_compress_method=1, pages_in_container=2, **kwargs)
+		db.add_report(reporte="Reporte 1", sistema="Sistema 1", aplicacion="Aplicacion 1", departamento="Departamento 1")
+		for p in self._paginas_escritas:
+			db.add_page(p)
+		db.close()
+
+	def test_find_text_with_index(self):
+		"""La búsqueda con índice de texto retorna lo mismo que sin índice
+		leyendo solo los contenedores candidatos"""
+
+		filename = os.path.join(self._repopath, "textindex.oerm")
+		texto    = self._paginas_escritas[6][100:112]
+
+		for workers in [0, 2]:
+			self._generate(filename, text_index=True, workers=workers, checkpoint_interval=4)
+
+			db = Database(file=filename, mode="rb")
+			self.assertGreater(len(db.TextIndex._segments), 1)
+			# Al abrir solo se leen los offsets de los contenedores
+			self.assertEqual(db.TextIndex._directories, [None] * len(db.TextIndex._segments))
+			candidatos = db.TextIndex.candidates(texto)
+			self.assertNotIn(None, db.TextIndex._directories)
+			self.assertIn(db.Index.reports[1][4][3], candidatos)
+			self.assertLess(len(candidatos), 3)
+			self.assertIsNone(db.TextIndex.candidates("Pa"))
+			self.assertEqual(db.TextIndex.candidates("Pagina €"), set())
+
+			matches = db.find_text(texto)
+			self.assertEqual([(m[0], m[1]) for m in matches], [(1, 7)])
+			self.assertLessEqual(db.cache.misses, len(candidatos))
+			self.assertEqual(len(db.find_text("Pagina")), 2 * len(self._paginas_escritas))
+			db.close()
+
+		# Sin índice de texto: búsqueda completa
+		self._generate(filename)
+		self.assertFalse(TextIndex.exists(filename))
+		db = Database(file=filename, mode="rb")
+		self.assertIsNone(db.TextIndex)
+		self.assertEqual([(m[0], m[1]) for m in db.find_text(texto)], [(1, 7)])
+		db.close()
+
+		for ext in ["", ".ridx", ".cidx"]:
+			os.remove(filename + ext)
+
+	def test_index_and_bloom_with_pool(self):
+		"""Con índice de texto y filtros de Bloom el pool de escritura genera
+		los mismos archivos que la escritura en el proceso"""
+
+		filename	= os.path.join(self._repopath, "textindex.bloom.oerm")
+		archivos	= []
+		for workers in [0, 2]:
+			self._generate(filename, text_index=True, bloom_fpr=0.01, workers=workers)
+			archivos.append([open(filename + ext, "rb").read() for ext in ["", ".tidx"]])
+
+		self.assertEqual(archivos[0], archivos[1])
+		db = Database(file=filename, mode="rb")
+		self.assertEqual([(m[0], m[1]) for m in db.find_text(self._paginas_escritas[6][100:112])], [(1, 7)])
+		db.close()
+
+		for ext in ["", ".ridx", ".cidx", ".tidx"]:
+			os.remove(filename + ext)
+
+	def test_append_without_index(self):
+		"""Los contenedores agregados sin índice de texto siempre son candidatos"""
+
+		filename = os.path.join(self._repopath, "textindex.append.oerm")
+		self._generate(filename, text_index=True)
+
+		db = Database(file=filename, mode="ab", default_compress_method=1)
+		db.add_report(reporte="Reporte 2", sistema="Sistema 2", aplicacion="Aplicacion 2", departamento="Departamento 2")
+		db.add_page("Pagina agregada sin indice")
+		db.close()
+
+		db = Database(file=filename, mode="rb")
+		self.assertEqual([(m[0], m[1]) for m in db.find_text("agregada")], [(2, 1)])
+		db.close()
+
+		for ext in ["", ".ridx", ".cidx", ".tidx"]:
+			os.remove(filename + ext)
+
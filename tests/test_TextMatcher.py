@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# test of TextMatcher
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+"""
+
+import re
+import unittest
+
+from openerm.PageContainer import PageContainer
+from openerm.TextMatcher import TextMatcher, page_starts, sample
+
+
+class TextMatcherTest(unittest.TestCase):
+
+	def setUp(self):
+		self.pages = ["Pagina 1 - ABC\n", "ABC Pagina 2 AB", "C Pagina 3 ñandú ABC"]
+		p = PageContainer(10)
+		for page in self.pages:
+			p.add(page)
+		self.data, var_data = p.dump()
+		self.starts = page_starts(var_data)
+
+	def test_find_pages(self):
+		"""Las ocurrencias coinciden con str.find sobre cada página, sin las que abarcan dos páginas"""
+
+		for text in ["ABC", "Pagina", "ñandú", "a", "No existe", "€"]:
+			esperado = [(i, pos, text) for i, page in enumerate(self.pages, 1)
+						for pos in range(len(page)) if page.startswith(text, pos)]
+			self.assertEqual(TextMatcher(text).find_pages(self.data, self.starts), esperado)
+
+	def test_find_multiple(self):
+		"""Una lista de textos, con y sin autómata de Aho-Corasick, informa el texto encontrado"""
+
+		textos   = ["ABC", "Pagina", "ñandú", "No existe", "B", "€"]
+		esperado = sorted(((i, pos, text) for text in textos for i, page in enumerate(self.pages, 1)
+						for pos in range(len(page)) if page.startswith(text, pos)), key=lambda o: (o[0], o[1]))
+
+		for threshold in [TextMatcher.automaton_threshold, 1]:
+			matcher = TextMatcher(textos)
+			if threshold == 1:
+				matcher = type("TextMatcherAC", (TextMatcher,), {"automaton_threshold": 1})(textos)
+				self.assertIsNotNone(matcher._automaton)
+			encontrado = matcher.find_pages(self.data, self.starts)
+			self.assertEqual(sorted(encontrado, key=lambda o: (o[0], o[1], o[2])), sorted(esperado, key=lambda o: (o[0], o[1], o[2])))
+
+	def test_find_regex(self):
+		"""Una expresión regular informa el texto encontrado"""
+
+		matcher = TextMatcher(re.compile(r"Pagina \d"))
+		self.assertEqual(matcher.find_pages(self.data, self.starts), [(1, 0, "Pagina 1"), (2, 4, "Pagina 2"), (3, 2, "Pagina 3")])
+
+		matcher = TextMatcher(re.compile("ñ[a-z]+"))
+		self.assertEqual(matcher.find_pages(self.data, self.starts), [(3, 11, "ñand")])
+
+	def test_sample(self):
+		"""Extracto de una ocurrencia"""
+		self.assertEqual(sample(self.pages[0], 11, "ABC"), "Pagina 1 - -[ABC]-")
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+"""
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# bench_find_text.py
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+Medición del costo (tiempo y memoria) de una búsqueda completa de un texto
+en un reporte: búsqueda sobre los bytes de los contenedores (Report.find_text)
+contra la búsqueda original, decodificando cada página (Report.get_page) y
+buscando sobre el texto.
+
+La búsqueda sobre los bytes ahorra la decodificación de las páginas, por lo
+que la mejora se ve cuando la descompresión no domina el costo: contenedores
+sin compresión o con compresores rápidos (LZ4, Snappy). Con GZIP casi todo el
+tiempo de ambas búsquedas es el de `zlib.decompress`, y si todas las páginas
+tienen ocurrencias igual se decodifican para armar el extracto. La memoria es
+menor en todos los casos.
+"""
+
+try:
+	import gettext
+	from gettext import gettext as _
+	gettext.textdomain('openerm')
+
+	import os
+	import sys
+	import time
+	import string
+	import random
+	import tempfile
+	import tracemalloc
+
+	sys.path.append('.')
+	sys.path.append('..')
+
+	from openerm.Database import Database
+	from openerm.TextMatcher import sample
+	from openerm.tabulate import tabulate
+
+except ImportError as err:
+	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
+	print(_("No fue posible importar el modulo: %s") % modulename)
+	sys.exit(-1)
+
+
+def find_text_pages(report, text):
+	"""Búsqueda original: cada página se decodifica y se busca sobre el texto"""
+	ocurrences = []
+	for np in range(1, report.total_pages + 1):
+		p = report.get_page(np)
+		pos = p.find(text)
+		while pos >= 0:
+			ocurrences.append((report.id, np, pos, sample(p, pos, text)))
+			pos = p.find(text, pos + 1)
+	return ocurrences
+
+
+def measure(func, repeat=5):
+	"""Mejor tiempo de `repeat` corridas y pico de memoria de una búsqueda
+	(medido en una corrida aparte)"""
+	elapsed = None
+	for _ in range(repeat):
+		start	= time.perf_counter()
+		result	= func()
+		t		= time.perf_counter() - start
+		elapsed	= t if elapsed is None else min(elapsed, t)
+
+	tracemalloc.start()
+	func()
+	_, peak	= tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return result, elapsed, peak
+
+
+if __name__ == "__main__":
+
+	total_pages	= 2000
+	filename	= os.path.join(tempfile.mkdtemp(), "bench_find_text.oerm")
+	chars		= string.ascii_uppercase + string.digits + "     "
+	pages		= []
+	for i in range(1, total_pages + 1):
+		lines = [" Pagina {0:>6}".format(i)] + [" " + ''.join(random.choice(chars) for _ in range(131)) for _ in range(60)]
+		pages.append("\n".join(lines) + "\n")
+
+	resultados = []
+	for compress_method in [0, 1, 4, 7]:
+		db = Database(file=filename, mode="wb", default_compress_method=compress_method, pages_in_container=20)
+		db.add_report(reporte="Reporte 1", sistema="Sistema", aplicacion="Aplicacion", departamento="Departamento")
+		for p in pages:
+			db.add_page(p)
+		db.close()
+
+		for text in ["Pagina", "XYZ9", "NO EXISTE"]:
+			db		= Database(file=filename, mode="rb", cache_size=0)
+			report	= db.reports().get_report(1)
+
+			r_pages, t_pages, m_pages	= measure(lambda: find_text_pages(report, text))
+			r_bytes, t_bytes, m_bytes	= measure(lambda: report.find_text(text))
+			db.close()
+
+			assert r_pages == r_bytes
+
+			resultados.append([
+				compress_method,
+				text,
+				len(r_bytes),
+				t_pages * 1000,
+				t_bytes * 1000,
+				t_pages / t_bytes,
+				m_pages / 1024,
+				m_bytes / 1024
+			])
+
+		for ext in ["", ".ridx", ".cidx"]:
+			os.remove(filename + ext)
+
+	tablestr = tabulate(
+					tabular_data		= resultados,
+					headers				= ["Compresión", "Texto", "Ocurrencias", "Páginas (ms)", "Bytes (ms)", "Mejora (x)", "Páginas (KB)", "Bytes (KB)"],
+					floatfmt			= "8.1f",
+					tablefmt			= "psql",
+					numalign			= "right",
+					stralign			= "left"
+	)
+	print("")
+	print(tablestr)
+	print("")
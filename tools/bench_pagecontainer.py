@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# bench_pagecontainer.py
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+Medición del costo de armado de un PageContainer (PageContainer.dump) en
+función de la cantidad de páginas y del tamaño de las mismas. Se compara
+contra el armado original por concatenación de bytes.
+"""
+
+try:
+	import gettext
+	from gettext import gettext as _
+	gettext.textdomain('openerm')
+
+	import sys
+	import time
+	import struct
+	import string
+	import random
+
+	sys.path.append('.')
+	sys.path.append('..')
+
+	from openerm.PageContainer import PageContainer
+	from openerm.tabulate import tabulate
+
+except ImportError as err:
+	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
+	print(_("No fue posible importar el modulo: %s") % modulename)
+	sys.exit(-1)
+
+
+def dump_concat(pages):
+	"""Armado original del contenedor: concatenación de bytes + struct.pack"""
+	data = b''
+	for p in pages:
+		data += p.encode("latin1")
+
+	a_list = [len(p) for p in pages]
+	ln = len(a_list)
+
+	var_data	= b''
+	var_data	+= struct.pack('>H', len(pages))
+	var_data	+= struct.pack('>' + 'L'*ln, *a_list)
+	data		= struct.pack('>{0}s'.format(len(data)), data)
+	return (data, var_data)
+
+
+def measure(func, repeat):
+	start = time.perf_counter()
+	for _ in range(repeat):
+		func()
+	return (time.perf_counter() - start) / repeat
+
+
+if __name__ == "__main__":
+
+	resultados	= []
+	repeat		= 20
+
+	for page_size in [2 * 1024, 16 * 1024, 64 * 1024]:
+		line = ''.join(random.choice(string.ascii_uppercase + string.digits) for _ in range(page_size))
+		for page_count in [10, 50, 100]:
+
+			pages		= [line] * page_count
+			container	= PageContainer(page_count)
+			for p in pages:
+				container.add(p)
+
+			assert container.dump() == dump_concat(pages)
+
+			t_concat	= measure(lambda: dump_concat(pages), repeat)
+			t_dump		= measure(container.dump, repeat)
+
+			resultados.append([
+				page_count,
+				page_size,
+				t_concat * 1000,
+				t_dump * 1000,
+				t_concat / t_dump
+			])
+
+	tablestr = tabulate(
+					tabular_data		= resultados,
+					headers				= ["Páginas", "Tamaño (bytes)", "Concat. (ms)", "dump (ms)", "Mejora (x)"],
+					floatfmt			= "8.3f",
+					tablefmt			= "psql",
+					numalign			= "right",
+					stralign			= "left"
+	)
+	print("")
+	print(tablestr)
+	print("")
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+"""
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# bench_report_lookup.py
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+Medición del costo de resolver el nombre de reporte de cada página durante
+la ingesta de un spool con muchos reportes distintos (10.000 por defecto).
+Se reproduce el ciclo de LoadProcess (get_report/add_report/set_report por
+página) y se compara la búsqueda por diccionario del Index contra la
+búsqueda lineal original.
+"""
+
+try:
+	import gettext
+	from gettext import gettext as _
+	gettext.textdomain('openerm')
+
+	import sys
+	import os
+	import time
+	import random
+	import tempfile
+
+	sys.path.append('.')
+	sys.path.append('..')
+
+	from openerm.Database import Database
+	from openerm.Index import Index
+	from openerm.tabulate import tabulate
+
+except ImportError as err:
+	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
+	print(_("No fue posible importar el modulo: %s") % modulename)
+	sys.exit(-1)
+
+
+def get_report_lineal(self, reporte):
+	"""Búsqueda original: recorrido de todos los reportes del índice"""
+	for k,r in self.reports.items():
+		if r[0] == reporte[0:50]:
+			return k
+	return None
+
+
+def spool_sintetico(total_reportes, paginas_por_reporte):
+	"""Páginas de un spool con `total_reportes` nombres distintos intercalados"""
+	nombres = ["REPORTE {0:05d} - LISTADO DE PRUEBA".format(i) for i in range(total_reportes)]
+	orden	= nombres * paginas_por_reporte
+	random.seed(0)
+	random.shuffle(orden)
+	return [(n, "{0}\nLinea de detalle de la pagina\n".format(n)) for n in orden]
+
+
+def ingesta(pages, filename):
+	"""Ciclo de LoadProcess: un reporte por nombre, páginas agrupadas en contenedores"""
+	reports					= set()
+	reportname_anterior		= ""
+	db						= Database(file=filename, mode="wb", default_compress_method=0, pages_in_container=10)
+	for reportname, page in pages:
+		reports.add(reportname)
+		if reportname != reportname_anterior:
+			rpt_id = db.get_report(reportname)
+			if rpt_id:
+				db.set_report(reportname)
+			else:
+				db.add_report(reporte=reportname, sistema="BENCH", aplicacion="", departamento="", fecha="20160101")
+			reportname_anterior = reportname
+		db.add_page(page)
+	db.close()
+	return len(reports)
+
+
+def measure(pages, filename):
+	start = time.perf_counter()
+	total = ingesta(pages, filename)
+	return total, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+
+	resultados	= []
+	filename	= os.path.join(tempfile.gettempdir(), "bench_report_lookup.oerm")
+	get_report	= Index.get_report
+
+	for total_reportes in [1000, 10000]:
+
+		pages = spool_sintetico(total_reportes, 3)
+
+		Index.get_report = get_report_lineal
+		try:
+			total, t_lineal = measure(pages, filename)
+		finally:
+			Index.get_report = get_report
+
+		total, t_dict = measure(pages, filename)
+
+		resultados.append([
+			total,
+			len(pages),
+			t_lineal,
+			t_dict,
+			t_lineal / t_dict
+		])
+
+	os.remove(filename)
+
+	tablestr = tabulate(
+					tabular_data		= resultados,
+					headers				= ["Reportes", "Páginas", "Lineal (s)", "Diccionario (s)", "Mejora (x)"],
+					floatfmt			= "8.3f",
+					tablefmt			= "psql",
+					numalign			= "right",
+					stralign			= "left"
+	)
+	print("")
+	print(tablestr)
+	print("")
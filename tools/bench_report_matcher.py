@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# bench_report_matcher.py
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+Medición del costo de identificar los reportes de las páginas de
+samples/L80001 con una configuración sintética de 1000 reglas: reglas
+compiladas (ReportMatcher.match), sin y con "sticky" y ventana de cabecera,
+contra la evaluación original, regla por regla, separando la página en
+líneas en cada regla con caja.
+
+	python tools/bench_report_matcher.py [reglas]
+"""
+
+try:
+	import gettext
+	from gettext import gettext as _
+	gettext.textdomain('openerm')
+
+	import os
+	import sys
+	import time
+	import random
+	import string
+
+	sys.path.append('.')
+	sys.path.append('..')
+
+	from openerm.ReportMatcher import ReportMatcher
+	from openerm.SpoolFixedRecordLength import SpoolFixedRecordLength
+	from openerm.tabulate import tabulate
+
+except ImportError as err:
+	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
+	print(_("No fue posible importar el modulo: %s") % modulename)
+	sys.exit(-1)
+
+
+def match_original(matcher, text):
+	"""Evaluación original de las reglas: una por una, en orden"""
+	for reporte, match, box in matcher.matches:
+		if box:
+			for i, l in enumerate(text.split("\n"), 1):
+				if i in range(box[0], box[1]+1):
+					if match in l[box[2]-1:box[3]+1]:
+						return reporte
+		else:
+			if match in text:
+				return reporte
+
+	return "Sin Identificar"
+
+
+def synthetic_config(rules, matcher=""):
+	"""Configuración con `rules` reglas: reportes inexistentes con cajas en
+	distintas líneas y columnas, algunas reglas sin caja, y al final la regla
+	real de L80001"""
+	rnd		= random.Random(1)
+	config	= [matcher, "Reports:"]
+	for i in range(rules - 1):
+		codigo = "".join(rnd.choice(string.ascii_uppercase) for _ in range(2)) + "".join(rnd.choice(string.digits) for _ in range(4))
+		if i % 20 == 0:
+			match = '"{0}":'.format(codigo)
+		else:
+			linea, columna = rnd.randrange(1, 6), rnd.randrange(1, 100)
+			match = '"{0}": [{1}, {2}, {3}, {4}]'.format(codigo, linea, linea + rnd.randrange(0, 3), columna, columna + 20)
+		config.append('  "Reporte {0}":\n    match:\n      {1}\n    system: "Sistema"\n    department: "Departamento"'.format(i, match))
+
+	config.append('  "L80001":\n    match:\n      L80001: [2, 3, 1, 8]\n    system: "Sistema"\n    department: "Departamento"')
+	return "\n".join(config)
+
+
+if __name__ == "__main__":
+
+	rules		= int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+	spool		= os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "samples", "L80001")
+
+	with SpoolFixedRecordLength(spool, encoding="cp500", newpage_code="NEVADO") as s:
+		pages = [p for p in s]
+
+	config		= synthetic_config(rules)
+	start		= time.perf_counter()
+	matcher		= ReportMatcher(configbuffer=config)
+	t_config	= time.perf_counter() - start
+
+	start		= time.perf_counter()
+	r_original	= [match_original(matcher, p) for p in pages]
+	t_original	= time.perf_counter() - start
+
+	resultados	= []
+	modos		= [
+					("Compilado", "Matcher:\n  sticky: false"),
+					("Compilado + sticky", "Matcher:\n  sticky: true"),
+					("Compilado + sticky + ventana (5 líneas)", "Matcher:\n  sticky: true\n  window:\n    lines: 5"),
+				]
+	for modo, opciones in modos:
+		matcher		= ReportMatcher(configbuffer=synthetic_config(rules, opciones))
+		start		= time.perf_counter()
+		r_compiled	= [matcher.match(p)[0] for p in pages]
+		t_compiled	= time.perf_counter() - start
+
+		assert r_original == r_compiled
+
+		resultados.append([modo, t_original / len(pages) * 1000, t_compiled / len(pages) * 1000, t_original / t_compiled, matcher.hits, matcher.misses])
+
+	print("")
+	print("Reglas: {0}, Páginas: {1}, Carga de la configuración: {2:.2f} ms".format(rules, len(pages), t_config * 1000))
+
+	tablestr = tabulate(
+					tabular_data		= resultados,
+					headers				= ["Modo", "Original (ms/pág)", "Compilado (ms/pág)", "Mejora (x)", "Aciertos", "Fallos"],
+					floatfmt			= "8.3f",
+					tablefmt			= "psql",
+					numalign			= "right",
+					stralign			= "left"
+	)
+	print("")
+	print(tablestr)
+	print("")
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""
+# Copyright (c) 2014 Patricio Moracho <pmoracho@gmail.com>
+#
+# bench_spool_readers.py
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of version 3 of the GNU General Public License
+# as published by the Free Software Foundation. A copy of this license should
+# be included in the file GPL-3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.	See the
+# GNU Library General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA 02111-1307, USA.
+
+Medición de la velocidad de lectura (MB/s) de los lectores de spool sobre
+samples/L80001 repetido varias veces: SpoolFixedRecordLength como texto
+contra la lectura como bytes mapeados en memoria (mmap). También con un
+código de salto de página inexistente, es decir una única página con todo
+el archivo.
+
+También SpoolHostReprint (archivo FCFC armado con las páginas de
+samples/L80001) contra la lectura original línea por línea acumulando la
+página con ``+=``. En ambos casos también la lectura con los bloques
+traducidos de EBCDIC (cp500) a latin1 con `bytes.translate` (`translate`).
+
+	python tools/bench_spool_readers.py [repeticiones]
+"""
+
+try:
+	import gettext
+	from gettext import gettext as _
+	gettext.textdomain('openerm')
+
+	import os
+	import sys
+	import time
+	import shutil
+	import tempfile
+
+	sys.path.append('.')
+	sys.path.append('..')
+
+	from openerm.SpoolFixedRecordLength import SpoolFixedRecordLength
+	from openerm.SpoolHostReprint import SpoolHostReprint
+	from openerm.tabulate import tabulate
+
+except ImportError as err:
+	modulename = err.args[0].partition("'")[-1].rpartition("'")[0]
+	print(_("No fue posible importar el modulo: %s") % modulename)
+	sys.exit(-1)
+
+
+def read_pages(spool):
+	"""Lee todas las páginas de un spool, retorna (páginas, segundos)"""
+	start = time.perf_counter()
+	with spool as s:
+		pages = [len(p) for p in s]
+	return pages, time.perf_counter() - start
+
+
+def read_pages_original(filename, encoding, buffer_size=102400):
+	"""Lectura original de SpoolHostReprint: líneas de texto acumuladas en la
+	página con +=, retorna (páginas, segundos)"""
+	start	= time.perf_counter()
+	pages	= []
+	page	= ""
+	with open(filename, mode="rt", encoding=encoding) as f:
+		lines = f.readlines(buffer_size)
+		while lines:
+			for line in lines:
+				if line[0] == "1" and page != "":
+					pages.append(len(page))
+					page = ""
+				page += line
+			lines = f.readlines(buffer_size)
+	if page:
+		pages.append(len(page))
+	return pages, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+
+	repeticiones	= int(sys.argv[1]) if len(sys.argv) > 1 else 20
+	sample			= os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "samples", "L80001")
+	folder			= tempfile.mkdtemp()
+	filename		= os.path.join(folder, "L80001.spool")
+	with open(sample, "rb") as f:
+		data = f.read()
+	with open(filename, "wb") as f:
+		for _ in range(repeticiones):
+			f.write(data)
+	mb = os.path.getsize(filename) / (1024 * 1024)
+
+	resultados = []
+	casos = [
+		("fixed", "NEVADO", repeticiones),
+		# Una única página: solo una parte del archivo, la lectura como texto es cuadrática
+		("fixed (una página)", "NO EXISTE", 2),
+	]
+	for caso, code, veces in casos:
+		if veces != repeticiones:
+			with open(filename, "wb") as f:
+				for _ in range(veces):
+					f.write(data)
+			mb = os.path.getsize(filename) / (1024 * 1024)
+
+		p_text, t_text = read_pages(SpoolFixedRecordLength(filename, encoding="cp500", newpage_code=code))
+		p_mmap, t_mmap = read_pages(SpoolFixedRecordLength(filename, encoding="cp500", newpage_code=code, mmap=True))
+		p_tr, t_tr = read_pages(SpoolFixedRecordLength(filename, encoding="cp500", newpage_code=code, mmap=True, translate=True))
+		assert p_text == p_mmap == p_tr
+
+		resultados.append([caso, mb, len(p_text), mb / t_text, mb / t_mmap, mb / t_tr, t_text / min(t_mmap, t_tr)])
+
+	# FCFC: "1" en la primer línea de cada página y " " en las demás
+	with SpoolFixedRecordLength(sample, encoding="cp500", newpage_code="NEVADO") as s:
+		fcfc = "".join("1" + p.replace("\n", "\n ").rstrip(" ") for p in s)
+	casos = [
+		("host reprint", repeticiones),
+		# Una página por repetición del archivo
+		("host reprint (páginas grandes)", 1),
+	]
+	for caso, veces in casos:
+		texto = fcfc * veces if veces == repeticiones else fcfc.replace("\n1", "\n ") * repeticiones
+		with open(filename, "w", encoding="cp500", newline="") as f:
+			f.write(texto)
+		mb = os.path.getsize(filename) / (1024 * 1024)
+
+		p_text, t_text = read_pages_original(filename, "cp500")
+		p_new, t_new = read_pages(SpoolHostReprint(filename, encoding="cp500"))
+		p_tr, t_tr = read_pages(SpoolHostReprint(filename, encoding="cp500", translate=True))
+		assert p_text == p_new == p_tr
+
+		resultados.append([caso, mb, len(p_text), mb / t_text, mb / t_new, mb / t_tr, t_text / min(t_new, t_tr)])
+
+	shutil.rmtree(folder)
+
+	tablestr = tabulate(
+					tabular_data		= resultados,
+					headers				= ["Lector", "MB", "Páginas", "Original (MB/s)", "Bytes (MB/s)", "Traducido (MB/s)", "Mejora (x)"],
+					floatfmt			= "8.1f",
+					tablefmt			= "psql",
+					numalign			= "right",
+					stralign			= "left"
+	)
+	print("")
+	print(tablestr)
+	print("")